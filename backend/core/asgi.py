@@ -1,19 +1,26 @@
 import os
+from django.conf import settings
 from channels.routing import ProtocolTypeRouter, URLRouter
 from django.core.asgi import get_asgi_application
 from django.urls import path
-from issues.consumers import NotificationConsumer
+from issues.consumers import IssueUpdatesConsumer, NotificationConsumer
 from issues.middleware import JWTAuthMiddlewareStack
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 django_asgi_app = get_asgi_application()
 
+if settings.AI_WARMUP_ON_STARTUP:
+    # Load the model in the background so the first request does not pay for it.
+    from issues.utils.ai_validator import ensure_warm_up
+    ensure_warm_up()
+
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
     "websocket": JWTAuthMiddlewareStack(
         URLRouter([
             path("ws/notifications/", NotificationConsumer.as_asgi()),
+            path("ws/issues/", IssueUpdatesConsumer.as_asgi()),
         ])
     ),
 })
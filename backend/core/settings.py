@@ -121,7 +121,7 @@ CORS_ALLOW_ALL_ORIGINS = DEBUG
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'issues.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
 
@@ -146,6 +146,12 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Authenticated users (REST and websocket) are cached by id for this long so
+# requests skip the user lookup. Only id, username, role, is_active and the
+# token version are cached. Saving or deleting a user clears the entry;
+# without a shared cache other processes pick the change up within the TTL.
+AUTH_USER_CACHE_SECONDS = int(os.getenv("AUTH_USER_CACHE_SECONDS", "30"))
+
 
 # USER MODEL
 
@@ -159,9 +165,170 @@ ASGI_APPLICATION = "core.asgi.application"
 WSGI_APPLICATION = 'core.wsgi.application'
 
 
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer",
-    },
-}
+# AI IMAGE VALIDATION
+
+# Concurrent classifications are collected for up to AI_BATCH_WINDOW_MS or
+# AI_BATCH_MAX_SIZE requests and run as one batched forward pass.
+AI_BATCH_WINDOW_MS = float(os.getenv("AI_BATCH_WINDOW_MS", "10"))
+AI_BATCH_MAX_SIZE = int(os.getenv("AI_BATCH_MAX_SIZE", "8"))
+
+# "thread" runs inference in the web process; "process" spawns
+# AI_INFERENCE_PROCESSES workers that each load their own copy of the model.
+# Jobs exceeding AI_INFERENCE_TIMEOUT seconds are retried once.
+AI_INFERENCE_BACKEND = os.getenv("AI_INFERENCE_BACKEND", "thread").lower()
+AI_INFERENCE_PROCESSES = int(os.getenv("AI_INFERENCE_PROCESSES", "2"))
+AI_INFERENCE_TIMEOUT = float(os.getenv("AI_INFERENCE_TIMEOUT", "30"))
+
+# Uploads are decoded straight to at most AI_DECODE_MAX_SIZE pixels on the
+# longest side (JPEGs via DCT scaling); CLIP itself only needs 224.
+AI_DECODE_MAX_SIZE = int(os.getenv("AI_DECODE_MAX_SIZE", "448"))
+
+# Load the model and run one dummy inference in the background when the
+# ASGI/WSGI application starts; /api/health/ai/ reports 503 until that
+# finishes. Failed warm-ups are retried after AI_WARMUP_RETRY_SECONDS,
+# doubling up to AI_WARMUP_RETRY_MAX_SECONDS.
+AI_WARMUP_ON_STARTUP = os.getenv("AI_WARMUP_ON_STARTUP", "False").lower() == "true"
+AI_WARMUP_RETRY_SECONDS = float(os.getenv("AI_WARMUP_RETRY_SECONDS", "5"))
+AI_WARMUP_RETRY_MAX_SECONDS = float(os.getenv("AI_WARMUP_RETRY_MAX_SECONDS", "300"))
+
+# Persistent LRU cache of classification results keyed by exact and
+# perceptual image hash; 0 disables it. The size limit is enforced once
+# every AI_RESULT_CACHE_EVICT_EVERY new entries per process.
+AI_RESULT_CACHE_MAX_ENTRIES = int(os.getenv("AI_RESULT_CACHE_MAX_ENTRIES", "10000"))
+AI_RESULT_CACHE_EVICT_EVERY = int(os.getenv("AI_RESULT_CACHE_EVICT_EVERY", "100"))
+
+# "sync" validates the image inside the create request; "async" saves the
+# issue as PENDING_VALIDATION and classifies it in a bounded worker pool.
+# The pool lives in the web process, so run `manage.py revalidate_pending_issues`
+# periodically (and on deploy) to pick up issues pending for longer than
+# AI_VALIDATION_STALE_MINUTES.
+AI_VALIDATION_MODE = os.getenv("AI_VALIDATION_MODE", "sync").lower()
+AI_VALIDATION_WORKERS = int(os.getenv("AI_VALIDATION_WORKERS", "2"))
+AI_VALIDATION_QUEUE_SIZE = int(os.getenv("AI_VALIDATION_QUEUE_SIZE", "32"))
+AI_VALIDATION_STALE_MINUTES = int(os.getenv("AI_VALIDATION_STALE_MINUTES", "10"))
+
+
+# ISSUE MAP CLUSTERING
+
+ISSUE_CLUSTER_MIN_ZOOM = int(os.getenv("ISSUE_CLUSTER_MIN_ZOOM", "3"))
+ISSUE_CLUSTER_MAX_ZOOM = int(os.getenv("ISSUE_CLUSTER_MAX_ZOOM", "16"))
+ISSUE_CLUSTER_MAX_CELLS = int(os.getenv("ISSUE_CLUSTER_MAX_CELLS", "1024"))
+
+
+# ADMIN DASHBOARD
+
+# Dashboard totals are cached and adjusted on every issue change (which
+# needs the shared cache above); the snapshot is recomputed at least this
+# often (or on ?fresh=1).
+DASHBOARD_STATS_MAX_AGE_SECONDS = int(os.getenv("DASHBOARD_STATS_MAX_AGE_SECONDS", "300"))
+
+# analytics/timeseries/ reads hourly/daily rollups kept by issue signals
+# (`manage.py backfill_issue_rollups` fills buckets from before tracking
+# began); one request may span at most ANALYTICS_MAX_BUCKETS buckets.
+ANALYTICS_MAX_BUCKETS = int(os.getenv("ANALYTICS_MAX_BUCKETS", "1000"))
+
+
+# LIVE ISSUE UPDATES
+
+# ws/issues/ clients follow up to ISSUE_LIVE_MAX_SUBSCRIPTIONS issues by id,
+# or a map viewport covering at most ISSUE_LIVE_MAX_AREA_CELLS geohash cells
+# of ISSUE_LIVE_GEOHASH_PRECISION characters (4 is roughly 39 x 20 km).
+ISSUE_LIVE_MAX_SUBSCRIPTIONS = int(os.getenv("ISSUE_LIVE_MAX_SUBSCRIPTIONS", "100"))
+ISSUE_LIVE_GEOHASH_PRECISION = int(os.getenv("ISSUE_LIVE_GEOHASH_PRECISION", "4"))
+ISSUE_LIVE_MAX_AREA_CELLS = int(os.getenv("ISSUE_LIVE_MAX_AREA_CELLS", "16"))
+
+
+# NOTIFICATIONS
+
+# Per-role recipient ids and digest windows (e.g. all admins) are cached for
+# this long. Saving or deleting a user clears them in this process; other
+# processes pick the change up within the TTL.
+NOTIFICATION_RECIPIENTS_CACHE_SECONDS = int(os.getenv("NOTIFICATION_RECIPIENTS_CACHE_SECONDS", "30"))
+
+# Websocket pushes (notifications and live issue updates) go through outbox
+# tables drained after commit.
+# "thread" runs the dispatcher inside each web process; "external" leaves it
+# to `manage.py dispatch_notification_outbox`. The thread starts on the first
+# commit that enqueues a push and then also drains rows left by earlier
+# processes. Failed batches are retried with exponential backoff up to
+# NOTIFICATION_OUTBOX_MAX_ATTEMPTS times. A claimed batch is leased for
+# NOTIFICATION_OUTBOX_CLAIM_SECONDS, so a dispatcher that dies mid-delivery
+# only delays it.
+NOTIFICATION_OUTBOX_DISPATCHER = os.getenv("NOTIFICATION_OUTBOX_DISPATCHER", "thread").lower()
+NOTIFICATION_OUTBOX_BATCH_SIZE = int(os.getenv("NOTIFICATION_OUTBOX_BATCH_SIZE", "200"))
+NOTIFICATION_OUTBOX_POLL_SECONDS = float(os.getenv("NOTIFICATION_OUTBOX_POLL_SECONDS", "1"))
+NOTIFICATION_OUTBOX_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_OUTBOX_MAX_ATTEMPTS", "8"))
+NOTIFICATION_OUTBOX_CLAIM_SECONDS = float(os.getenv("NOTIFICATION_OUTBOX_CLAIM_SECONDS", "30"))
+NOTIFICATION_OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("NOTIFICATION_OUTBOX_RETRY_BASE_SECONDS", "1"))
+NOTIFICATION_OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("NOTIFICATION_OUTBOX_RETRY_MAX_SECONDS", "60"))
+
+# Websocket clients reconnecting with ?last_id= or ?since= are sent what they
+# missed in batches; past NOTIFICATION_REPLAY_LIMIT they are told to refetch.
+NOTIFICATION_REPLAY_BATCH_SIZE = int(os.getenv("NOTIFICATION_REPLAY_BATCH_SIZE", "100"))
+NOTIFICATION_REPLAY_LIMIT = int(os.getenv("NOTIFICATION_REPLAY_LIMIT", "500"))
+
+# `manage.py prune_notifications` deletes read notifications older than
+# NOTIFICATION_RETENTION_READ_DAYS and keeps each user's newest
+# NOTIFICATION_RETENTION_MAX_PER_USER rows (0 disables either rule).
+NOTIFICATION_RETENTION_READ_DAYS = int(os.getenv("NOTIFICATION_RETENTION_READ_DAYS", "90"))
+NOTIFICATION_RETENTION_MAX_PER_USER = int(os.getenv("NOTIFICATION_RETENTION_MAX_PER_USER", "500"))
+NOTIFICATION_RETENTION_BATCH_SIZE = int(os.getenv("NOTIFICATION_RETENTION_BATCH_SIZE", "1000"))
+NOTIFICATION_RETENTION_PAUSE_SECONDS = float(os.getenv("NOTIFICATION_RETENTION_PAUSE_SECONDS", "0.1"))
+
+# Users may batch new-issue notifications into one digest per window of up
+# to NOTIFICATION_DIGEST_MAX_MINUTES (PATCH notifications/digest/).
+NOTIFICATION_DIGEST_MAX_MINUTES = int(os.getenv("NOTIFICATION_DIGEST_MAX_MINUTES", "60"))
+
+
+# CACHE
+
+# With CACHE_REDIS_URL set, dashboard counters, cached users and role
+# recipients live in Redis, so a change recorded by one process is seen by
+# every other. Without it each process keeps its own cache, which is only
+# correct for a single process (development); `check --deploy` warns.
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "")
+
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+            "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "civiceye"),
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+
+
+# CHANNEL LAYERS
+
+# With CHANNEL_REDIS_URL set, websocket groups live in Redis so a
+# notification sent by any daphne process or outbox dispatcher reaches
+# sockets held by every other process. Without it the in-memory layer only
+# works for a single process (development).
+CHANNEL_REDIS_URL = os.getenv("CHANNEL_REDIS_URL", "")
+
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {
+                "hosts": [CHANNEL_REDIS_URL],
+                "prefix": os.getenv("CHANNEL_LAYER_PREFIX", "civiceye"),
+                # Per-channel queue length; role broadcasts during bursts need headroom.
+                "capacity": int(os.getenv("CHANNEL_LAYER_CAPACITY", "1000")),
+                "expiry": int(os.getenv("CHANNEL_LAYER_EXPIRY", "60")),
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+        },
+    }
 
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+if settings.AI_WARMUP_ON_STARTUP:
+    # Load the model in the background so the first request does not pay for it.
+    from issues.utils.ai_validator import ensure_warm_up
+    ensure_warm_up()
@@ -0,0 +1,239 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+
+GRANULARITIES = {
+    "hour": (timedelta(hours=1), TruncHour),
+    "day": (timedelta(days=1), TruncDay),
+}
+
+OPEN_STATUSES = ("PENDING", "IN_PROGRESS")
+
+# Upper edges (hours) of the report-to-completion histogram; one more bin
+# holds everything slower.
+COMPLETION_BIN_HOURS = (1, 2, 4, 8, 12, 24, 48, 72, 120, 168, 336, 720)
+
+
+def bucket_start(moment, granularity):
+    """Start of the hour/day containing moment, in the project time zone."""
+    local = timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        local = local.replace(hour=0)
+    return local
+
+
+def _completion_bin(hours):
+    for index, upper in enumerate(COMPLETION_BIN_HOURS):
+        if hours <= upper:
+            return index
+    return len(COMPLETION_BIN_HOURS)
+
+
+def _bucket_filter(now):
+    bucket_filter = Q()
+    for granularity in GRANULARITIES:
+        bucket_filter |= Q(granularity=granularity, bucket=bucket_start(now, granularity))
+    return bucket_filter
+
+
+def record_issue_change(previous, current, created_at, rollup_model=None, completion_model=None):
+    """
+    Count one issue moving between (category, status) pairs in the current
+    hour and day buckets.
+
+    previous is None for a new issue and current is None for a deleted one.
+    An issue reaching COMPLETED also adds its report-to-completion time to
+    the completion histogram. At most four queries.
+    """
+    if rollup_model is None:
+        from .models import IssueRollup as rollup_model
+    if completion_model is None:
+        from .models import IssueCompletionRollup as completion_model
+
+    previous_pair = (previous['category'], previous['status']) if previous else None
+    current_pair = (current['category'], current['status']) if current else None
+    if previous_pair == current_pair:
+        return
+
+    now = timezone.now()
+    buckets = {granularity: bucket_start(now, granularity) for granularity in GRANULARITIES}
+    in_buckets = _bucket_filter(now)
+
+    with transaction.atomic():
+        rollup_model.objects.bulk_create(
+            [
+                rollup_model(granularity=granularity, bucket=bucket, category=category, status=status)
+                for granularity, bucket in buckets.items()
+                for category, status in filter(None, (previous_pair, current_pair))
+            ],
+            ignore_conflicts=True,
+        )
+
+        if previous_pair:
+            rollup_model.objects.filter(
+                in_buckets, category=previous_pair[0], status=previous_pair[1]
+            ).update(exited=F('exited') + 1)
+
+        if current_pair:
+            rollup_model.objects.filter(
+                in_buckets, category=current_pair[0], status=current_pair[1]
+            ).update(
+                entered=F('entered') + 1,
+                created=F('created') + (1 if previous_pair is None else 0),
+            )
+
+        completed = (
+            previous_pair is not None and current_pair is not None
+            and current_pair[1] == "COMPLETED" and previous_pair[1] != "COMPLETED"
+        )
+        if completed:
+            hours = max((now - created_at).total_seconds() / 3600, 0.0)
+            duration_bin = _completion_bin(hours)
+            completion_model.objects.bulk_create(
+                [
+                    completion_model(granularity=granularity, bucket=bucket,
+                                     category=current_pair[0], duration_bin=duration_bin)
+                    for granularity, bucket in buckets.items()
+                ],
+                ignore_conflicts=True,
+            )
+            completion_model.objects.filter(
+                in_buckets, category=current_pair[0], duration_bin=duration_bin
+            ).update(count=F('count') + 1, hours_sum=F('hours_sum') + hours)
+
+
+def rebuild_rollups(issue_model, rollup_model, batch_size=2000, reset=False):
+    """
+    Recompute the status-flow rollups from the issue table. Returns rows written.
+
+    Without status history each issue counts as created, in its current
+    status, in the bucket of its created_at. By default only buckets
+    before the earliest existing rollup of each granularity are filled,
+    so incrementally tracked transitions are kept. reset=True drops every
+    rollup first, losing all recorded transitions (and the entered counts
+    of statuses an issue has since left). Completion histograms cannot be
+    reconstructed and are left as they are.
+    """
+    rows = []
+    for granularity, (_, trunc) in GRANULARITIES.items():
+        counts = (
+            issue_model.objects.order_by()
+            .filter(validation_status='VALIDATED')
+            .annotate(bucket=trunc('created_at'))
+        )
+        if not reset:
+            tracked_from = rollup_model.objects.filter(granularity=granularity).aggregate(
+                first=Min('bucket')
+            )['first']
+            if tracked_from is not None:
+                counts = counts.filter(bucket__lt=tracked_from)
+        rows.extend(
+            rollup_model(
+                granularity=granularity, bucket=bucket, category=category, status=status,
+                created=count, entered=count,
+            )
+            for bucket, category, status, count in (
+                counts.values_list('bucket', 'category', 'status').annotate(count=Count('id'))
+            )
+        )
+
+    with transaction.atomic():
+        if reset:
+            rollup_model.objects.all().delete()
+        rollup_model.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def _median_hours(bins):
+    """Median of a completion histogram, interpolated within its bin."""
+    total = sum(bins.values())
+    if not total:
+        return None
+
+    seen = 0
+    for index in range(len(COMPLETION_BIN_HOURS) + 1):
+        count = bins.get(index, 0)
+        if count and seen + count >= total / 2:
+            lower = COMPLETION_BIN_HOURS[index - 1] if index else 0
+            if index == len(COMPLETION_BIN_HOURS):
+                return float(lower)
+            upper = COMPLETION_BIN_HOURS[index]
+            return round(lower + (upper - lower) * (total / 2 - seen) / count, 2)
+        seen += count
+    return None
+
+
+def get_timeseries(start, end, granularity="day", category=None):
+    """
+    Issue trends between start and end from the rollup tables, one entry per
+    bucket: issues created per category, status entries, end-of-bucket
+    backlog (PENDING + IN_PROGRESS) and completions with the median
+    report-to-completion time. Three queries regardless of the range.
+
+    Raises ValueError for an unknown granularity or a range spanning more
+    than ANALYTICS_MAX_BUCKETS buckets.
+    """
+    from .models import IssueCompletionRollup, IssueRollup
+
+    if granularity not in GRANULARITIES:
+        raise ValueError("granularity must be 'hour' or 'day'.")
+    step = GRANULARITIES[granularity][0]
+
+    first = bucket_start(start, granularity)
+    last = bucket_start(end, granularity)
+    if last < first:
+        raise ValueError("end must not be before start.")
+    if (last - first) / step + 1 > getattr(settings, "ANALYTICS_MAX_BUCKETS", 1000):
+        raise ValueError("Date range is too long for this granularity.")
+
+    scope = Q(granularity=granularity)
+    if category:
+        scope &= Q(category=category)
+    in_range = scope & Q(bucket__gte=first, bucket__lte=last)
+
+    backlog = IssueRollup.objects.filter(
+        scope, bucket__lt=first, status__in=OPEN_STATUSES
+    ).aggregate(open=Sum(F('entered') - F('exited')))['open'] or 0
+
+    flows = defaultdict(list)
+    for bucket, row_category, status, created, entered, exited in IssueRollup.objects.filter(in_range).values_list(
+        'bucket', 'category', 'status', 'created', 'entered', 'exited'
+    ):
+        flows[timezone.localtime(bucket)].append((row_category, status, created, entered, exited))
+
+    completions = defaultdict(lambda: defaultdict(int))
+    for bucket, duration_bin, count in IssueCompletionRollup.objects.filter(in_range).values_list(
+        'bucket', 'duration_bin', 'count'
+    ):
+        completions[timezone.localtime(bucket)][duration_bin] += count
+
+    series = []
+    bucket = first
+    while bucket <= last:
+        created_by_category = defaultdict(int)
+        entered_by_status = defaultdict(int)
+        for row_category, status, created, entered, exited in flows.get(bucket, ()):
+            created_by_category[row_category] += created
+            entered_by_status[status] += entered
+            if status in OPEN_STATUSES:
+                backlog += entered - exited
+
+        bins = completions.get(bucket, {})
+        series.append({
+            "bucket": bucket.isoformat(),
+            "created": sum(created_by_category.values()),
+            "created_by_category": {key: value for key, value in created_by_category.items() if value},
+            "entered_by_status": {key: value for key, value in entered_by_status.items() if value},
+            "backlog": backlog,
+            "completed": sum(bins.values()),
+            "median_completion_hours": _median_hours(bins),
+        })
+        bucket = bucket_start(bucket + step, granularity)
+
+    return series
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+User = get_user_model()
+
+
+# Only what authentication and permission checks read; never the password hash.
+_CACHED_USER_FIELDS = ("id", "username", "role", "is_active")
+
+
+def _user_cache_key(user_id):
+    return f"issues:auth-user:{user_id}"
+
+
+def get_cached_user(user_id):
+    """
+    The user with this id, cached for AUTH_USER_CACHE_SECONDS; None if missing.
+
+    The cache holds only _CACHED_USER_FIELDS plus the token version (the
+    hash simplejwt embeds to revoke tokens on a password change). Other
+    fields are deferred and load from the database on first access.
+    """
+    key = _user_cache_key(user_id)
+    values = cache.get(key)
+    if values is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        values = {field: getattr(user, field) for field in _CACHED_USER_FIELDS}
+        values["token_version"] = get_md5_hash_password(user.password)
+        cache.set(key, values, getattr(settings, "AUTH_USER_CACHE_SECONDS", 30))
+
+    fields = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in _CACHED_USER_FIELDS
+    ]
+    user = User.from_db("default", fields, [values[field] for field in fields])
+    user.token_version = values["token_version"]
+    return user
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(_user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """simplejwt's JWTAuthentication with the per-request user lookup served from cache."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != user.token_version:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
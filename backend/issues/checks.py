@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+_PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Dashboard counters are adjusted in the cache, so every process must share it."""
+    if settings.CACHES["default"]["BACKEND"] not in _PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            "The default cache is local to each process.",
+            hint=(
+                "Set CACHE_REDIS_URL. Dashboard totals are adjusted in the cache on "
+                "every issue change, and other processes would keep serving stale totals."
+            ),
+            id="issues.W001",
+        )
+    ]
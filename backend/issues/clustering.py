@@ -0,0 +1,143 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+
+from .utils.geo import tile_for
+
+
+def cluster_zoom_levels():
+    return range(settings.ISSUE_CLUSTER_MIN_ZOOM, settings.ISSUE_CLUSTER_MAX_ZOOM + 1)
+
+
+def _cell_keys(latitude, longitude):
+    return [(zoom, *tile_for(latitude, longitude, zoom)) for zoom in cluster_zoom_levels()]
+
+
+def apply_cluster_delta(state, sign, cell_model=None):
+    """
+    Add (sign=1) or remove (sign=-1) one issue from every zoom level of the grid.
+
+    Two queries regardless of the number of zoom levels: missing cells are
+    inserted empty, then all of them are adjusted in a single UPDATE.
+    """
+    if cell_model is None:
+        from .models import IssueClusterCell as cell_model
+
+    keys = _cell_keys(state['latitude'], state['longitude'])
+    category = state['category']
+    status = state['status']
+
+    with transaction.atomic():
+        if sign > 0:
+            cell_model.objects.bulk_create(
+                [
+                    cell_model(zoom=zoom, x=x, y=y, category=category, status=status)
+                    for zoom, x, y in keys
+                ],
+                ignore_conflicts=True,
+            )
+
+        key_filter = Q()
+        for zoom, x, y in keys:
+            key_filter |= Q(zoom=zoom, x=x, y=y)
+
+        cell_model.objects.filter(key_filter, category=category, status=status).update(
+            count=F('count') + sign,
+            latitude_sum=F('latitude_sum') + sign * state['latitude'],
+            longitude_sum=F('longitude_sum') + sign * state['longitude'],
+        )
+
+
+def rebuild_cluster_cells(issue_model, cell_model, batch_size=2000):
+    """Recompute the whole grid from the issue table. Returns cells written."""
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    rows = issue_model.objects.filter(validation_status='VALIDATED').values_list(
+        'latitude', 'longitude', 'category', 'status'
+    )
+
+    for latitude, longitude, category, status in rows.iterator(chunk_size=batch_size):
+        for zoom, x, y in _cell_keys(latitude, longitude):
+            total = totals[(zoom, x, y, category, status)]
+            total[0] += 1
+            total[1] += latitude
+            total[2] += longitude
+
+    with transaction.atomic():
+        cell_model.objects.all().delete()
+        cell_model.objects.bulk_create(
+            (
+                cell_model(
+                    zoom=zoom, x=x, y=y, category=category, status=status,
+                    count=count, latitude_sum=latitude_sum, longitude_sum=longitude_sum,
+                )
+                for (zoom, x, y, category, status), (count, latitude_sum, longitude_sum) in totals.items()
+            ),
+            batch_size=batch_size,
+        )
+    return len(totals)
+
+
+def get_clusters(min_lat, min_lng, max_lat, max_lng, zoom):
+    """
+    Aggregate the precomputed grid over a viewport.
+
+    Returns (grid_zoom, clusters) or raises ValueError when the viewport
+    spans more cells than ISSUE_CLUSTER_MAX_CELLS at that zoom.
+    """
+    from .models import IssueClusterCell
+
+    grid_zoom = min(max(zoom, settings.ISSUE_CLUSTER_MIN_ZOOM), settings.ISSUE_CLUSTER_MAX_ZOOM)
+
+    # Tile y grows southwards, so the north edge gives the smaller y.
+    west_x, north_y = tile_for(max_lat, min_lng, grid_zoom)
+    east_x, south_y = tile_for(min_lat, max_lng, grid_zoom)
+
+    if west_x <= east_x:
+        x_ranges = [(west_x, east_x)]
+    else:
+        # Viewport crosses the antimeridian.
+        x_ranges = [(west_x, 2 ** grid_zoom - 1), (0, east_x)]
+
+    cell_count = sum(end - start + 1 for start, end in x_ranges) * (south_y - north_y + 1)
+    if cell_count > settings.ISSUE_CLUSTER_MAX_CELLS:
+        raise ValueError("Viewport is too large for this zoom level.")
+
+    x_filter = Q()
+    for start, end in x_ranges:
+        x_filter |= Q(x__range=(start, end))
+
+    rows = IssueClusterCell.objects.filter(
+        x_filter,
+        zoom=grid_zoom,
+        y__range=(north_y, south_y),
+        count__gt=0,
+    ).values_list('x', 'y', 'category', 'status', 'count', 'latitude_sum', 'longitude_sum')
+
+    clusters = {}
+    for x, y, category, status, count, latitude_sum, longitude_sum in rows:
+        cluster = clusters.setdefault((x, y), {
+            "count": 0,
+            "latitude_sum": 0.0,
+            "longitude_sum": 0.0,
+            "by_category": defaultdict(int),
+            "by_status": defaultdict(int),
+        })
+        cluster["count"] += count
+        cluster["latitude_sum"] += latitude_sum
+        cluster["longitude_sum"] += longitude_sum
+        cluster["by_category"][category] += count
+        cluster["by_status"][status] += count
+
+    return grid_zoom, [
+        {
+            "cell": f"{grid_zoom}/{x}/{y}",
+            "count": cluster["count"],
+            "latitude": cluster["latitude_sum"] / cluster["count"],
+            "longitude": cluster["longitude_sum"] / cluster["count"],
+            "by_category": dict(cluster["by_category"]),
+            "by_status": dict(cluster["by_status"]),
+        }
+        for (x, y), cluster in sorted(clusters.items())
+    ]
@@ -1,4 +1,36 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Notification
+from .permissions import can_view_issue, visible_issues
+from .utils.geo import geohash_cells
+from .websocket import _notification_payload, issue_area_group
+
+
+@database_sync_to_async
+def get_missed_notifications(user_id, after_id=None, since=None, limit=100):
+    """One replay batch, oldest first, strictly after the client's last-seen point."""
+    notifications = Notification.objects.filter(user_id=user_id)
+    if after_id is not None:
+        notifications = notifications.filter(id__gt=after_id)
+    if since is not None:
+        notifications = notifications.filter(created_at__gt=since)
+    return [
+        _notification_payload(notification)
+        for notification in notifications.order_by("id")[:limit]
+    ]
+
+
+@database_sync_to_async
+def get_visible_issue_ids(user, issue_ids):
+    return set(visible_issues(user).filter(pk__in=issue_ids).values_list("id", flat=True))
+
+
 class NotificationConsumer(AsyncJsonWebsocketConsumer):
 
     async def connect(self):
@@ -7,21 +39,224 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
         if user.is_anonymous:
             await self.close()
         else:
-            self.group_name = f"user_{user.id}"
+            self.user_key = str(user.id)
+            self.group_names = [f"user_{user.id}", f"role_{user.role}"]
+            self.replayed_up_to = None
 
-            await self.channel_layer.group_add(
-                self.group_name,
-                self.channel_name
-            )
+            for group_name in self.group_names:
+                await self.channel_layer.group_add(
+                    group_name,
+                    self.channel_name
+                )
 
             await self.accept()
 
+            # Live events queue up on the channel while this runs, so nothing
+            # created during the replay is lost.
+            after_id, since = self._replay_point()
+            if after_id is not None or since is not None:
+                await self._replay_missed(user.id, after_id, since)
+
+    def _replay_point(self):
+        params = parse_qs(self.scope.get("query_string", b"").decode())
+        after_id = params.get("last_id", [None])[0]
+        since = params.get("since", [None])[0]
+
+        try:
+            after_id = int(after_id) if after_id is not None else None
+        except ValueError:
+            after_id = None
+
+        since = parse_datetime(since) if since else None
+        if since is not None and timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return after_id, since
+
+    async def _replay_missed(self, user_id, after_id, since):
+        batch_size = getattr(settings, "NOTIFICATION_REPLAY_BATCH_SIZE", 100)
+        limit = getattr(settings, "NOTIFICATION_REPLAY_LIMIT", 500)
+        sent = 0
+
+        while sent < limit:
+            requested = min(batch_size, limit - sent)
+            batch = await get_missed_notifications(user_id, after_id=after_id, since=since, limit=requested)
+            for notification in batch:
+                await self.send_json(notification)
+            if batch:
+                after_id = self.replayed_up_to = batch[-1]["id"]
+                sent += len(batch)
+            if len(batch) < requested:
+                break
+        else:
+            # Too far behind to replay; the client should refetch the list.
+            await self.send_json({"type": "replay_truncated", "last_id": self.replayed_up_to})
+            return
+
+        await self.send_json({"type": "replay_complete", "last_id": self.replayed_up_to, "count": sent})
+
+    def _already_replayed(self, notification):
+        return self.replayed_up_to is not None and notification["id"] <= self.replayed_up_to
+
     async def disconnect(self, close_code):
-        if hasattr(self, "group_name"):
+        for group_name in getattr(self, "group_names", []):
             await self.channel_layer.group_discard(
-                self.group_name,
+                group_name,
                 self.channel_name
             )
 
     async def send_notification(self, event):
-        await self.send_json(event["notification"])
+        if not self._already_replayed(event["notification"]):
+            await self.send_json(event["notification"])
+
+    async def send_unread_count(self, event):
+        await self.send_json({"type": "unread_count", "unread_count": event["unread_count"]})
+
+    async def send_role_notification(self, event):
+        # Role broadcasts carry one shared payload and each recipient's id;
+        # skip users not in it (e.g. whose role changed after this socket connected).
+        notification_id = event["ids"].get(self.user_key)
+        if notification_id is None:
+            return
+        notification = {**event["notification"], "id": notification_id}
+        if not self._already_replayed(notification):
+            await self.send_json(notification)
+
+
+class IssueUpdatesConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Live status, assignment and priority changes for chosen issues.
+
+    Clients send {"action": "subscribe" | "unsubscribe", "issue_ids": [...]}
+    to follow issues by id, and {"action": "watch_area", "bbox": [min_lat,
+    min_lng, max_lat, max_lng]} or {"action": "clear_area"} for a map
+    viewport. Only issues the user could list over REST are delivered.
+    """
+
+    async def connect(self):
+        self.user = self.scope["user"]
+        if self.user.is_anonymous:
+            await self.close()
+            return
+
+        self.issue_ids = set()
+        self.area = None
+        self.area_groups = []
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        groups = [f"issue_{issue_id}" for issue_id in getattr(self, "issue_ids", ())]
+        for group_name in groups + getattr(self, "area_groups", []):
+            await self.channel_layer.group_discard(group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        handlers = {
+            "subscribe": self._subscribe,
+            "unsubscribe": self._unsubscribe,
+            "watch_area": self._watch_area,
+            "clear_area": self._clear_area,
+        }
+        handler = handlers.get(content.get("action")) if isinstance(content, dict) else None
+        if handler is None:
+            await self._error("Unknown action.")
+            return
+        await handler(content)
+
+    async def _error(self, detail):
+        await self.send_json({"type": "error", "detail": detail})
+
+    @staticmethod
+    def _issue_ids(content):
+        issue_ids = content.get("issue_ids")
+        if not isinstance(issue_ids, list) or not all(
+            isinstance(issue_id, int) and not isinstance(issue_id, bool) for issue_id in issue_ids
+        ):
+            return None
+        return set(issue_ids)
+
+    async def _subscribe(self, content):
+        issue_ids = self._issue_ids(content)
+        if issue_ids is None:
+            await self._error("issue_ids must be a list of issue ids.")
+            return
+
+        requested = issue_ids - self.issue_ids
+        if len(self.issue_ids) + len(requested) > getattr(settings, "ISSUE_LIVE_MAX_SUBSCRIPTIONS", 100):
+            await self._error("Too many issue subscriptions.")
+            return
+
+        allowed = await get_visible_issue_ids(self.user, requested) if requested else set()
+        for issue_id in allowed:
+            await self.channel_layer.group_add(f"issue_{issue_id}", self.channel_name)
+        self.issue_ids |= allowed
+
+        await self.send_json({
+            "type": "subscribed",
+            "issue_ids": sorted(self.issue_ids),
+            "denied": sorted(requested - allowed),
+        })
+
+    async def _unsubscribe(self, content):
+        issue_ids = self._issue_ids(content)
+        if issue_ids is None:
+            await self._error("issue_ids must be a list of issue ids.")
+            return
+
+        for issue_id in issue_ids & self.issue_ids:
+            await self.channel_layer.group_discard(f"issue_{issue_id}", self.channel_name)
+        self.issue_ids -= issue_ids
+        await self.send_json({"type": "subscribed", "issue_ids": sorted(self.issue_ids), "denied": []})
+
+    async def _watch_area(self, content):
+        try:
+            min_lat, min_lng, max_lat, max_lng = (float(value) for value in content.get("bbox"))
+        except (TypeError, ValueError):
+            await self._error("bbox must be [min_lat, min_lng, max_lat, max_lng].")
+            return
+        if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= max_lng <= 180):
+            await self._error("bbox must be [min_lat, min_lng, max_lat, max_lng].")
+            return
+
+        cells = geohash_cells(
+            min_lat, max_lat, min_lng, max_lng,
+            getattr(settings, "ISSUE_LIVE_GEOHASH_PRECISION", 4),
+            limit=getattr(settings, "ISSUE_LIVE_MAX_AREA_CELLS", 16),
+        )
+        if cells is None:
+            await self._error("Viewport is too large; zoom in to follow live updates.")
+            return
+
+        groups = [issue_area_group(cell) for cell in cells]
+        for group_name in set(self.area_groups) - set(groups):
+            await self.channel_layer.group_discard(group_name, self.channel_name)
+        for group_name in set(groups) - set(self.area_groups):
+            await self.channel_layer.group_add(group_name, self.channel_name)
+        self.area = (min_lat, min_lng, max_lat, max_lng)
+        self.area_groups = groups
+
+        await self.send_json({"type": "area_watched", "bbox": list(self.area), "cells": len(cells)})
+
+    async def _clear_area(self, content):
+        for group_name in self.area_groups:
+            await self.channel_layer.group_discard(group_name, self.channel_name)
+        self.area = None
+        self.area_groups = []
+        await self.send_json({"type": "area_watched", "bbox": None, "cells": 0})
+
+    def _can_view(self, event):
+        return can_view_issue(self.user, event["reported_by"], event["assigned_to"])
+
+    async def send_issue_update(self, event):
+        if self._can_view(event):
+            await self.send_json(event["issue"])
+
+    async def send_area_issue_update(self, event):
+        issue = event["issue"]
+        if issue["id"] in self.issue_ids or self.area is None:
+            # Followed issues arrive through their own group.
+            return
+
+        min_lat, min_lng, max_lat, max_lng = self.area
+        # Area groups cover whole geohash cells; keep only what is in view.
+        in_view = min_lat <= issue["latitude"] <= max_lat and min_lng <= issue["longitude"] <= max_lng
+        if in_view and self._can_view(event):
+            await self.send_json(issue)
@@ -0,0 +1,123 @@
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+
+_PAIRS_KEY = "issues:dashboard-stats:pairs"
+
+
+def _pair_key(category, status):
+    return f"issues:dashboard-stats:{category}:{status}"
+
+
+def _max_age():
+    return getattr(settings, "DASHBOARD_STATS_MAX_AGE_SECONDS", 300)
+
+
+def _count_pairs():
+    """Validated issue counts per (category, status) in a single GROUP BY query."""
+    from .models import Issue
+
+    rows = (
+        Issue.objects.order_by()
+        .filter(validation_status="VALIDATED")
+        .values_list("category", "status")
+        .annotate(count=Count("id"))
+    )
+    return {(category, status): count for category, status, count in rows}
+
+
+def _refresh_snapshot():
+    from .models import Issue
+
+    counts = _count_pairs()
+    # Every known pair gets a counter so later deltas always have one to adjust.
+    for category, _ in Issue.CATEGORY_CHOICES:
+        for status, _ in Issue.STATUS_CHOICES:
+            counts.setdefault((category, status), 0)
+
+    computed_at = timezone.now().isoformat()
+    values = {_pair_key(category, status): count for (category, status), count in counts.items()}
+    values[_PAIRS_KEY] = {"pairs": list(counts), "computed_at": computed_at}
+    cache.set_many(values, _max_age())
+    return counts, computed_at
+
+
+def _cached_snapshot():
+    meta = cache.get(_PAIRS_KEY)
+    if meta is None:
+        return None
+    pairs = [tuple(pair) for pair in meta["pairs"]]
+    keys = {pair: _pair_key(*pair) for pair in pairs}
+    values = cache.get_many(keys.values())
+    if len(values) != len(keys):
+        return None
+    return {pair: values[key] for pair, key in keys.items()}, meta["computed_at"]
+
+
+def get_dashboard_stats(fresh=False):
+    """
+    Admin dashboard totals from the cached snapshot.
+
+    The snapshot is rebuilt with one query when missing, older than
+    DASHBOARD_STATS_MAX_AGE_SECONDS or when fresh is set; in between,
+    issue saves and deletes adjust it in place. That is only seen by
+    every process with a shared cache (CACHE_REDIS_URL).
+    """
+    snapshot = None if fresh else _cached_snapshot()
+    counts, computed_at = snapshot or _refresh_snapshot()
+
+    by_category, by_status = {}, {}
+    for (category, status), count in counts.items():
+        by_category[category] = by_category.get(category, 0) + count
+        by_status[status] = by_status.get(status, 0) + count
+
+    return {
+        "total": sum(by_status.values()),
+        "pending": by_status.get("PENDING", 0),
+        "in_progress": by_status.get("IN_PROGRESS", 0),
+        "completed": by_status.get("COMPLETED", 0),
+        "resolved": by_status.get("RESOLVED", 0),
+        "issues_by_category": [
+            {"category": category, "count": count}
+            for category, count in sorted(by_category.items()) if count
+        ],
+        "issues_by_status": [
+            {"status": status, "count": count}
+            for status, count in sorted(by_status.items()) if count
+        ],
+        "computed_at": computed_at,
+    }
+
+
+def _apply_deltas(deltas):
+    for (category, status), delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            cache.incr(_pair_key(category, status), delta)
+        except ValueError:
+            # Counter expired or pair unknown: rebuild on the next read.
+            cache.delete(_PAIRS_KEY)
+            return
+
+
+def record_change(previous, current):
+    """
+    Move one issue between (category, status) counters once the
+    transaction commits; previous is None on create, current on delete.
+    """
+    deltas = {}
+    if previous is not None:
+        pair = (previous["category"], previous["status"])
+        deltas[pair] = deltas.get(pair, 0) - 1
+    if current is not None:
+        pair = (current["category"], current["status"])
+        deltas[pair] = deltas.get(pair, 0) + 1
+
+    if any(deltas.values()):
+        transaction.on_commit(partial(_apply_deltas, deltas), robust=True)
@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import outbox
+from .models import Notification, NotificationDigest
+
+
+def add_issue(windows, issue_id, message):
+    """
+    Fold a new issue into each user's open digest, opening one if needed.
+
+    windows maps user_id to the user's digest window in minutes. Nothing is
+    sent now; flush_due turns each digest into a single notification when
+    its window closes.
+    """
+    pending = dict(windows)
+    now = timezone.now()
+
+    with transaction.atomic():
+        while pending:
+            NotificationDigest.objects.bulk_create(
+                [
+                    NotificationDigest(
+                        user_id=user_id,
+                        first_message=message,
+                        window_minutes=minutes,
+                        opened_at=now,
+                        flush_at=now + timedelta(minutes=minutes),
+                    )
+                    for user_id, minutes in pending.items()
+                ],
+                ignore_conflicts=True,
+            )
+            digests = list(NotificationDigest.objects.select_for_update().filter(user_id__in=pending))
+            for digest in digests:
+                digest.issue_ids.append(issue_id)
+            NotificationDigest.objects.bulk_update(digests, ["issue_ids"])
+
+            # A digest flushed between the insert and the lock is gone; open a new one.
+            for digest in digests:
+                pending.pop(digest.user_id)
+
+        # Start the dispatcher if needed; it flushes digests on its poll loop.
+        outbox.schedule_wake()
+
+
+def _digest_message(digest):
+    if len(digest.issue_ids) == 1:
+        return digest.first_message
+    minutes = digest.window_minutes
+    period = "minute" if minutes == 1 else f"{minutes} minutes"
+    return f"{len(digest.issue_ids)} new issues reported in the last {period}"
+
+
+def flush_due(batch_size=None):
+    """Turn digests whose window has closed into notifications; returns how many."""
+    batch_size = batch_size or getattr(settings, "NOTIFICATION_OUTBOX_BATCH_SIZE", 200)
+
+    with transaction.atomic():
+        digests = list(
+            NotificationDigest.objects.select_for_update(skip_locked=True)
+            .filter(flush_at__lte=timezone.now())
+            .order_by("flush_at")[:batch_size]
+        )
+        if not digests:
+            return 0
+
+        notifications = Notification.objects.create_many([
+            Notification(user_id=digest.user_id, message=_digest_message(digest), issue_ids=digest.issue_ids)
+            for digest in digests
+        ])
+        outbox.enqueue(notifications)
+        NotificationDigest.objects.filter(pk__in=[digest.pk for digest in digests]).delete()
+
+    return len(digests)
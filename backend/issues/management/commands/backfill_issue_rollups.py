@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from issues.analytics import rebuild_rollups
+from issues.models import Issue, IssueRollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill the hourly/daily issue rollups from the issue table for buckets "
+        "before incremental tracking began. Each issue is counted in its current "
+        "status at creation time. With --reset every rollup is rebuilt this way, "
+        "which discards all tracked status transitions; completion-time histograms "
+        "are kept, since they cannot be rebuilt without status history."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Delete all rollups first. Tracked status transitions are lost.",
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_rollups(
+            Issue, IssueRollup, batch_size=options["batch_size"], reset=options["reset"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollup rows."))
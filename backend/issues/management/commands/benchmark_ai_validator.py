@@ -0,0 +1,221 @@
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image, ImageDraw
+
+from issues.utils import ai_validator
+
+
+class StubClassifier:
+    """
+    Deterministic stand-in for the CLIP pipeline.
+
+    Scores each prompt from the image's mean colour, and can sleep per batch
+    to approximate model compute, so the harness runs offline in milliseconds.
+    """
+
+    def __init__(self, batch_latency_ms=0.0):
+        self.batch_latency = batch_latency_ms / 1000
+
+    def preprocess(self, images):
+        return [image.resize((224, 224), Image.Resampling.BICUBIC).tobytes() for image in images]
+
+    def __call__(self, images, candidate_labels, **kwargs):
+        self.preprocess(images)
+        if self.batch_latency:
+            time.sleep(self.batch_latency)
+
+        results = []
+        for image in images:
+            mean = image.resize((1, 1), Image.Resampling.BOX).getpixel((0, 0))
+            weights = [1 + (sum(mean) + index * 37) % 97 for index in range(len(candidate_labels))]
+            total = sum(weights)
+            results.append(sorted(
+                ({"score": weight / total, "label": label} for weight, label in zip(weights, candidate_labels)),
+                key=lambda item: -item["score"],
+            ))
+        return results
+
+
+def _parse_size(value):
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise CommandError(f"Invalid image size '{value}', expected WIDTHxHEIGHT.")
+    return width, height
+
+
+def _make_jpeg(size, seed=0):
+    # A gradient with shapes compresses like a photo rather than a flat fill.
+    image = Image.linear_gradient("L").resize(size).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    width, height = size
+    for index in range(8):
+        left = (index * 97 + seed * 31) % width
+        top = (index * 53 + seed * 17) % height
+        draw.ellipse(
+            (left, top, left + width // 6, top + height // 6),
+            fill=((index * 40 + seed) % 256, (index * 90) % 256, (seed * 70) % 256),
+        )
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _summarize(latencies, wall_seconds=None):
+    ordered = sorted(latencies)
+    summary = {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+    if wall_seconds is not None:
+        summary["throughput_per_s"] = len(ordered) / wall_seconds if wall_seconds else 0.0
+    return summary
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark decode, preprocessing and classification latency of the AI "
+        "image validator, and end-to-end throughput at several concurrency levels."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model", choices=["stub", "clip", "auto"], default="stub",
+            help="stub: offline stand-in; clip: locally cached CLIP weights; auto: clip if cached, else stub.",
+        )
+        parser.add_argument("--sizes", default="640x480,1920x1080,4032x3024")
+        parser.add_argument("--concurrency", default="1,4,8")
+        parser.add_argument("--iterations", type=int, default=20, help="Samples per image size and stage.")
+        parser.add_argument("--stub-latency-ms", type=float, default=0.0)
+        parser.add_argument("--output", help="Write JSON results here instead of stdout.")
+
+    def handle(self, *args, **options):
+        sizes = [_parse_size(value) for value in options["sizes"].split(",")]
+        levels = [int(value) for value in options["concurrency"].split(",")]
+        iterations = options["iterations"]
+        if iterations < 1 or min(levels) < 1:
+            raise CommandError("--iterations and --concurrency must be positive.")
+
+        classifier, model = self._load_model(options["model"], options["stub_latency_ms"])
+
+        with ai_validator.use_pipeline(classifier):
+            # One untimed pass so lazy imports and first-call setup are not measured.
+            ai_validator.classify_images([Image.new("RGB", (224, 224))])
+            results = [
+                self._bench_size(classifier, size, levels, iterations)
+                for size in sizes
+            ]
+
+        report = {
+            "meta": {
+                "model": model,
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "timestamp": time.time(),
+                "iterations": iterations,
+                "decode_max_size": self._decode_max_size(),
+            },
+            "results": results,
+        }
+
+        payload = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                handle.write(payload + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Wrote benchmark results to {options['output']}."))
+        else:
+            self.stdout.write(payload)
+
+    def _load_model(self, choice, stub_latency_ms):
+        if choice in ("clip", "auto"):
+            # Never download weights during a benchmark run.
+            os.environ.setdefault("HF_HUB_OFFLINE", "1")
+            try:
+                return ai_validator.load_pipeline()
+            except Exception as exc:
+                if choice == "clip":
+                    raise CommandError(f"CLIP model is not available locally: {exc}")
+                self.stderr.write(f"CLIP model not available ({exc}); using the stub model.")
+        return StubClassifier(stub_latency_ms), "stub"
+
+    def _decode_max_size(self):
+        return getattr(settings, "AI_DECODE_MAX_SIZE", 448)
+
+    def _bench_size(self, classifier, size, levels, iterations):
+        uploads = [_make_jpeg(size, seed) for seed in range(iterations)]
+        max_size = self._decode_max_size()
+
+        decode, images = [], []
+        for data in uploads:
+            started = time.perf_counter()
+            image, _ = ai_validator.decode_image(io.BytesIO(data), max_size)
+            decode.append(time.perf_counter() - started)
+            images.append(image)
+
+        preprocess = []
+        processor = getattr(classifier, "image_processor", None)
+        for image in images:
+            started = time.perf_counter()
+            if processor is not None:
+                processor(images=[image], return_tensors="pt")
+            else:
+                classifier.preprocess([image])
+            preprocess.append(time.perf_counter() - started)
+
+        classify = []
+        for image in images:
+            started = time.perf_counter()
+            ai_validator.classify_images([image])
+            classify.append(time.perf_counter() - started)
+
+        return {
+            "size": f"{size[0]}x{size[1]}",
+            "upload_bytes": statistics.fmean(len(data) for data in uploads),
+            "decode": _summarize(decode),
+            "preprocess": _summarize(preprocess),
+            "classify": _summarize(classify),
+            "end_to_end": [self._bench_concurrency(uploads, level) for level in levels],
+        }
+
+    def _bench_concurrency(self, uploads, level):
+        def predict(data):
+            started = time.perf_counter()
+            ai_validator.predict_issue_image(io.BytesIO(data), use_cache=False)
+            return time.perf_counter() - started
+
+        # A fresh batcher per level so batch-size counters are per run.
+        with ai_validator.use_batcher(ai_validator.make_batcher()) as batcher:
+            requests = uploads * max(1, level)
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=level) as pool:
+                latencies = list(pool.map(predict, requests))
+            wall = time.perf_counter() - started
+
+        result = _summarize(latencies, wall)
+        result["concurrency"] = level
+        result["avg_batch_size"] = batcher.stats()["avg_batch_size"]
+        return result
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from issues import digest, outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued realtime notifications, live issue updates, due digests "
+        "and unread-count updates from the outbox."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain what is due now and exit.")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        while True:
+            handled = 0
+            while digest.flush_due(options["batch_size"]):
+                pass
+            while batch := outbox.dispatch_pending(options["batch_size"]):
+                handled += batch
+            while outbox.dispatch_issue_updates(options["batch_size"]):
+                pass
+            while outbox.push_unread_counts(options["batch_size"]):
+                pass
+
+            if handled:
+                stats = outbox.get_stats()
+                self.stdout.write(
+                    f"Handled {handled} entries; delivered {stats['delivered']}, "
+                    f"dropped {stats['dropped']}, pending {stats['pending']}, "
+                    f"avg lag {stats['avg_lag_ms'] or 0:.0f}ms, max lag {stats['max_lag_ms']:.0f}ms."
+                )
+
+            if options["once"]:
+                return
+            time.sleep(options["poll_interval"])
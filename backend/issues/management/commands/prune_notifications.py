@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from issues.retention import prune_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete read notifications past the retention window and cap each user's "
+        "notification history, in small throttled batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--read-days", type=int, help="Delete read notifications older than this (0 disables).")
+        parser.add_argument("--max-per-user", type=int, help="Keep at most this many per user (0 disables).")
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument("--pause", type=float, help="Seconds to sleep between delete batches.")
+
+    def handle(self, *args, **options):
+        report = prune_notifications(
+            read_days=options["read_days"],
+            max_per_user=options["max_per_user"],
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {report['read_expired']} expired read and {report['over_cap']} over-cap notifications "
+            f"({report['users_capped']} users capped) in {report['batches']} batches, {report['seconds']}s."
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from issues.clustering import rebuild_cluster_cells
+from issues.models import Issue, IssueClusterCell
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-zoom map cluster grid from the issue table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        written = rebuild_cluster_cells(Issue, IssueClusterCell, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} cluster cells."))
@@ -0,0 +1,168 @@
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from issues.models import Issue
+from issues.utils import ai_validator
+from issues.validation import normalize_selected_category
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _load_image(issue):
+    max_size = getattr(settings, "AI_DECODE_MAX_SIZE", 448)
+    try:
+        with issue.image.open("rb") as image_file:
+            image, _ = ai_validator.decode_image(image_file, max_size)
+        return image
+    except (OSError, ValueError) as exc:
+        return ai_validator.AIValidationError(f"Could not read image: {exc}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-run AI classification over existing issue images and refresh "
+        "ai_prediction/ai_confidence. Use after changing the model or prompts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Rows fetched per database round trip.")
+        parser.add_argument("--batch-size", type=int, default=16, help="Images per classification batch.")
+        parser.add_argument("--workers", type=int, default=4, help="Threads reading and decoding images.")
+        parser.add_argument("--limit", type=int, help="Stop after this many issues.")
+        parser.add_argument("--checkpoint", help="JSON file recording the last processed issue id.")
+        parser.add_argument("--resume", action="store_true", help="Continue after the id stored in --checkpoint.")
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Classify without writing, and print a confusion matrix against the reported category.",
+        )
+
+    def handle(self, *args, **options):
+        if options["resume"] and not options["checkpoint"]:
+            raise CommandError("--resume requires --checkpoint.")
+        if min(options["chunk_size"], options["batch_size"], options["workers"]) < 1:
+            raise CommandError("--chunk-size, --batch-size and --workers must be positive.")
+
+        dry_run = options["dry_run"]
+        checkpoint = options["checkpoint"] if not dry_run else None
+        state = {"last_id": 0, "processed": 0, "updated": 0, "failed": 0}
+        if options["resume"]:
+            state.update(self._read_checkpoint(options["checkpoint"]))
+            self.stdout.write(f"Resuming after issue {state['last_id']}.")
+
+        issues = (
+            Issue.objects.exclude(image="").exclude(image__isnull=True)
+            .filter(pk__gt=state["last_id"])
+            .order_by("pk")
+            .only("id", "image", "category", "ai_prediction", "ai_confidence")
+            .iterator(chunk_size=options["chunk_size"])
+        )
+        if options["limit"]:
+            issues = islice(issues, options["limit"])
+
+        confusion = Counter()
+        started = time.perf_counter()
+        processed_this_run = 0
+
+        with ThreadPoolExecutor(max_workers=options["workers"], thread_name_prefix="reclassify-read") as readers:
+            for batch in _batched(issues, options["batch_size"]):
+                images = list(readers.map(_load_image, batch))
+                predictions = self._classify(images)
+
+                changed = []
+                for issue, prediction in zip(batch, predictions):
+                    if isinstance(prediction, Exception):
+                        state["failed"] += 1
+                        self.stderr.write(f"Issue {issue.pk}: {prediction}")
+                        continue
+
+                    ai_prediction, ai_confidence = prediction
+                    confusion[(normalize_selected_category(issue.category), ai_prediction)] += 1
+                    if (issue.ai_prediction, issue.ai_confidence) != (ai_prediction, ai_confidence):
+                        issue.ai_prediction = ai_prediction
+                        issue.ai_confidence = ai_confidence
+                        changed.append(issue)
+
+                if not dry_run and changed:
+                    Issue.objects.bulk_update(changed, ["ai_prediction", "ai_confidence"])
+                    state["updated"] += len(changed)
+
+                state["processed"] += len(batch)
+                state["last_id"] = batch[-1].pk
+                processed_this_run += len(batch)
+                if checkpoint:
+                    self._write_checkpoint(checkpoint, state)
+
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"Processed {state['processed']} issues "
+                    f"({processed_this_run / elapsed if elapsed else 0.0:.1f}/s), "
+                    f"{state['updated']} updated, {state['failed']} failed, last id {state['last_id']}."
+                )
+
+        if dry_run:
+            self._write_confusion_matrix(confusion)
+
+        verb = "Would classify" if dry_run else "Reclassified"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {processed_this_run} issues in {time.perf_counter() - started:.1f}s "
+            f"({state['failed']} failed)."
+        ))
+
+    def _classify(self, images):
+        predictions = [None] * len(images)
+        readable = [index for index, image in enumerate(images) if not isinstance(image, Exception)]
+        for index, image in enumerate(images):
+            if isinstance(image, Exception):
+                predictions[index] = image
+
+        if readable:
+            try:
+                results = ai_validator.classify_images([images[index] for index in readable])
+            except ai_validator.AIValidationError as exc:
+                raise CommandError(str(exc))
+            for index, result in zip(readable, results):
+                predictions[index] = result
+        return predictions
+
+    def _read_checkpoint(self, path):
+        try:
+            with open(path) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {}
+        except ValueError as exc:
+            raise CommandError(f"Checkpoint {path} is not valid JSON: {exc}")
+
+    def _write_checkpoint(self, path, state):
+        # Write then rename so an interrupted run never leaves a torn file.
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as handle:
+            json.dump(state, handle)
+        os.replace(temporary, path)
+
+    def _write_confusion_matrix(self, confusion):
+        reported = sorted({selected for selected, _ in confusion})
+        predicted = sorted({prediction for _, prediction in confusion})
+        width = max([len("reported \\ predicted")] + [len(label) for label in reported + predicted]) + 2
+
+        self.stdout.write("Confusion matrix (rows: reported category, columns: AI prediction)")
+        self.stdout.write("reported \\ predicted".ljust(width) + "".join(label.rjust(width) for label in predicted))
+        for selected in reported:
+            counts = "".join(str(confusion[(selected, prediction)]).rjust(width) for prediction in predicted)
+            self.stdout.write(selected.ljust(width) + counts)
+
+        total = sum(confusion.values())
+        agreeing = sum(count for (selected, prediction), count in confusion.items() if selected == prediction)
+        if total:
+            self.stdout.write(f"Agreement: {agreeing}/{total} ({agreeing / total:.1%})")
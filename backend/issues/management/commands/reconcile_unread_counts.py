@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from issues.unread import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recompute per-user unread notification counters and repair any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="user_ids", help="Limit to these user ids.")
+
+    def handle(self, *args, **options):
+        repaired = reconcile(options["user_ids"])
+        for user_id, (stored, actual) in sorted(repaired.items()):
+            self.stdout.write(f"User {user_id}: {stored} -> {actual}")
+        self.stdout.write(self.style.SUCCESS(f"Repaired {len(repaired)} unread counters."))
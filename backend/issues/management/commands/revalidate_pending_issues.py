@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from issues.validation import revalidate_stale_issues
+
+
+class Command(BaseCommand):
+    help = (
+        "Validate issues stuck in PENDING_VALIDATION, e.g. after the web process "
+        "holding their background validation restarted. Run from cron or on deploy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", type=int,
+            help="Only issues reported more than this many minutes ago (default AI_VALIDATION_STALE_MINUTES).",
+        )
+
+    def handle(self, *args, **options):
+        older_than = options["older_than"]
+        if older_than is not None and older_than < 0:
+            raise CommandError("--older-than must not be negative.")
+
+        outcomes = revalidate_stale_issues(older_than)
+        summary = ", ".join(f"{count} {status.lower()}" for status, count in sorted(outcomes.items())) or "none"
+        self.stdout.write(self.style.SUCCESS(f"Revalidated stale issues: {summary}."))
@@ -2,20 +2,15 @@ from urllib.parse import parse_qs
 
 from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
-from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from rest_framework_simplejwt.tokens import AccessToken, TokenError
 
-
-User = get_user_model()
+from .authentication import get_cached_user
 
 
 @database_sync_to_async
 def get_user(user_id):
-    try:
-        return User.objects.get(id=user_id)
-    except User.DoesNotExist:
-        return AnonymousUser()
+    return get_cached_user(user_id) or AnonymousUser()
 
 
 class JWTAuthMiddleware(BaseMiddleware):
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.11 on 2026-10-17 16:11
+
+from django.db import migrations, models
+
+from issues.utils.geo import encode_geohash
+
+
+def backfill_geohash(apps, schema_editor):
+    Issue = apps.get_model('issues', 'Issue')
+    batch = []
+    for issue in Issue.objects.only('id', 'latitude', 'longitude').iterator(chunk_size=2000):
+        issue.geohash = encode_geohash(issue.latitude, issue.longitude)
+        batch.append(issue)
+        if len(batch) >= 2000:
+            Issue.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    if batch:
+        Issue.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0006_issue_ai_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['latitude', 'longitude'], name='issues_issu_latitud_6b7245_idx'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
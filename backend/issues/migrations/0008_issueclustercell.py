@@ -0,0 +1,72 @@
+# Generated by Django 5.2.11 on 2026-10-17 16:12
+
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copy of issues.utils.geo.tile_for; migrations must not follow app code.
+def _tile_for(latitude, longitude, zoom):
+    n = 2 ** zoom
+    latitude = max(-85.05112878, min(85.05112878, latitude))
+    lat_rad = math.radians(latitude)
+
+    x = int((longitude + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def build_cluster_cells(apps, schema_editor):
+    Issue = apps.get_model('issues', 'Issue')
+    IssueClusterCell = apps.get_model('issues', 'IssueClusterCell')
+    zooms = range(settings.ISSUE_CLUSTER_MIN_ZOOM, settings.ISSUE_CLUSTER_MAX_ZOOM + 1)
+
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    rows = Issue.objects.values_list('latitude', 'longitude', 'category', 'status')
+    for latitude, longitude, category, status in rows.iterator(chunk_size=2000):
+        for zoom in zooms:
+            total = totals[(zoom, *_tile_for(latitude, longitude, zoom), category, status)]
+            total[0] += 1
+            total[1] += latitude
+            total[2] += longitude
+
+    IssueClusterCell.objects.bulk_create(
+        (
+            IssueClusterCell(
+                zoom=zoom, x=x, y=y, category=category, status=status,
+                count=count, latitude_sum=latitude_sum, longitude_sum=longitude_sum,
+            )
+            for (zoom, x, y, category, status), (count, latitude_sum, longitude_sum) in totals.items()
+        ),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0007_issue_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueClusterCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zoom', models.PositiveSmallIntegerField()),
+                ('x', models.PositiveIntegerField()),
+                ('y', models.PositiveIntegerField()),
+                ('category', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('latitude_sum', models.FloatField(default=0)),
+                ('longitude_sum', models.FloatField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('zoom', 'x', 'y', 'category', 'status'), name='unique_issue_cluster_cell')],
+            },
+        ),
+        migrations.RunPython(build_cluster_cells, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-17 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0008_issueclustercell'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='validation_message',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='validation_status',
+            field=models.CharField(choices=[('PENDING_VALIDATION', 'Pending Validation'), ('VALIDATED', 'Validated'), ('REJECTED', 'Rejected')], db_index=True, default='VALIDATED', max_length=20),
+        ),
+    ]
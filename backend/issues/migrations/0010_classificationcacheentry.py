@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0009_issue_validation_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassificationCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_key', models.CharField(max_length=64)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('perceptual_hash', models.CharField(max_length=32)),
+                ('prediction', models.CharField(max_length=20)),
+                ('confidence', models.FloatField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model_key', 'perceptual_hash'], name='issues_clas_model_k_501d20_idx')],
+                'constraints': [models.UniqueConstraint(fields=('model_key', 'content_hash'), name='unique_classification_cache_content')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-17 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0011_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='broadcast_role',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+    ]
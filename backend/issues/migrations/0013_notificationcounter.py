@@ -0,0 +1,40 @@
+# Generated by Django 5.2.11 on 2026-10-17 18:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    Notification = apps.get_model('issues', 'Notification')
+    NotificationCounter = apps.get_model('issues', 'NotificationCounter')
+
+    unread = (
+        Notification.objects.filter(is_read=False)
+        .values('user_id')
+        .annotate(count=models.Count('id'))
+    )
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=row['user_id'], unread=row['count']) for row in unread],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0012_notificationoutbox_broadcast_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.IntegerField(default=0)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('dirty', models.BooleanField(db_index=True, default=False)),
+            ],
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-17 19:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0014_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='notification_digest_minutes',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='issue_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.CreateModel(
+            name='NotificationDigest',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_digest', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('issue_ids', models.JSONField(default=list)),
+                ('first_message', models.TextField()),
+                ('opened_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('flush_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.11 on 2026-10-17 19:40
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour
+
+
+def build_rollups(apps, schema_editor):
+    # Inlined rather than calling issues.analytics, so later changes to the
+    # app code cannot change what this migration does.
+    Issue = apps.get_model('issues', 'Issue')
+    IssueRollup = apps.get_model('issues', 'IssueRollup')
+
+    rows = []
+    for granularity, trunc in (('hour', TruncHour), ('day', TruncDay)):
+        counts = (
+            Issue.objects.order_by()
+            .filter(validation_status='VALIDATED')
+            .annotate(bucket=trunc('created_at'))
+            .values_list('bucket', 'category', 'status')
+            .annotate(count=Count('id'))
+        )
+        rows.extend(
+            IssueRollup(
+                granularity=granularity, bucket=bucket, category=category, status=status,
+                created=count, entered=count,
+            )
+            for bucket, category, status, count in counts
+        )
+    IssueRollup.objects.bulk_create(rows, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0015_notification_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('category', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('created', models.IntegerField(default=0)),
+                ('entered', models.IntegerField(default=0)),
+                ('exited', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'bucket', 'category', 'status'), name='unique_issue_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='IssueCompletionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('category', models.CharField(max_length=20)),
+                ('duration_bin', models.PositiveSmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('hours_sum', models.FloatField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'bucket', 'category', 'duration_bin'), name='unique_issue_completion_rollup')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
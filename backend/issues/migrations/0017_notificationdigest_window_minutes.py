@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-17 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0016_issue_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationdigest',
+            name='window_minutes',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
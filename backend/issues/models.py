@@ -1,6 +1,11 @@
+from collections import Counter
+
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import connections, models, router, transaction
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .utils.geo import encode_geohash
 
 
 # USER MODEL
@@ -20,6 +25,9 @@ class User(AbstractUser):
         db_index=True
     )
 
+    # New-issue notifications are folded into one digest per window; 0 sends each immediately.
+    notification_digest_minutes = models.PositiveSmallIntegerField(default=0)
+
     def __str__(self):
         return f"{self.username} ({self.role})"
 
@@ -44,12 +52,26 @@ class Issue(models.Model):
         ('RESOLVED', 'Resolved'),
     )
 
+    VALIDATION_STATUS_CHOICES = (
+        ('PENDING_VALIDATION', 'Pending Validation'),
+        ('VALIDATED', 'Validated'),
+        ('REJECTED', 'Rejected'),
+    )
+
     title = models.CharField(max_length=255)
     description = models.TextField()
     image = models.ImageField(upload_to='issues/', null=True, blank=True)
     ai_prediction = models.CharField(max_length=20, blank=True, default='')
     ai_confidence = models.FloatField(null=True, blank=True)
 
+    validation_status = models.CharField(
+        max_length=20,
+        choices=VALIDATION_STATUS_CHOICES,
+        default='VALIDATED',
+        db_index=True
+    )
+    validation_message = models.CharField(max_length=255, blank=True, default='')
+
     category = models.CharField(
         max_length=20,
         choices=CATEGORY_CHOICES,
@@ -66,6 +88,9 @@ class Issue(models.Model):
     latitude = models.FloatField()
     longitude = models.FloatField()
 
+    # Spatial grid cell for prefix lookups, derived from latitude/longitude on save.
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True, editable=False)
+
     priority_score = models.IntegerField(default=0, db_index=True)
 
     reported_by = models.ForeignKey(
@@ -92,8 +117,37 @@ class Issue(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['category']),
             models.Index(fields=['priority_score']),
+            models.Index(fields=['latitude', 'longitude']),
+            # Keyset pagination keys (see issues.pagination).
+            models.Index(fields=['created_at', 'id'], name='issue_created_keyset_idx'),
+            models.Index(fields=['priority_score', 'id'], name='issue_priority_keyset_idx'),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_state = instance.tracked_state()
+        return instance
+
+    def tracked_state(self):
+        """Snapshot of the fields that derived aggregates are keyed on."""
+        return {
+            'latitude': self.__dict__.get('latitude'),
+            'longitude': self.__dict__.get('longitude'),
+            'category': self.__dict__.get('category'),
+            'status': self.__dict__.get('status'),
+            'validation_status': self.__dict__.get('validation_status'),
+        }
+
+    def save(self, *args, **kwargs):
+        self.geohash = encode_geohash(self.latitude, self.longitude)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and ({'latitude', 'longitude'} & set(update_fields)):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+
+        super().save(*args, **kwargs)
+
     def clean(self):
         # Prevent assigning non-worker users
         if self.assigned_to and self.assigned_to.role != "WORKER":
@@ -103,8 +157,183 @@ class Issue(models.Model):
         return f"{self.title} - {self.status}"
 
 
+# MAP CLUSTER GRID
+
+class IssueClusterCell(models.Model):
+    """Issue counts per web-mercator tile, kept per zoom, category and status."""
+
+    zoom = models.PositiveSmallIntegerField()
+    x = models.PositiveIntegerField()
+    y = models.PositiveIntegerField()
+    category = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+
+    count = models.IntegerField(default=0)
+    latitude_sum = models.FloatField(default=0)
+    longitude_sum = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['zoom', 'x', 'y', 'category', 'status'],
+                name='unique_issue_cluster_cell',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.zoom}/{self.x}/{self.y} {self.category} {self.status}: {self.count}"
+
+
+# ISSUE ANALYTICS ROLLUPS
+
+class IssueRollup(models.Model):
+    """
+    Issue flow per hour/day bucket, category and status: issues created,
+    and transitions into (entered) and out of (exited) the status.
+    """
+
+    GRANULARITY_CHOICES = (
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    )
+
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket = models.DateTimeField()
+    category = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+
+    created = models.IntegerField(default=0)
+    entered = models.IntegerField(default=0)
+    exited = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket', 'category', 'status'],
+                name='unique_issue_rollup',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket:%Y-%m-%d %H:%M} {self.category} {self.status}"
+
+
+class IssueCompletionRollup(models.Model):
+    """Issues reaching COMPLETED per bucket and category, binned by hours since report."""
+
+    granularity = models.CharField(max_length=4, choices=IssueRollup.GRANULARITY_CHOICES)
+    bucket = models.DateTimeField()
+    category = models.CharField(max_length=20)
+    # Index into issues.analytics.COMPLETION_BIN_HOURS.
+    duration_bin = models.PositiveSmallIntegerField()
+
+    count = models.IntegerField(default=0)
+    hours_sum = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket', 'category', 'duration_bin'],
+                name='unique_issue_completion_rollup',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket:%Y-%m-%d %H:%M} {self.category} bin {self.duration_bin}"
+
+
+# AI CLASSIFICATION CACHE
+
+class ClassificationCacheEntry(models.Model):
+    """Cached CLIP result for an image, keyed by exact and perceptual hash."""
+
+    model_key = models.CharField(max_length=64)
+    content_hash = models.CharField(max_length=64)
+    perceptual_hash = models.CharField(max_length=32)
+
+    prediction = models.CharField(max_length=20)
+    confidence = models.FloatField()
+
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model_key', 'content_hash'],
+                name='unique_classification_cache_content',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['model_key', 'perceptual_hash']),
+        ]
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} -> {self.prediction} ({self.confidence:.2f})"
+
+
 # NOTIFICATION MODEL
 
+class NotificationQuerySet(models.QuerySet):
+    """Set-based bulk operations that keep the unread counters in step."""
+
+    def _unread_by_user(self):
+        return dict(
+            self.filter(is_read=False)
+            .order_by()
+            .values('user_id')
+            .annotate(count=models.Count('id'))
+            .values_list('user_id', 'count')
+        )
+
+    def mark_read(self):
+        from .unread import apply_deltas
+
+        with transaction.atomic():
+            unread = self._unread_by_user()
+            updated = self.filter(is_read=False).update(is_read=True)
+            apply_deltas({user_id: -count for user_id, count in unread.items()})
+        return updated
+
+    def delete(self):
+        from .unread import apply_deltas
+
+        with transaction.atomic():
+            unread = self._unread_by_user()
+            deleted, per_model = super().delete()
+            apply_deltas({user_id: -count for user_id, count in unread.items()})
+        return deleted, per_model
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def create_many(self, notifications):
+        """
+        Insert notifications and bump their owners' unread counters.
+
+        The outbox needs every primary key, so backends that cannot return
+        ids from a bulk insert (MySQL) save the rows one by one instead;
+        post_save then keeps the counters.
+        """
+        from .unread import apply_deltas
+
+        db = router.db_for_write(self.model)
+        with transaction.atomic(using=db, savepoint=False):
+            if not connections[db].features.can_return_rows_from_bulk_insert:
+                for notification in notifications:
+                    notification.save(force_insert=True, using=db)
+                return notifications
+
+            notifications = self.using(db).bulk_create(notifications)
+            apply_deltas(Counter(
+                notification.user_id for notification in notifications if not notification.is_read
+            ))
+        return notifications
+
+    create_many.alters_data = True
+
+
 class Notification(models.Model):
 
     user = models.ForeignKey(
@@ -118,13 +347,125 @@ class Notification(models.Model):
 
     is_read = models.BooleanField(default=False, db_index=True)
 
+    # Issues summarized by a digest notification.
+    issue_ids = models.JSONField(default=list, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
+    objects = NotificationQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', 'is_read']),
+            models.Index(fields=['user', 'created_at', 'id'], name='notification_keyset_idx'),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_read = instance.__dict__.get('is_read')
+        return instance
+
+    def delete(self, *args, **kwargs):
+        from .unread import apply_deltas
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            if not self.is_read:
+                apply_deltas({self.user_id: -1})
+        return result
+
     def __str__(self):
         return f"{self.user.username} - {self.message[:20]}"
+
+
+class NotificationCounter(models.Model):
+    """Denormalized unread count per user, adjusted on every notification change."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_counter"
+    )
+
+    unread = models.IntegerField(default=0)
+
+    # Bumped on every change; the outbox dispatcher pushes dirty counters.
+    version = models.PositiveIntegerField(default=0)
+    dirty = models.BooleanField(default=False, db_index=True)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+
+# NOTIFICATION OUTBOX
+
+class NotificationOutbox(models.Model):
+    """Websocket delivery pending for a notification, written in the same transaction."""
+
+    notification = models.OneToOneField(
+        Notification,
+        on_delete=models.CASCADE,
+        related_name="outbox_entry"
+    )
+
+    # Set when the event goes out as one broadcast to the role_<ROLE> group.
+    broadcast_role = models.CharField(max_length=10, blank=True, default='')
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.CharField(max_length=255, blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Outbox for notification {self.notification_id} (attempt {self.attempts})"
+
+
+class IssueUpdateOutbox(models.Model):
+    """Live-update push of changed issue fields, written in the same transaction."""
+
+    issue = models.ForeignKey(
+        Issue,
+        on_delete=models.CASCADE,
+        related_name='update_outbox_entries'
+    )
+    changes = models.JSONField()
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.CharField(max_length=255, blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Outbox for issue {self.issue_id} update (attempt {self.attempts})"
+
+
+# NOTIFICATION DIGEST
+
+class NotificationDigest(models.Model):
+    """New-issue notifications held back until the user's digest window closes."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_digest"
+    )
+
+    issue_ids = models.JSONField(default=list)
+
+    # Sent as-is when the window closes with a single issue.
+    first_message = models.TextField()
+
+    # The user's window when the digest opened, for the digest message.
+    window_minutes = models.PositiveSmallIntegerField(default=0)
+
+    opened_at = models.DateTimeField(default=timezone.now)
+    flush_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Digest for {self.user_id}: {len(self.issue_ids)} issues"
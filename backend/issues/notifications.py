@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from . import digest, outbox
+from .models import Notification, User
+
+
+def _recipients_cache_key(role):
+    return f"issues:role-recipient-ids:{role}"
+
+
+def role_recipient_ids(role):
+    """Ids of all users with the role, cached until a user changes here or the TTL expires."""
+    key = _recipients_cache_key(role)
+    user_ids = cache.get(key)
+    if user_ids is None:
+        user_ids = list(User.objects.filter(role=role).values_list("id", flat=True))
+        cache.set(key, user_ids, getattr(settings, "NOTIFICATION_RECIPIENTS_CACHE_SECONDS", 30))
+    return user_ids
+
+
+def _digest_windows_cache_key(role):
+    return f"issues:role-digest-windows:{role}"
+
+
+def role_digest_windows(role):
+    """{user_id: minutes} for users of the role who get new issues as a digest."""
+    key = _digest_windows_cache_key(role)
+    windows = cache.get(key)
+    if windows is None:
+        windows = dict(
+            User.objects.filter(role=role, notification_digest_minutes__gt=0)
+            .values_list("id", "notification_digest_minutes")
+        )
+        cache.set(key, windows, getattr(settings, "NOTIFICATION_RECIPIENTS_CACHE_SECONDS", 30))
+    return windows
+
+
+def invalidate_role_recipients():
+    cache.delete_many(
+        [_recipients_cache_key(role) for role, _ in User.ROLE_CHOICES]
+        + [_digest_windows_cache_key(role) for role, _ in User.ROLE_CHOICES]
+    )
+
+
+def _create_notifications(user_ids, message, broadcast_role=""):
+    with transaction.atomic():
+        notifications = Notification.objects.create_many(
+            [Notification(user_id=user_id, message=message) for user_id in user_ids]
+        )
+        outbox.enqueue(notifications, broadcast_role=broadcast_role)
+    return notifications
+
+
+def notify_users(user_ids, message):
+    """
+    Store the same message for every recipient and queue websocket delivery.
+
+    The notifications and their outbox rows are written in one transaction;
+    the outbox dispatcher pushes them after commit, so callers never wait
+    on the channel layer.
+    """
+    return _create_notifications(user_ids, message)
+
+
+def notify_role(role, message, digest_issue_id=None):
+    """
+    Like notify_users for every user with the role, but delivered as one
+    role-group broadcast instead of one group_send per recipient.
+
+    With digest_issue_id (a newly reported issue), users who set a digest
+    window get the issue added to their pending digest instead.
+    """
+    user_ids = role_recipient_ids(role)
+    if digest_issue_id is not None:
+        windows = role_digest_windows(role)
+        if windows:
+            user_ids = [user_id for user_id in user_ids if user_id not in windows]
+            digest.add_issue(windows, digest_issue_id, message)
+    return _create_notifications(user_ids, message, broadcast_role=role)
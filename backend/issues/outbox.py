@@ -0,0 +1,321 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from threading import Event, Lock, Thread, local
+from weakref import WeakValueDictionary
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
+
+from .models import IssueUpdateOutbox, NotificationCounter, NotificationOutbox
+from .websocket import (
+    broadcast_role_notifications,
+    send_issue_updates,
+    send_realtime_notifications,
+    send_unread_counts,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_WAKE = Event()
+# Per thread, the wake-up registered in each connection's open transaction.
+_PENDING_WAKES = local()
+_DISPATCHER = None
+_DISPATCHER_LOCK = Lock()
+
+_STATS_LOCK = Lock()
+_STATS = {
+    "delivered": 0,
+    "failed_attempts": 0,
+    "dropped": 0,
+    "last_lag_ms": None,
+    "max_lag_ms": 0.0,
+    "total_lag_ms": 0.0,
+}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(notifications, broadcast_role=""):
+    """
+    Record websocket delivery for notifications saved in the current transaction.
+
+    The dispatcher is only woken once the transaction commits, so a
+    rollback discards both the notifications and their outbox rows. With
+    broadcast_role the batch is delivered through the role group.
+    """
+    if not notifications:
+        return
+    NotificationOutbox.objects.bulk_create(
+        [
+            NotificationOutbox(notification=notification, broadcast_role=broadcast_role)
+            for notification in notifications
+        ]
+    )
+    schedule_wake()
+
+
+def enqueue_issue_update(issue, changes):
+    """
+    Record a live update of changed issue fields in the current transaction.
+
+    Delivery happens on the dispatcher after commit, so the request never
+    waits on the channel layer.
+    """
+    IssueUpdateOutbox.objects.create(issue=issue, changes=changes)
+    schedule_wake()
+
+
+def schedule_wake():
+    """
+    Wake the dispatcher once the current transaction commits.
+
+    Notifications, counters and digests written in one transaction share
+    a single wake-up instead of registering one callback each.
+    """
+    alias = transaction.get_connection().alias
+    pending = getattr(_PENDING_WAKES, "callbacks", None)
+    if pending is None:
+        pending = _PENDING_WAKES.callbacks = WeakValueDictionary()
+    if alias in pending:
+        return
+    # Only the connection's on-commit list holds the callback, so the weak
+    # entry disappears once it has run or its transaction rolled back.
+    callback = pending[alias] = _WakeOnCommit()
+    transaction.on_commit(callback)
+
+
+class _WakeOnCommit:
+    def __call__(self):
+        wake_dispatcher()
+
+
+def wake_dispatcher():
+    if _setting("NOTIFICATION_OUTBOX_DISPATCHER", "thread") != "thread":
+        # A separate dispatch_notification_outbox process drains the table.
+        return
+    _ensure_dispatcher()
+    _WAKE.set()
+
+
+def _ensure_dispatcher():
+    global _DISPATCHER
+
+    if _DISPATCHER is not None and _DISPATCHER.is_alive():
+        return
+    with _DISPATCHER_LOCK:
+        if _DISPATCHER is None or not _DISPATCHER.is_alive():
+            _DISPATCHER = Thread(target=run_dispatcher, name="notification-outbox", daemon=True)
+            _DISPATCHER.start()
+
+
+def run_dispatcher(stop=None):
+    """
+    Drain the outbox whenever woken, and at least every poll interval for
+    retries and digests whose window has closed.
+    """
+    from .digest import flush_due
+
+    poll_interval = _setting("NOTIFICATION_OUTBOX_POLL_SECONDS", 1.0)
+    while stop is None or not stop.is_set():
+        _WAKE.wait(poll_interval)
+        _WAKE.clear()
+        try:
+            while flush_due() or dispatch_pending() or dispatch_issue_updates() or push_unread_counts():
+                pass
+        except Exception:
+            logger.exception("Notification outbox dispatch failed")
+        finally:
+            close_old_connections()
+
+
+def _backoff(attempts):
+    base = _setting("NOTIFICATION_OUTBOX_RETRY_BASE_SECONDS", 1.0)
+    limit = _setting("NOTIFICATION_OUTBOX_RETRY_MAX_SECONDS", 60.0)
+    return timedelta(seconds=min(limit, base * 2 ** (attempts - 1)))
+
+
+def dispatch_pending(batch_size=None):
+    """
+    Deliver one batch of due outbox entries; returns how many were handled.
+
+    Delivered entries are deleted. A failed batch is rescheduled with
+    exponential backoff, and entries past NOTIFICATION_OUTBOX_MAX_ATTEMPTS
+    are dropped.
+    """
+    entries = _claim(batch_size or _setting("NOTIFICATION_OUTBOX_BATCH_SIZE", 200))
+    if not entries:
+        return 0
+
+    try:
+        _deliver(entries)
+    except Exception as exc:
+        logger.warning("Delivering %s outbox entries failed: %s", len(entries), exc)
+        _reschedule(entries, exc)
+        return len(entries)
+
+    NotificationOutbox.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+    _record_delivery(entries)
+    return len(entries)
+
+
+def dispatch_issue_updates(batch_size=None):
+    """
+    Deliver one batch of due live issue updates; returns how many were handled.
+
+    Retries and drops follow the same rules as dispatch_pending().
+    """
+    entries = _claim(
+        batch_size or _setting("NOTIFICATION_OUTBOX_BATCH_SIZE", 200),
+        model=IssueUpdateOutbox,
+        related="issue",
+    )
+    if not entries:
+        return 0
+
+    try:
+        send_issue_updates([(entry.issue, entry.changes) for entry in entries])
+    except Exception as exc:
+        logger.warning("Delivering %s issue updates failed: %s", len(entries), exc)
+        _reschedule(entries, exc)
+        return len(entries)
+
+    IssueUpdateOutbox.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+    return len(entries)
+
+
+def _claim(batch_size, model=NotificationOutbox, related="notification"):
+    """
+    Lease a batch of due entries to this dispatcher and commit.
+
+    The lease moves next_attempt_at past NOTIFICATION_OUTBOX_CLAIM_SECONDS,
+    so no row lock is held while delivering, and a dispatcher that dies
+    mid-delivery only delays its batch.
+    """
+    max_attempts = _setting("NOTIFICATION_OUTBOX_MAX_ATTEMPTS", 8)
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=_setting("NOTIFICATION_OUTBOX_CLAIM_SECONDS", 30))
+
+    with transaction.atomic():
+        # skip_locked lets several dispatcher processes share the table.
+        entries = list(
+            model.objects.select_for_update(skip_locked=True, of=("self",))
+            .select_related(related)
+            .filter(next_attempt_at__lte=now)
+            .order_by("id")[:batch_size]
+        )
+        # Leases that expired on their last attempt.
+        exhausted = [entry.pk for entry in entries if entry.attempts >= max_attempts]
+        if exhausted:
+            logger.error("Dropping %s outbox entries after %s attempts", len(exhausted), max_attempts)
+            model.objects.filter(pk__in=exhausted).delete()
+            with _STATS_LOCK:
+                _STATS["dropped"] += len(exhausted)
+            entries = [entry for entry in entries if entry.attempts < max_attempts]
+
+        for entry in entries:
+            entry.attempts += 1
+            entry.next_attempt_at = lease_until
+        model.objects.bulk_update(entries, ["attempts", "next_attempt_at"])
+    return entries
+
+
+def push_unread_counts(batch_size=None):
+    """
+    Send the current unread count to owners of dirty counters; returns how many.
+
+    A counter stays dirty if it changed again while being pushed, so the
+    newer value goes out on the next pass.
+    """
+    batch_size = batch_size or _setting("NOTIFICATION_OUTBOX_BATCH_SIZE", 200)
+    counters = list(
+        NotificationCounter.objects.filter(dirty=True)
+        .values_list("user_id", "unread", "version")[:batch_size]
+    )
+    if not counters:
+        return 0
+
+    try:
+        send_unread_counts({user_id: unread for user_id, unread, _ in counters})
+    except Exception as exc:
+        # Counters stay dirty and are retried on the next poll.
+        logger.warning("Pushing %s unread counts failed: %s", len(counters), exc)
+        return 0
+
+    NotificationCounter.objects.filter(user_id__in=[user_id for user_id, _, _ in counters]).update(
+        dirty=Case(
+            *(When(user_id=user_id, version=version, then=False) for user_id, _, version in counters),
+            default=F("dirty"),
+        )
+    )
+    return len(counters)
+
+
+def _deliver(entries):
+    direct = []
+    by_role = defaultdict(list)
+    for entry in entries:
+        if entry.broadcast_role:
+            by_role[entry.broadcast_role].append(entry.notification)
+        else:
+            direct.append(entry.notification)
+
+    if direct:
+        send_realtime_notifications(direct)
+    for role, notifications in by_role.items():
+        broadcast_role_notifications(role, notifications)
+
+
+def _reschedule(entries, exc):
+    max_attempts = _setting("NOTIFICATION_OUTBOX_MAX_ATTEMPTS", 8)
+    now = timezone.now()
+    retry, dropped = [], []
+
+    # attempts was already bumped when the batch was claimed.
+    for entry in entries:
+        entry.last_error = str(exc)[:255]
+        if entry.attempts >= max_attempts:
+            dropped.append(entry.pk)
+        else:
+            entry.next_attempt_at = now + _backoff(entry.attempts)
+            retry.append(entry)
+
+    model = type(entries[0])
+    model.objects.bulk_update(retry, ["attempts", "last_error", "next_attempt_at"])
+    if dropped:
+        logger.error("Dropping %s outbox entries after %s attempts", len(dropped), max_attempts)
+        model.objects.filter(pk__in=dropped).delete()
+
+    with _STATS_LOCK:
+        _STATS["failed_attempts"] += len(entries)
+        _STATS["dropped"] += len(dropped)
+
+
+def _record_delivery(entries):
+    now = timezone.now()
+    lags = [(now - entry.created_at).total_seconds() * 1000 for entry in entries]
+    with _STATS_LOCK:
+        _STATS["delivered"] += len(lags)
+        _STATS["total_lag_ms"] += sum(lags)
+        _STATS["max_lag_ms"] = max(_STATS["max_lag_ms"], *lags)
+        _STATS["last_lag_ms"] = lags[-1]
+
+
+def get_stats():
+    """Delivery counters and commit-to-delivery lag of this process's dispatcher."""
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    total_lag_ms = stats.pop("total_lag_ms")
+    stats["avg_lag_ms"] = total_lag_ms / stats["delivered"] if stats["delivered"] else None
+    stats["pending"] = NotificationOutbox.objects.count()
+    return stats
+
+
+def reset_stats():
+    with _STATS_LOCK:
+        _STATS.update(delivered=0, failed_attempts=0, dropped=0, last_lag_ms=None, max_lag_ms=0.0, total_lag_ms=0.0)
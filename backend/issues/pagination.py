@@ -0,0 +1,109 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPaginationMixin:
+    """
+    Opt-in keyset pagination on (ordering field, id) next to page numbers.
+
+    Requests with ?cursor=... or ?pagination=cursor get a forward-only
+    cursor page: no COUNT(*), no OFFSET, and rows inserted while the client
+    scrolls never shift later pages. Other requests keep the page-number
+    response unchanged.
+    """
+
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    # Orderings allowed in cursor mode; the first is the default.
+    keyset_orderings = ("-created_at",)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        self.keyset = self.cursor_query_param in params or params.get(self.mode_query_param) == "cursor"
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        ordering = self._keyset_ordering(request)
+        field = ordering.lstrip("-")
+        descending = ordering.startswith("-")
+
+        queryset = queryset.order_by(ordering, "-id" if descending else "id")
+        cursor = self._decode_cursor(params.get(self.cursor_query_param), ordering)
+        if cursor is not None:
+            value, pk = cursor
+            lookup = "lt" if descending else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{field}__{lookup}": value}) | Q(**{field: value, f"id__{lookup}": pk})
+            )
+
+        rows = list(queryset[:page_size + 1])
+        page = rows[:page_size]
+        self.next_cursor = None
+        if len(rows) > page_size:
+            last = page[-1]
+            self.next_cursor = self._encode_cursor(getattr(last, field), last.pk, ordering)
+        return page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            "next": self._next_cursor_link(),
+            "results": data,
+        })
+
+    def _keyset_ordering(self, request):
+        requested = request.query_params.get("ordering", "").split(",")[0].strip()
+        return requested if requested in self.keyset_orderings else self.keyset_orderings[0]
+
+    def _next_cursor_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    @staticmethod
+    def _encode_cursor(value, pk, ordering):
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        payload = json.dumps({"o": ordering, "v": value, "id": pk}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(encoded, ordering):
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            value, pk = payload["v"], int(payload["id"])
+            if payload["o"] != ordering:
+                raise ValueError("cursor belongs to a different ordering")
+            if ordering.lstrip("-") == "created_at":
+                value = parse_datetime(value)
+                if value is None:
+                    raise ValueError("bad timestamp")
+            else:
+                # Every other keyset ordering is an integer field.
+                value = int(value)
+        except (TypeError, ValueError, KeyError):
+            raise NotFound("Invalid cursor")
+        return value, pk
+
+
+class IssuePagination(KeysetPaginationMixin, PageNumberPagination):
+    keyset_orderings = ("-created_at", "created_at", "-priority_score", "priority_score")
+
+
+class NotificationPagination(KeysetPaginationMixin, PageNumberPagination):
+    keyset_orderings = ("-created_at", "created_at")
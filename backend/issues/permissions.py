@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from .models import Issue
+
 
 class IsAdminUserRole(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -9,3 +11,25 @@ class IsAdminUserRole(permissions.BasePermission):
 class IsWorkerUserRole(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user.role == 'WORKER'
+
+
+def visible_issues(user):
+    """
+    Issues the user may see: admins all, workers their assignments, users
+    their reports. Rejected reports are hidden from everyone, and reports
+    still awaiting validation only show up for their reporter.
+    """
+    if user.role == 'ADMIN':
+        return Issue.objects.filter(validation_status='VALIDATED')
+    if user.role == 'WORKER':
+        return Issue.objects.filter(assigned_to=user, validation_status='VALIDATED')
+    return Issue.objects.filter(reported_by=user).exclude(validation_status='REJECTED')
+
+
+def can_view_issue(user, reported_by_id, assigned_to_id):
+    """visible_issues() for a single issue, without a query."""
+    if user.role == 'ADMIN':
+        return True
+    if user.role == 'WORKER':
+        return assigned_to_id == user.id
+    return reported_by_id == user.id
@@ -0,0 +1,87 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Notification
+
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _delete_batches(select_ids, batch_size, pause, report):
+    """
+    Delete rows chosen by select_ids(limit) until it returns nothing.
+
+    Each batch is its own short transaction (primary-key DELETE), with a
+    pause in between so the job never holds locks for long.
+    """
+    removed = 0
+    while True:
+        ids = select_ids(batch_size)
+        if not ids:
+            return removed
+        _, per_model = Notification.objects.filter(pk__in=ids).delete()
+        removed += per_model.get(Notification._meta.label, 0)
+        report["batches"] += 1
+        if pause:
+            time.sleep(pause)
+
+
+def prune_notifications(read_days=None, max_per_user=None, batch_size=None, pause=None):
+    """
+    Apply the notification retention policy.
+
+    Deletes read notifications older than read_days, then trims every
+    user to their newest max_per_user notifications (read or not). Either
+    rule is skipped when set to 0. Unread counters are kept in step.
+    Returns counts of removed rows and the elapsed time.
+    """
+    read_days = _setting("NOTIFICATION_RETENTION_READ_DAYS", 90) if read_days is None else read_days
+    max_per_user = _setting("NOTIFICATION_RETENTION_MAX_PER_USER", 500) if max_per_user is None else max_per_user
+    batch_size = batch_size or _setting("NOTIFICATION_RETENTION_BATCH_SIZE", 1000)
+    pause = _setting("NOTIFICATION_RETENTION_PAUSE_SECONDS", 0.1) if pause is None else pause
+
+    started = time.perf_counter()
+    report = {"read_expired": 0, "over_cap": 0, "users_capped": 0, "batches": 0}
+
+    if read_days:
+        cutoff = timezone.now() - timedelta(days=read_days)
+        expired = Notification.objects.filter(is_read=True, created_at__lt=cutoff).order_by("id")
+        report["read_expired"] = _delete_batches(
+            lambda limit: list(expired.values_list("id", flat=True)[:limit]),
+            batch_size,
+            pause,
+            report,
+        )
+
+    if max_per_user:
+        over_cap = (
+            Notification.objects.order_by()
+            .values("user_id")
+            .annotate(total=Count("id"))
+            .filter(total__gt=max_per_user)
+            .values_list("user_id", flat=True)
+        )
+        for user_id in list(over_cap):
+            # Everything past the newest max_per_user rows, walked on the (user, created_at, id) index.
+            newest_first = Notification.objects.filter(user_id=user_id).order_by("-created_at", "-id")
+            report["over_cap"] += _delete_batches(
+                lambda limit: list(newest_first.values_list("id", flat=True)[max_per_user:max_per_user + limit]),
+                batch_size,
+                pause,
+                report,
+            )
+            report["users_capped"] += 1
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    logger.info("Notification retention removed %s read and %s over-cap rows in %ss",
+                report["read_expired"], report["over_cap"], report["seconds"])
+    return report
@@ -107,6 +107,8 @@ class IssueSerializer(serializers.ModelSerializer):
             'image_url',
             'ai_prediction',
             'ai_confidence',
+            'validation_status',
+            'validation_message',
             'category',
             'status',
             'latitude',
@@ -121,6 +123,8 @@ class IssueSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'ai_prediction',
             'ai_confidence',
+            'validation_status',
+            'validation_message',
             'priority_score',
             'reported_by',
             'created_at'
@@ -0,0 +1,95 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .analytics import record_issue_change
+from .authentication import invalidate_cached_user
+from .clustering import apply_cluster_delta
+from . import dashboard, unread
+from .models import Issue, Notification, User
+from .notifications import invalidate_role_recipients
+
+
+@receiver(pre_save, sender=Issue)
+def capture_previous_issue_state(sender, instance, **kwargs):
+    if instance.pk is None or kwargs.get('raw'):
+        instance._previous_state = None
+        return
+
+    state = getattr(instance, '_loaded_state', None)
+    if state is None or None in state.values():
+        # Deferred or unsaved-in-this-process instance: read what is stored.
+        state = (
+            Issue.objects.filter(pk=instance.pk)
+            .values('latitude', 'longitude', 'category', 'status', 'validation_status')
+            .first()
+        )
+    instance._previous_state = state
+
+
+def _counted(state):
+    """Aggregates only include accepted issues; anything else counts as absent."""
+    if state is None or state['validation_status'] != 'VALIDATED':
+        return None
+    return state
+
+
+@receiver(post_save, sender=Issue)
+def update_issue_aggregates(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+
+    previous = None if created else getattr(instance, '_previous_state', None)
+    current = instance.tracked_state()
+
+    update_fields = kwargs.get('update_fields')
+    if previous is not None and update_fields is not None:
+        # Only the listed fields reached the database.
+        current = {
+            field: value if field in update_fields else previous[field]
+            for field, value in current.items()
+        }
+
+    instance._loaded_state = current
+
+    previous, current = _counted(previous), _counted(current)
+    if previous != current:
+        if previous is not None:
+            apply_cluster_delta(previous, -1)
+        if current is not None:
+            apply_cluster_delta(current, 1)
+        dashboard.record_change(previous, current)
+        record_issue_change(previous, current, instance.created_at)
+
+
+@receiver(post_delete, sender=Issue)
+def remove_issue_aggregates(sender, instance, **kwargs):
+    state = _counted(instance.tracked_state())
+    if state is None:
+        return
+    apply_cluster_delta(state, -1)
+    dashboard.record_change(state, None)
+    record_issue_change(state, None, instance.created_at)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def reset_role_recipients(sender, **kwargs):
+    # Role changes, new admins and deletions all change the recipient set.
+    invalidate_role_recipients()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def reset_cached_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=Notification)
+def update_unread_counter(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+
+    previous = True if created else getattr(instance, '_loaded_is_read', instance.is_read)
+    if previous != instance.is_read:
+        unread.apply_deltas({instance.user_id: -1 if instance.is_read else 1})
+    instance._loaded_is_read = instance.is_read
@@ -1,12 +1,73 @@
-from unittest.mock import patch
+import io
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import skipUnless
+from unittest.mock import AsyncMock, patch
 
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
-from .models import Issue, Notification, User
+from . import digest, outbox, unread
+from .authentication import get_cached_user
+from .checks import check_shared_cache
+from .models import (
+    ClassificationCacheEntry,
+    Issue,
+    IssueRollup,
+    IssueUpdateOutbox,
+    Notification,
+    NotificationCounter,
+    NotificationDigest,
+    NotificationOutbox,
+    User,
+)
+from .consumers import IssueUpdatesConsumer, NotificationConsumer
+from .middleware import get_user
+from .notifications import notify_role, notify_users, role_digest_windows, role_recipient_ids
+from .pagination import IssuePagination
+from .retention import prune_notifications
+from .utils import ai_validator, result_cache
+from .utils.geo import haversine, haversine_many
+from .utils.inference_pool import InferencePool
+from .validation import validate_issue
+from .websocket import (
+    _notification_event,
+    broadcast_role_notifications,
+    send_issue_update,
+    send_realtime_notification,
+)
 
 
+TEST_MEDIA_ROOT = tempfile.mkdtemp(prefix="civiceye-test-media-")
+
+
+def make_image_bytes(color="red", size=(64, 64), image_format="PNG"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def make_upload(color="red", name="issue.png"):
+    return SimpleUploadedFile(name, make_image_bytes(color), content_type="image/png")
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
 class IssueNotificationFlowTests(APITestCase):
     def setUp(self):
         self.admin_1 = User.objects.create_user(
@@ -32,8 +93,9 @@ class IssueNotificationFlowTests(APITestCase):
 
         self.issues_url = reverse("issues-list")
 
-    @patch("issues.views.send_realtime_notification")
-    def test_new_issue_by_user_notifies_all_admins(self, mock_realtime):
+    @patch("issues.views.predict_issue_image", return_value=("pothole", 0.92))
+    @patch("issues.outbox.broadcast_role_notifications")
+    def test_new_issue_by_user_notifies_all_admins(self, mock_realtime, mock_predict):
         self.client.force_authenticate(user=self.reporter)
         payload = {
             "title": "Road damage",
@@ -41,9 +103,10 @@ class IssueNotificationFlowTests(APITestCase):
             "category": "POTHOLE",
             "latitude": 22.72,
             "longitude": 75.86,
+            "image": make_upload(),
         }
 
-        response = self.client.post(self.issues_url, payload, format="json")
+        response = self.client.post(self.issues_url, payload, format="multipart")
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
@@ -51,9 +114,16 @@ class IssueNotificationFlowTests(APITestCase):
             user__in=[self.admin_1, self.admin_2]
         )
         self.assertEqual(admin_notifications.count(), 2)
-        self.assertEqual(mock_realtime.call_count, 2)
+        outbox.dispatch_pending()
+        mock_realtime.assert_called_once()
+        role, notifications = mock_realtime.call_args.args
+        self.assertEqual(role, "ADMIN")
+        self.assertCountEqual(
+            [notification.user_id for notification in notifications],
+            [self.admin_1.id, self.admin_2.id],
+        )
 
-    @patch("issues.views.send_realtime_notification")
+    @patch("issues.outbox.send_realtime_notifications")
     def test_admin_assignment_notifies_assigned_worker(self, mock_realtime):
         issue = Issue.objects.create(
             title="Broken street light",
@@ -77,9 +147,10 @@ class IssueNotificationFlowTests(APITestCase):
         worker_notifications = Notification.objects.filter(user=self.worker)
         self.assertEqual(worker_notifications.count(), 1)
         self.assertIn("assigned issue", worker_notifications.first().message)
+        outbox.dispatch_pending()
         self.assertEqual(mock_realtime.call_count, 1)
 
-    @patch("issues.views.send_realtime_notification")
+    @patch("issues.outbox.broadcast_role_notifications")
     def test_worker_mark_completed_notifies_all_admins(self, mock_realtime):
         issue = Issue.objects.create(
             title="Garbage overflow",
@@ -109,9 +180,16 @@ class IssueNotificationFlowTests(APITestCase):
             message__icontains="COMPLETED",
         )
         self.assertEqual(admin_notifications.count(), 2)
-        self.assertEqual(mock_realtime.call_count, 2)
+        outbox.dispatch_pending()
+        mock_realtime.assert_called_once()
+        role, notifications = mock_realtime.call_args.args
+        self.assertEqual(role, "ADMIN")
+        self.assertCountEqual(
+            [notification.user_id for notification in notifications],
+            [self.admin_1.id, self.admin_2.id],
+        )
 
-    @patch("issues.views.send_realtime_notification")
+    @patch("issues.outbox.send_realtime_notifications")
     def test_admin_mark_resolved_notifies_original_reporter(self, mock_realtime):
         issue = Issue.objects.create(
             title="Water leakage",
@@ -136,4 +214,1577 @@ class IssueNotificationFlowTests(APITestCase):
         reporter_notifications = Notification.objects.filter(user=self.reporter)
         self.assertEqual(reporter_notifications.count(), 1)
         self.assertIn("resolved by admin", reporter_notifications.first().message)
+        outbox.dispatch_pending()
         self.assertEqual(mock_realtime.call_count, 1)
+
+
+class DashboardStatsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username="admin1", password="pass1234", role="ADMIN")
+        self.reporter = User.objects.create_user(username="user1", password="pass1234", role="USER")
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse("dashboard-stats")
+        for category, issue_status in (("POTHOLE", "PENDING"), ("POTHOLE", "RESOLVED"), ("WATER", "PENDING")):
+            self._create_issue(category, issue_status)
+
+    def _create_issue(self, category, issue_status, validation_status="VALIDATED"):
+        return Issue.objects.create(
+            title="Issue",
+            description="Reported issue",
+            category=category,
+            status=issue_status,
+            validation_status=validation_status,
+            latitude=22.72,
+            longitude=75.86,
+            reported_by=self.reporter,
+        )
+
+    def _stats(self, queries, **params):
+        with self.assertNumQueries(queries):
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_stats_are_computed_in_one_query_then_cached(self):
+        stats = self._stats(1)
+        self.assertEqual((stats["total"], stats["pending"], stats["resolved"]), (3, 2, 1))
+        self.assertEqual(
+            stats["issues_by_category"],
+            [{"category": "POTHOLE", "count": 2}, {"category": "WATER", "count": 1}],
+        )
+        self.assertEqual(self._stats(0)["total"], 3)
+        self.assertEqual(self._stats(1, fresh=1)["total"], 3)
+
+    def test_issue_changes_update_cached_snapshot(self):
+        self._stats(1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            issue = self._create_issue("TRAFFIC", "PENDING")
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.status = "IN_PROGRESS"
+            issue.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            Issue.objects.filter(category="WATER").first().delete()
+
+        stats = self._stats(0)
+        self.assertEqual(
+            (stats["total"], stats["pending"], stats["in_progress"], stats["resolved"]),
+            (3, 1, 1, 1),
+        )
+        self.assertEqual(stats, {**self._stats(1, fresh=1), "computed_at": stats["computed_at"]})
+
+    def test_deploy_check_requires_shared_cache(self):
+        self.assertEqual([warning.id for warning in check_shared_cache(None)], ["issues.W001"])
+
+        redis_cache = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://"}}
+        with override_settings(CACHES=redis_cache):
+            self.assertEqual(check_shared_cache(None), [])
+
+    def test_pending_and_rejected_issues_are_not_counted(self):
+        self._create_issue("TRAFFIC", "PENDING", validation_status="REJECTED")
+        self.assertEqual(self._stats(1)["total"], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            issue = self._create_issue("TRAFFIC", "PENDING", validation_status="PENDING_VALIDATION")
+        self.assertEqual(self._stats(0)["total"], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.validation_status = "VALIDATED"
+            issue.save(update_fields=["validation_status"])
+        stats = self._stats(0)
+        self.assertEqual((stats["total"], stats["pending"]), (4, 3))
+        self.assertEqual(stats, {**self._stats(1, fresh=1), "computed_at": stats["computed_at"]})
+
+    def test_only_admins_can_view(self):
+        self.client.force_authenticate(user=self.reporter)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class IssueAnalyticsTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin1", password="pass1234", role="ADMIN")
+        self.reporter = User.objects.create_user(username="user1", password="pass1234", role="USER")
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse("analytics-timeseries")
+        self.issues = [self._create_issue(category) for category in ("POTHOLE", "POTHOLE", "WATER")]
+
+    def _create_issue(self, category, validation_status="VALIDATED"):
+        return Issue.objects.create(
+            title="Issue",
+            description="Reported issue",
+            category=category,
+            status="PENDING",
+            validation_status=validation_status,
+            latitude=22.72,
+            longitude=75.86,
+            reported_by=self.reporter,
+        )
+
+    def _today(self, queries=3, **params):
+        with self.assertNumQueries(queries):
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["series"][-1]
+
+    def test_rollups_follow_creation_and_completion(self):
+        issue = self.issues[0]
+        Issue.objects.filter(pk=issue.pk).update(created_at=timezone.now() - timedelta(hours=3))
+        issue.refresh_from_db()
+        issue.status = "COMPLETED"
+        issue.save()
+
+        today = self._today()
+        self.assertEqual(today["created"], 3)
+        self.assertEqual(today["created_by_category"], {"POTHOLE": 2, "WATER": 1})
+        self.assertEqual(today["entered_by_status"], {"PENDING": 3, "COMPLETED": 1})
+        self.assertEqual(today["backlog"], 2)
+        self.assertEqual(today["completed"], 1)
+        self.assertEqual(today["median_completion_hours"], 3.0)
+
+        self.assertEqual(self._today(category="WATER")["backlog"], 1)
+
+    def test_issues_count_once_validated(self):
+        pending = self._create_issue("TRAFFIC", validation_status="PENDING_VALIDATION")
+        self._create_issue("TRAFFIC", validation_status="REJECTED")
+        self.assertEqual(self._today()["created"], 3)
+
+        pending.validation_status = "VALIDATED"
+        pending.save(update_fields=["validation_status"])
+
+        today = self._today()
+        self.assertEqual(today["created_by_category"], {"POTHOLE": 2, "WATER": 1, "TRAFFIC": 1})
+        self.assertEqual(today["backlog"], 4)
+
+    def test_backfill_rebuilds_rollups_from_issues(self):
+        IssueRollup.objects.all().delete()
+
+        stdout = io.StringIO()
+        call_command("backfill_issue_rollups", stdout=stdout)
+
+        self.assertIn("Rebuilt 4 rollup rows.", stdout.getvalue())
+        today = self._today(granularity="hour")
+        self.assertEqual((today["created"], today["backlog"]), (3, 3))
+
+    def test_backfill_keeps_tracked_transitions_unless_reset(self):
+        issue = self.issues[2]
+        issue.status = "IN_PROGRESS"
+        issue.save()
+
+        stdout = io.StringIO()
+        call_command("backfill_issue_rollups", stdout=stdout)
+        self.assertIn("Rebuilt 0 rollup rows.", stdout.getvalue())
+        self.assertEqual(self._today()["entered_by_status"], {"PENDING": 3, "IN_PROGRESS": 1})
+
+        call_command("backfill_issue_rollups", "--reset", stdout=stdout)
+        self.assertEqual(self._today()["entered_by_status"], {"PENDING": 2, "IN_PROGRESS": 1})
+
+    def test_rejects_bad_ranges_and_non_admins(self):
+        response = self.client.get(self.url, {"granularity": "hour", "start": "2020-01-01", "end": "2021-01-01"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {"start": "last week"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.reporter)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class NearbyIssuesTests(APITestCase):
+    def setUp(self):
+        self.reporter = User.objects.create_user(
+            username="user1",
+            password="pass1234",
+            role="USER",
+        )
+        self.nearby_url = reverse("nearby-issues")
+
+    def _create_issue(self, title, latitude, longitude, validation_status="VALIDATED"):
+        return Issue.objects.create(
+            title=title,
+            description="Reported near the market",
+            category="POTHOLE",
+            validation_status=validation_status,
+            latitude=latitude,
+            longitude=longitude,
+            reported_by=self.reporter,
+        )
+
+    def test_geohash_is_kept_in_sync_on_save(self):
+        issue = self._create_issue("Pothole", 22.72, 75.86)
+        first_hash = issue.geohash
+        self.assertEqual(len(first_hash), 9)
+
+        issue.latitude = 22.80
+        issue.save(update_fields=["latitude"])
+        issue.refresh_from_db()
+        self.assertNotEqual(issue.geohash, first_hash)
+
+    def test_nearby_returns_issues_within_radius_sorted_by_distance(self):
+        far = self._create_issue("Far", 22.90, 75.86)
+        mid = self._create_issue("Mid", 22.74, 75.86)
+        near = self._create_issue("Near", 22.721, 75.861)
+        self._create_issue("Other city", 19.07, 72.87)
+
+        self.client.force_authenticate(user=self.reporter)
+        response = self.client.get(self.nearby_url, {"lat": 22.72, "lng": 75.86, "radius": 5})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in response.data], [near.id, mid.id])
+        self.assertNotIn(far.id, [item["id"] for item in response.data])
+
+    def test_nearby_skips_unvalidated_issues(self):
+        near = self._create_issue("Near", 22.721, 75.861)
+        self._create_issue("Pending", 22.721, 75.861, validation_status="PENDING_VALIDATION")
+        self._create_issue("Rejected", 22.721, 75.861, validation_status="REJECTED")
+
+        self.client.force_authenticate(user=self.reporter)
+        response = self.client.get(self.nearby_url, {"lat": 22.72, "lng": 75.86, "radius": 5})
+
+        self.assertEqual([item["id"] for item in response.data], [near.id])
+
+    def test_nearby_matches_python_haversine(self):
+        points = [(22.72 + i * 0.01, 75.86 - i * 0.013) for i in range(-8, 9)]
+        for index, (lat, lng) in enumerate(points):
+            self._create_issue(f"Issue {index}", lat, lng)
+
+        expected = {
+            issue.id
+            for issue in Issue.objects.all()
+            if haversine(22.72, 75.86, issue.latitude, issue.longitude) <= 7
+        }
+
+        self.client.force_authenticate(user=self.reporter)
+        response = self.client.get(self.nearby_url, {"lat": 22.72, "lng": 75.86, "radius": 7})
+
+        self.assertEqual({item["id"] for item in response.data}, expected)
+
+    def test_vectorized_haversine_matches_scalar(self):
+        points = [(22.72 + i * 0.5, 75.86 - i * 0.7) for i in range(-4, 5)]
+        distances = haversine_many(22.72, 75.86, *zip(*points))
+
+        for (lat, lng), distance in zip(points, distances):
+            self.assertAlmostEqual(distance, haversine(22.72, 75.86, lat, lng), places=9)
+        # Indore to Mumbai is roughly 510 km as the crow flies.
+        self.assertAlmostEqual(haversine(22.72, 75.86, 19.07, 72.87), 510, delta=15)
+
+    def test_nearby_rejects_invalid_parameters(self):
+        self.client.force_authenticate(user=self.reporter)
+        response = self.client.get(self.nearby_url, {"lat": "abc", "lng": 75.86})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class IssueClustersTests(APITestCase):
+    def setUp(self):
+        self.reporter = User.objects.create_user(
+            username="user1",
+            password="pass1234",
+            role="USER",
+        )
+        self.clusters_url = reverse("issue-clusters")
+        self.viewport = {
+            "min_lat": 22.6,
+            "min_lng": 75.7,
+            "max_lat": 22.8,
+            "max_lng": 75.95,
+        }
+
+    def _create_issue(self, category, latitude, longitude, issue_status="PENDING", validation_status="VALIDATED"):
+        return Issue.objects.create(
+            title="Issue",
+            description="Reported near the market",
+            category=category,
+            status=issue_status,
+            validation_status=validation_status,
+            latitude=latitude,
+            longitude=longitude,
+            reported_by=self.reporter,
+        )
+
+    def _get_clusters(self, zoom):
+        self.client.force_authenticate(user=self.reporter)
+        response = self.client.get(self.clusters_url, {**self.viewport, "zoom": zoom})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["clusters"]
+
+    def test_clusters_aggregate_count_centroid_and_breakdown(self):
+        self._create_issue("POTHOLE", 22.72, 75.86)
+        self._create_issue("GARBAGE", 22.74, 75.88, issue_status="IN_PROGRESS")
+
+        clusters = self._get_clusters(zoom=5)
+
+        self.assertEqual(len(clusters), 1)
+        cluster = clusters[0]
+        self.assertEqual(cluster["count"], 2)
+        self.assertAlmostEqual(cluster["latitude"], 22.73)
+        self.assertAlmostEqual(cluster["longitude"], 75.87)
+        self.assertEqual(cluster["by_category"], {"POTHOLE": 1, "GARBAGE": 1})
+        self.assertEqual(cluster["by_status"], {"PENDING": 1, "IN_PROGRESS": 1})
+
+    def test_status_change_and_delete_update_clusters_incrementally(self):
+        issue = self._create_issue("POTHOLE", 22.72, 75.86)
+
+        issue.status = "COMPLETED"
+        issue.save(update_fields=["status"])
+        self.assertEqual(self._get_clusters(zoom=5)[0]["by_status"], {"COMPLETED": 1})
+
+        issue.delete()
+        self.assertEqual(self._get_clusters(zoom=5), [])
+
+    def test_issues_join_clusters_once_validated(self):
+        self._create_issue("POTHOLE", 22.72, 75.86, validation_status="REJECTED")
+        pending = self._create_issue("GARBAGE", 22.72, 75.86, validation_status="PENDING_VALIDATION")
+        self.assertEqual(self._get_clusters(zoom=5), [])
+
+        pending.validation_status = "VALIDATED"
+        pending.save(update_fields=["validation_status"])
+        self.assertEqual(self._get_clusters(zoom=5)[0]["by_category"], {"GARBAGE": 1})
+
+        call_command("rebuild_issue_clusters", stdout=io.StringIO())
+        self.assertEqual(self._get_clusters(zoom=5)[0]["by_category"], {"GARBAGE": 1})
+
+    def test_viewport_too_large_for_zoom_is_rejected(self):
+        self.viewport = {"min_lat": -60, "min_lng": -170, "max_lat": 60, "max_lng": 170}
+        self.client.force_authenticate(user=self.reporter)
+        response = self.client.get(self.clusters_url, {**self.viewport, "zoom": 16})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FakeClassifier:
+    """Labels red images as potholes and everything else as garbage."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, images, candidate_labels, **kwargs):
+        self.batch_sizes.append(len(images))
+        results = []
+        for image in images:
+            red = image.getpixel((0, 0))[0] > 128
+            label = ai_validator._CATEGORY_PROMPTS["pothole" if red else "garbage"]
+            results.append([
+                {"label": label, "score": 0.9},
+                {"label": candidate_labels[-1], "score": 0.1},
+            ])
+        return results
+
+
+@override_settings(AI_RESULT_CACHE_MAX_ENTRIES=0)
+class InferenceBatcherTests(SimpleTestCase):
+    def test_concurrent_requests_share_one_batched_call(self):
+        classifier = FakeClassifier()
+        batcher = ai_validator._InferenceBatcher(window_ms=500, max_batch_size=4)
+        images = [make_image_bytes("red"), make_image_bytes("blue")] * 2
+
+        with patch.object(ai_validator, "_BATCHER", batcher), \
+                patch.object(ai_validator, "_get_pipeline", return_value=classifier):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(
+                    lambda data: ai_validator.predict_issue_image(io.BytesIO(data)),
+                    images,
+                ))
+
+        self.assertEqual(classifier.batch_sizes, [4])
+        self.assertEqual([category for category, _ in results], ["pothole", "garbage"] * 2)
+        stats = batcher.stats()
+        self.assertEqual(stats["batches"], 1)
+        self.assertEqual(stats["max_batch_size"], 4)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_use_batcher_restores_and_closes_it(self):
+        classifier = FakeClassifier()
+        previous = ai_validator._BATCHER
+
+        with ai_validator.use_pipeline(classifier), \
+                ai_validator.use_batcher(ai_validator.make_batcher(window_ms=50, max_batch_size=4)) as batcher:
+            category, _ = ai_validator.predict_issue_image(io.BytesIO(make_image_bytes("red")), use_cache=False)
+            worker = batcher._worker
+
+        self.assertEqual(category, "pothole")
+        self.assertFalse(worker.is_alive())
+        self.assertIs(ai_validator._BATCHER, previous)
+
+    def test_failed_image_does_not_fail_rest_of_batch(self):
+        classifier = FakeClassifier()
+
+        def flaky(images, candidate_labels, **kwargs):
+            if any(image.size == (32, 32) for image in images):
+                raise RuntimeError("bad tensor shape")
+            return classifier(images, candidate_labels, **kwargs)
+
+        with patch.object(ai_validator, "_get_pipeline", return_value=flaky):
+            results = ai_validator._run_inference([
+                Image.new("RGB", (64, 64), "red"),
+                Image.new("RGB", (32, 32), "red"),
+            ])
+
+        self.assertEqual(results[0][0]["label"], ai_validator._CATEGORY_PROMPTS["pothole"])
+        self.assertIsInstance(results[1], ai_validator.AIValidationError)
+
+
+try:
+    import torch
+    from transformers import CLIPConfig, CLIPImageProcessor, CLIPModel
+except ImportError:  # pragma: no cover - AI extras are optional for the API tests
+    torch = None
+
+
+class TinyClipTokenizer:
+    """Deterministic stand-in for the CLIP tokenizer (no vocab download)."""
+
+    def __call__(self, texts, padding=True, return_tensors="pt"):
+        encoded = [
+            [1] + [3 + sum(map(ord, word)) % 90 for word in text.split()] + [2]
+            for text in texts
+        ]
+        width = max(len(ids) for ids in encoded)
+        input_ids = [ids + [0] * (width - len(ids)) for ids in encoded]
+        attention_mask = [[1] * len(ids) + [0] * (width - len(ids)) for ids in encoded]
+        return {
+            "input_ids": torch.tensor(input_ids),
+            "attention_mask": torch.tensor(attention_mask),
+        }
+
+
+@skipUnless(torch is not None, "torch/transformers are not installed")
+class CachedTextEmbeddingTests(SimpleTestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        config = CLIPConfig(
+            text_config={
+                "hidden_size": 32, "intermediate_size": 37, "num_attention_heads": 4,
+                "num_hidden_layers": 2, "vocab_size": 99, "eos_token_id": 2,
+            },
+            vision_config={
+                "hidden_size": 32, "intermediate_size": 37, "num_attention_heads": 4,
+                "num_hidden_layers": 2, "image_size": 30, "patch_size": 6,
+            },
+            projection_dim=16,
+        )
+        self.classifier = SimpleNamespace(
+            model=CLIPModel(config).eval(),
+            tokenizer=TinyClipTokenizer(),
+            image_processor=CLIPImageProcessor(size={"shortest_edge": 30}, crop_size=30),
+        )
+        self.images = [Image.new("RGB", (40, 40), "red"), Image.new("RGB", (40, 40), "gray")]
+
+        patcher = patch.object(ai_validator, "_TEXT_EMBEDDINGS", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_matches_full_clip_forward_pass(self):
+        labels = list(ai_validator._CATEGORY_PROMPTS.values())
+
+        with patch.object(ai_validator, "_get_pipeline", return_value=self.classifier):
+            results = ai_validator._run_inference(self.images)
+
+        texts = [ai_validator._HYPOTHESIS_TEMPLATE.format(label) for label in labels]
+        with torch.no_grad():
+            outputs = self.classifier.model(
+                **self.classifier.tokenizer(texts),
+                pixel_values=self.classifier.image_processor(images=self.images, return_tensors="pt")["pixel_values"],
+            )
+        expected = outputs.logits_per_image.softmax(dim=-1)
+
+        for row, result in zip(expected, results):
+            scores = {item["label"]: item["score"] for item in result}
+            for label, score in zip(labels, row.tolist()):
+                self.assertAlmostEqual(scores[label], score, places=5)
+
+    def test_text_tower_runs_once_until_prompts_change(self):
+        model = self.classifier.model
+
+        with patch.object(ai_validator, "_get_pipeline", return_value=self.classifier), \
+                patch.object(model, "get_text_features", wraps=model.get_text_features) as text_tower:
+            ai_validator._run_inference(self.images[:1])
+            ai_validator._run_inference(self.images[1:])
+            self.assertEqual(text_tower.call_count, 1)
+
+            with patch.dict(ai_validator._CATEGORY_PROMPTS, {"other": "a flooded street"}):
+                result = ai_validator._run_inference(self.images[:1])
+            self.assertEqual(text_tower.call_count, 2)
+            self.assertIn("a flooded street", {item["label"] for item in result[0]})
+
+
+class NotificationFanOutTests(TestCase):
+    def setUp(self):
+        self.admins = [
+            User.objects.create_user(username=f"admin{index}", password="pass1234", role="ADMIN")
+            for index in range(3)
+        ]
+
+    @patch("issues.outbox.send_realtime_notifications")
+    def test_bulk_fan_out_keeps_per_user_payload(self, mock_realtime):
+        recipients = role_recipient_ids("ADMIN")
+        # Savepoint, one INSERT each for notifications and outbox, counter
+        # upsert and increment, release.
+        with self.assertNumQueries(6):
+            notifications = notify_users(recipients, "New issue reported")
+
+        self.assertEqual(Notification.objects.filter(message="New issue reported").count(), 3)
+        outbox.dispatch_pending()
+        mock_realtime.assert_called_once_with(notifications)
+        event = _notification_event(notifications[0])
+        self.assertEqual(event["type"], "send_notification")
+        self.assertEqual(
+            set(event["notification"]),
+            {"id", "message", "is_read", "issue_ids", "created_at"},
+        )
+        self.assertIsNotNone(event["notification"]["id"])
+
+    @patch("issues.outbox.send_realtime_notifications")
+    @patch("issues.outbox.broadcast_role_notifications")
+    def test_role_notification_is_one_broadcast(self, mock_broadcast, mock_realtime):
+        notifications = notify_role("ADMIN", "New issue reported")
+
+        self.assertEqual(len(notifications), 3)
+        self.assertEqual(
+            set(NotificationOutbox.objects.values_list("broadcast_role", flat=True)),
+            {"ADMIN"},
+        )
+        outbox.dispatch_pending()
+        mock_broadcast.assert_called_once_with("ADMIN", notifications)
+        mock_realtime.assert_not_called()
+
+    @patch("issues.outbox.send_realtime_notifications")
+    def test_backend_without_bulk_insert_ids_still_queues_every_notification(self, mock_realtime):
+        recipients = [admin.id for admin in self.admins]
+        with patch.object(connection.features, "can_return_rows_from_bulk_insert", False):
+            notifications = notify_users(recipients, "New issue reported")
+
+        self.assertTrue(all(notification.pk for notification in notifications))
+        self.assertCountEqual(
+            NotificationOutbox.objects.values_list("notification_id", flat=True),
+            [notification.pk for notification in notifications],
+        )
+        self.assertEqual(
+            dict(NotificationCounter.objects.values_list("user_id", "unread")),
+            {user_id: 1 for user_id in recipients},
+        )
+
+    def test_admin_recipients_are_cached_until_users_change(self):
+        role_recipient_ids("ADMIN")
+        with self.assertNumQueries(0):
+            self.assertCountEqual(role_recipient_ids("ADMIN"), [admin.id for admin in self.admins])
+
+        new_admin = User.objects.create_user(username="admin9", password="pass1234", role="ADMIN")
+        self.assertIn(new_admin.id, role_recipient_ids("ADMIN"))
+
+        new_admin.role = "USER"
+        new_admin.save()
+        self.assertNotIn(new_admin.id, role_recipient_ids("ADMIN"))
+
+
+class RoleBroadcastTests(SimpleTestCase):
+    async def _connect(self, user_id, role):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), "/ws/notifications/")
+        communicator.scope["user"] = SimpleNamespace(id=user_id, role=role, is_anonymous=False)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_role_broadcast_delivers_each_user_their_own_payload(self):
+        admin_1 = await self._connect(1, "ADMIN")
+        admin_2 = await self._connect(2, "ADMIN")
+        worker = await self._connect(3, "WORKER")
+        created_at = timezone.now()
+        notifications = [
+            Notification(id=10 + user_id, user_id=user_id, message="New issue", created_at=created_at)
+            for user_id in (1, 2)
+        ]
+
+        await sync_to_async(broadcast_role_notifications)("ADMIN", notifications)
+
+        for communicator, notification in ((admin_1, notifications[0]), (admin_2, notifications[1])):
+            self.assertEqual(
+                await communicator.receive_json_from(),
+                _notification_event(notification)["notification"],
+            )
+        self.assertTrue(await worker.receive_nothing())
+
+        for communicator in (admin_1, admin_2, worker):
+            await communicator.disconnect()
+
+    def test_role_broadcast_sends_shared_payload_once(self):
+        created_at = timezone.now()
+        notifications = [
+            Notification(id=notification_id, user_id=user_id, message=message, created_at=created_at)
+            for notification_id, user_id, message in ((21, 1, "New issue"), (22, 2, "New issue"), (23, 1, "Completed"))
+        ]
+
+        with patch("issues.websocket.get_channel_layer") as get_layer:
+            group_send = get_layer.return_value.group_send = AsyncMock()
+            broadcast_role_notifications("ADMIN", notifications)
+
+        events = [call.args[1] for call in group_send.await_args_list]
+        self.assertEqual([event["notification"]["message"] for event in events], ["New issue", "Completed"])
+        self.assertEqual([event["ids"] for event in events], [{"1": 21, "2": 22}, {"1": 23}])
+
+
+try:
+    import fakeredis
+    from channels_redis.core import RedisChannelLayer
+except ImportError:  # pragma: no cover - the Redis channel layer is optional in development
+    fakeredis = None
+
+
+def fake_redis_channel_layer(server):
+    return {
+        "BACKEND": "channels_redis.core.RedisChannelLayer",
+        "CONFIG": {"hosts": [{"connection_class": fakeredis.aioredis.FakeConnection, "server": server}]},
+    }
+
+
+@skipUnless(fakeredis is not None, "fakeredis/channels-redis are not installed")
+class MultiProcessChannelLayerTests(SimpleTestCase):
+    """Two layer instances sharing one Redis server stand in for two daphne processes."""
+
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        override = override_settings(CHANNEL_LAYERS={"default": fake_redis_channel_layer(server)})
+        override.enable()
+        self.addCleanup(override.disable)
+
+        # Sockets connect through the default layer; sends go through this one.
+        self.other_process = RedisChannelLayer(**fake_redis_channel_layer(server)["CONFIG"])
+        patcher = patch("issues.websocket.get_channel_layer", return_value=self.other_process)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def _connect(self, user_id, role):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), "/ws/notifications/")
+        communicator.scope["user"] = SimpleNamespace(id=user_id, role=role, is_anonymous=False)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_notification_reaches_socket_held_by_another_process(self):
+        communicator = await self._connect(1, "USER")
+        notification = Notification(id=7, user_id=1, message="Issue resolved", created_at=timezone.now())
+
+        await sync_to_async(send_realtime_notification)(1, notification)
+
+        self.assertEqual(
+            await communicator.receive_json_from(timeout=2),
+            _notification_event(notification)["notification"],
+        )
+        await communicator.disconnect()
+
+    async def test_role_broadcast_reaches_sockets_held_by_another_process(self):
+        admin = await self._connect(1, "ADMIN")
+        worker = await self._connect(2, "WORKER")
+        notification = Notification(id=8, user_id=1, message="New issue", created_at=timezone.now())
+
+        await sync_to_async(broadcast_role_notifications)("ADMIN", [notification])
+
+        self.assertEqual(
+            await admin.receive_json_from(timeout=2),
+            _notification_event(notification)["notification"],
+        )
+        self.assertTrue(await worker.receive_nothing())
+
+        for communicator in (admin, worker):
+            await communicator.disconnect()
+
+
+class CachedUserAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="admin1", password="pass1234", role="ADMIN")
+        token = AccessToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.url = reverse("notifications-unread-count")
+
+    def test_repeat_requests_skip_user_lookup(self):
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_user_changes_invalidate_cache(self):
+        self.client.get(self.url)
+        self.user.role = "WORKER"
+        self.user.save()
+
+        self.assertEqual(get_cached_user(self.user.id).role, "WORKER")
+
+        self.user.delete()
+        self.assertIsNone(get_cached_user(self.user.id))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cache_holds_no_password_hash(self):
+        self.client.get(self.url)
+
+        cached = cache.get(f"issues:auth-user:{self.user.id}")
+        self.assertEqual(set(cached), {"id", "username", "role", "is_active", "token_version"})
+        self.assertNotIn(self.user.password, cached.values())
+
+        user = get_cached_user(self.user.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, self.user.email)
+
+    def test_password_change_revokes_tokens_of_cached_user(self):
+        with override_settings(SIMPLE_JWT={**settings.SIMPLE_JWT, "CHECK_REVOKE_TOKEN": True}):
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+            self.user.set_password("changed1234")
+            self.user.save()
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_websocket_user_lookup_is_cached(self):
+        self.assertEqual(async_to_sync(get_user)(self.user.id), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(async_to_sync(get_user)(self.user.id).role, "ADMIN")
+        self.assertTrue(async_to_sync(get_user)(999).is_anonymous)
+
+
+class UnreadCounterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user1", password="pass1234", role="USER")
+        self.unread_url = reverse("notifications-unread-count")
+        self.client.force_authenticate(user=self.user)
+
+    def _unread(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.unread_url)
+        return response.data["unread_count"]
+
+    def test_counter_follows_create_read_and_delete(self):
+        notifications = notify_users([self.user.id] * 3, "Issue updated")
+        single = Notification.objects.create(user=self.user, message="Welcome")
+        self.assertEqual(self._unread(), 4)
+
+        response = self.client.patch(
+            reverse("notifications-detail", args=[notifications[0].id]),
+            {"is_read": True},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._unread(), 3)
+
+        Notification.objects.filter(pk=notifications[0].pk).delete()
+        single.delete()
+        self.assertEqual(self._unread(), 2)
+
+    def test_reconcile_command_repairs_drift(self):
+        notify_users([self.user.id] * 2, "Issue updated")
+        NotificationCounter.objects.filter(user=self.user).update(unread=9, dirty=False)
+
+        stdout = io.StringIO()
+        call_command("reconcile_unread_counts", stdout=stdout)
+
+        self.assertIn(f"User {self.user.id}: 9 -> 2", stdout.getvalue())
+        self.assertEqual(self._unread(), 2)
+        self.assertEqual(unread.reconcile(), {})
+
+    @patch("issues.outbox.send_unread_counts")
+    def test_changed_counts_are_pushed_once(self, mock_push):
+        notify_users([self.user.id], "Issue updated")
+
+        self.assertEqual(outbox.push_unread_counts(), 1)
+        mock_push.assert_called_once_with({self.user.id: 1})
+        self.assertEqual(outbox.push_unread_counts(), 0)
+
+
+class BulkNotificationActionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="admin1", password="pass1234", role="ADMIN")
+        self.other = User.objects.create_user(username="admin2", password="pass1234", role="ADMIN")
+        self.notifications = notify_users([self.user.id] * 4 + [self.other.id], "New issue reported")
+        self.client.force_authenticate(user=self.user)
+
+    def test_mark_all_read_is_scoped_to_request_user(self):
+        response = self.client.post(reverse("notifications-mark-all-read"))
+
+        self.assertEqual(response.data, {"updated": 4})
+        self.assertEqual(unread.get_unread_count(self.user.id), 0)
+        self.assertEqual(unread.get_unread_count(self.other.id), 1)
+        self.assertFalse(Notification.objects.filter(user=self.user, is_read=False).exists())
+
+    def test_mark_read_before_timestamp(self):
+        # setUp rows are all "now"; move two of them before the cutoff.
+        cutoff = timezone.now() - timedelta(minutes=30)
+        Notification.objects.filter(pk__in=[n.pk for n in self.notifications[:2]]).update(
+            created_at=cutoff - timedelta(minutes=30)
+        )
+
+        response = self.client.post(
+            reverse("notifications-mark-read-before"),
+            {"before": cutoff.isoformat()},
+            format="json",
+        )
+
+        self.assertEqual(response.data, {"updated": 2})
+        self.assertEqual(unread.get_unread_count(self.user.id), 2)
+
+        response = self.client.post(reverse("notifications-mark-read-before"), {"before": "yesterday"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_delete_ignores_other_users_notifications(self):
+        Notification.objects.filter(pk=self.notifications[0].pk).mark_read()
+        ids = [n.pk for n in self.notifications[:3]] + [self.notifications[-1].pk]
+
+        response = self.client.post(reverse("notifications-bulk-delete"), {"ids": ids}, format="json")
+
+        self.assertEqual(response.data, {"deleted": 3})
+        self.assertEqual(unread.get_unread_count(self.user.id), 1)
+        self.assertTrue(Notification.objects.filter(pk=self.notifications[-1].pk).exists())
+        self.assertEqual(unread.reconcile(), {})
+
+    @patch("issues.outbox.send_unread_counts")
+    def test_bulk_update_pushes_one_event(self, mock_push):
+        outbox.push_unread_counts()
+        mock_push.reset_mock()
+
+        self.client.post(reverse("notifications-mark-all-read"))
+        outbox.push_unread_counts()
+
+        mock_push.assert_called_once_with({self.user.id: 0})
+
+
+class NotificationDigestTests(APITestCase):
+    def setUp(self):
+        self.digest_admin = User.objects.create_user(
+            username="admin1", password="pass1234", role="ADMIN", notification_digest_minutes=5
+        )
+        self.admin = User.objects.create_user(username="admin2", password="pass1234", role="ADMIN")
+
+    def _close_window(self):
+        NotificationDigest.objects.update(flush_at=timezone.now())
+
+    def test_burst_is_coalesced_into_one_notification(self):
+        for issue_id in (11, 12, 13):
+            notify_role("ADMIN", f"New issue reported: #{issue_id}", digest_issue_id=issue_id)
+
+        self.assertEqual(Notification.objects.filter(user=self.admin).count(), 3)
+        self.assertFalse(Notification.objects.filter(user=self.digest_admin).exists())
+        self.assertEqual(digest.flush_due(), 0)
+
+        self._close_window()
+        self.assertEqual(digest.flush_due(), 1)
+
+        notification = Notification.objects.get(user=self.digest_admin)
+        self.assertEqual(notification.message, "3 new issues reported in the last 5 minutes")
+        self.assertEqual(notification.issue_ids, [11, 12, 13])
+        self.assertTrue(NotificationOutbox.objects.filter(notification=notification).exists())
+        self.assertEqual(unread.get_unread_count(self.digest_admin.id), 1)
+        self.assertFalse(NotificationDigest.objects.exists())
+
+    def test_single_issue_window_keeps_original_message(self):
+        notify_role("ADMIN", "New issue reported: #21", digest_issue_id=21)
+        self._close_window()
+        digest.flush_due()
+
+        notification = Notification.objects.get(user=self.digest_admin)
+        self.assertEqual((notification.message, notification.issue_ids), ("New issue reported: #21", [21]))
+
+    @override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT, AI_VALIDATION_MODE="async")
+    @patch("issues.validation.predict_issue_image", return_value=("pothole", 0.91))
+    def test_async_validation_alert_is_digested(self, mock_predict):
+        reporter = User.objects.create_user(username="user1", password="pass1234", role="USER")
+        self.client.force_authenticate(user=reporter)
+        with patch("issues.views.schedule_issue_validation"):
+            issue_id = self.client.post(
+                reverse("issues-list"),
+                {
+                    "title": "Road damage",
+                    "description": "Deep pothole on main road",
+                    "category": "POTHOLE",
+                    "latitude": 22.72,
+                    "longitude": 75.86,
+                    "image": make_upload(),
+                },
+                format="multipart",
+            ).data["id"]
+
+        self.assertEqual(validate_issue(issue_id), "VALIDATED")
+
+        self.assertEqual(NotificationDigest.objects.get(user=self.digest_admin).issue_ids, [issue_id])
+        self.assertFalse(Notification.objects.filter(user=self.digest_admin).exists())
+        self.assertEqual(Notification.objects.filter(user=self.admin).count(), 1)
+
+    def test_other_role_messages_are_not_digested(self):
+        notify_role("ADMIN", "Worker marked issue as COMPLETED")
+
+        self.assertEqual(Notification.objects.filter(user=self.digest_admin).count(), 1)
+        self.assertFalse(NotificationDigest.objects.exists())
+
+    def test_user_sets_digest_window(self):
+        self.client.force_authenticate(user=self.admin)
+        url = reverse("notifications-digest")
+
+        response = self.client.patch(url, {"digest_minutes": 10}, format="json")
+        self.assertEqual(response.data, {"digest_minutes": 10})
+        self.assertEqual(role_digest_windows("ADMIN"), {self.digest_admin.id: 5, self.admin.id: 10})
+
+        response = self.client.patch(url, {"digest_minutes": 600}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class NotificationRetentionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user1", password="pass1234", role="USER")
+        self.other = User.objects.create_user(username="user2", password="pass1234", role="USER")
+
+    def _age(self, notifications, days):
+        Notification.objects.filter(pk__in=[n.pk for n in notifications]).update(
+            created_at=timezone.now() - timedelta(days=days)
+        )
+
+    def test_expires_only_old_read_notifications(self):
+        old_read, old_unread, recent_read = notify_users([self.user.id] * 3, "Issue updated")
+        self._age([old_read, old_unread], days=120)
+        Notification.objects.filter(pk__in=[old_read.pk, recent_read.pk]).mark_read()
+
+        with patch("issues.retention.time.sleep"):
+            report = prune_notifications(read_days=90, max_per_user=0, batch_size=1)
+
+        self.assertEqual(report["read_expired"], 1)
+        self.assertEqual(
+            set(Notification.objects.values_list("pk", flat=True)),
+            {old_unread.pk, recent_read.pk},
+        )
+
+    def test_caps_each_user_to_newest_rows_and_keeps_counters(self):
+        notifications = notify_users([self.user.id] * 5 + [self.other.id] * 2, "Issue updated")
+        self._age(notifications[:2], days=3)
+
+        with patch("issues.retention.time.sleep") as mock_sleep:
+            report = prune_notifications(read_days=0, max_per_user=3, batch_size=1)
+
+        self.assertEqual((report["over_cap"], report["users_capped"], report["batches"]), (2, 1, 2))
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertFalse(Notification.objects.filter(pk__in=[n.pk for n in notifications[:2]]).exists())
+        self.assertEqual(unread.get_unread_count(self.user.id), 3)
+        self.assertEqual(unread.get_unread_count(self.other.id), 2)
+        self.assertEqual(unread.reconcile(), {})
+
+    def test_command_reports_removed_rows(self):
+        notification = Notification.objects.create(user=self.user, message="Welcome", is_read=True)
+        self._age([notification], days=120)
+
+        stdout = io.StringIO()
+        call_command("prune_notifications", "--pause", "0", stdout=stdout)
+
+        self.assertIn("Removed 1 expired read and 0 over-cap notifications", stdout.getvalue())
+
+
+@patch.object(IssuePagination, "page_size", 2)
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin1", password="pass1234", role="ADMIN")
+        self.reporter = User.objects.create_user(username="user1", password="pass1234", role="USER")
+        self.issues = [self._create_issue(priority) for priority in (5, 9, 5, 3, 7)]
+        self.client.force_authenticate(user=self.admin)
+
+    def _create_issue(self, priority):
+        return Issue.objects.create(
+            title="Issue",
+            description="Reported near the market",
+            category="POTHOLE",
+            latitude=22.72,
+            longitude=75.86,
+            priority_score=priority,
+            reported_by=self.reporter,
+        )
+
+    def _walk(self, params):
+        ids, url = [], reverse("issues-list")
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            ids.extend(item["id"] for item in response.data["results"])
+            url, params = response.data["next"], None
+            if len(ids) == 2:
+                # Rows inserted mid-scroll must not shift the pages that follow.
+                self._create_issue(8)
+        return ids
+
+    def test_cursor_pages_are_stable_while_issues_stream_in(self):
+        ids = self._walk({"pagination": "cursor"})
+
+        expected = sorted((issue.id for issue in self.issues), reverse=True)
+        self.assertEqual(ids, expected)
+
+    def test_cursor_pages_by_priority_with_id_tiebreak(self):
+        ids = self._walk({"pagination": "cursor", "ordering": "-priority_score"})
+
+        by_priority = sorted(self.issues, key=lambda issue: (issue.priority_score, issue.id), reverse=True)
+        self.assertEqual(ids, [issue.id for issue in by_priority])
+
+    def test_page_number_mode_is_default_and_bad_cursor_is_rejected(self):
+        response = self.client.get(reverse("issues-list"))
+        self.assertEqual(response.data["count"], 5)
+
+        response = self.client.get(reverse("issues-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_non_numeric_priority_is_rejected(self):
+        cursor = IssuePagination._encode_cursor("abc", 1, "-priority_score")
+        response = self.client.get(reverse("issues-list"), {"cursor": cursor, "ordering": "-priority_score"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# Commits are real here, so keep the in-process outbox dispatcher from starting.
+@override_settings(
+    NOTIFICATION_REPLAY_BATCH_SIZE=2,
+    NOTIFICATION_REPLAY_LIMIT=4,
+    NOTIFICATION_OUTBOX_DISPATCHER="external",
+)
+class NotificationReplayTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user1", password="pass1234", role="USER")
+        self.notifications = [
+            Notification.objects.create(user=self.user, message=f"Update {index}")
+            for index in range(5)
+        ]
+
+    async def _connect(self, query):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), f"/ws/notifications/?{query}")
+        communicator.scope["user"] = self.user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_reconnect_replays_only_missed_notifications(self):
+        communicator = await self._connect(f"last_id={self.notifications[1].id}")
+
+        replayed = [await communicator.receive_json_from() for _ in range(3)]
+        self.assertEqual([item["id"] for item in replayed], [n.id for n in self.notifications[2:]])
+        self.assertEqual(
+            await communicator.receive_json_from(),
+            {"type": "replay_complete", "last_id": self.notifications[-1].id, "count": 3},
+        )
+
+        # A live event for something already replayed is not sent twice.
+        await communicator.send_input({
+            "type": "send_notification",
+            "notification": _notification_event(self.notifications[-1])["notification"],
+        })
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_client_too_far_behind_is_told_to_refetch(self):
+        communicator = await self._connect("since=2000-01-01T00:00:00Z")
+
+        replayed = [await communicator.receive_json_from() for _ in range(4)]
+        self.assertEqual([item["id"] for item in replayed], [n.id for n in self.notifications[:4]])
+        message = await communicator.receive_json_from()
+        self.assertEqual(message["type"], "replay_truncated")
+        await communicator.disconnect()
+
+
+@override_settings(NOTIFICATION_OUTBOX_DISPATCHER="external")
+class IssueLiveUpdatesTests(TransactionTestCase):
+    def setUp(self):
+        self.reporter = User.objects.create_user(username="user1", password="pass1234", role="USER")
+        self.other_reporter = User.objects.create_user(username="user2", password="pass1234", role="USER")
+        self.worker = User.objects.create_user(username="worker1", password="pass1234", role="WORKER")
+        self.assigned = self._issue(self.reporter, assigned_to=self.worker)
+        self.unassigned = self._issue(self.other_reporter)
+
+    def _issue(self, reporter, **fields):
+        return Issue.objects.create(
+            title="Broken street light",
+            description="Pole near park is off",
+            category="STREETLIGHT",
+            status="IN_PROGRESS",
+            latitude=22.72,
+            longitude=75.86,
+            priority_score=6,
+            reported_by=reporter,
+            **fields,
+        )
+
+    async def _connect(self, user):
+        communicator = WebsocketCommunicator(IssueUpdatesConsumer.as_asgi(), "/ws/issues/")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_subscriptions_follow_role_rules(self):
+        communicator = await self._connect(self.worker)
+        await communicator.send_json_to({"action": "subscribe", "issue_ids": [self.assigned.id, self.unassigned.id]})
+        self.assertEqual(
+            await communicator.receive_json_from(),
+            {"type": "subscribed", "issue_ids": [self.assigned.id], "denied": [self.unassigned.id]},
+        )
+
+        await sync_to_async(send_issue_update)(self.unassigned, {"status": "COMPLETED"})
+        await sync_to_async(send_issue_update)(self.assigned, {"status": "COMPLETED", "priority_score": 1})
+
+        update = await communicator.receive_json_from()
+        self.assertEqual((update["type"], update["id"]), ("issue_update", self.assigned.id))
+        self.assertEqual(update["changes"], {"status": "COMPLETED", "priority_score": 1})
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_viewport_receives_visible_changes_in_view(self):
+        communicator = await self._connect(self.reporter)
+        await communicator.send_json_to({"action": "watch_area", "bbox": [22.7, 75.8, 22.75, 75.9]})
+        watched = await communicator.receive_json_from()
+        self.assertEqual(watched["type"], "area_watched")
+
+        await sync_to_async(send_issue_update)(self.unassigned, {"status": "RESOLVED"})
+        await sync_to_async(send_issue_update)(self.assigned, {"status": "RESOLVED"})
+
+        self.assertEqual((await communicator.receive_json_from())["id"], self.assigned.id)
+        self.assertTrue(await communicator.receive_nothing())
+
+        await communicator.send_json_to({"action": "watch_area", "bbox": [-80, -170, 80, 170]})
+        self.assertEqual((await communicator.receive_json_from())["type"], "error")
+        await communicator.disconnect()
+
+    @override_settings(NOTIFICATION_OUTBOX_DISPATCHER="external")
+    def test_request_resolve_publishes_changed_fields_through_outbox(self):
+        client = APIClient()
+        client.force_authenticate(user=self.worker)
+
+        with patch("issues.outbox.send_issue_updates") as mock_publish:
+            response = client.post(reverse("issues-request-resolve", args=[self.assigned.id]))
+            mock_publish.assert_not_called()
+            self.assertEqual(outbox.dispatch_issue_updates(), 1)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [(issue, changes)] = mock_publish.call_args.args[0]
+        self.assertEqual(issue.id, self.assigned.id)
+        self.assertEqual(changes, {"status": "COMPLETED", "priority_score": 1})
+        self.assertFalse(IssueUpdateOutbox.objects.exists())
+
+
+class NotificationOutboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user1", password="pass1234", role="USER")
+        outbox.reset_stats()
+
+    def test_rolled_back_notifications_leave_nothing_to_deliver(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    notify_users([self.user.id], "Your issue was resolved")
+                    raise RuntimeError("request failed")
+            except RuntimeError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(Notification.objects.exists())
+
+    def test_one_wake_up_per_transaction_even_after_rolled_back_savepoint(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    outbox.schedule_wake()
+                    raise RuntimeError("savepoint rolled back")
+            except RuntimeError:
+                pass
+            with transaction.atomic():
+                notify_users([self.user.id], "Your issue was resolved")
+                outbox.schedule_wake()
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    @patch("issues.outbox.send_realtime_notifications")
+    def test_delivery_is_deferred_until_dispatch(self, mock_realtime):
+        with self.captureOnCommitCallbacks() as callbacks:
+            notifications = notify_users([self.user.id], "Your issue was resolved")
+
+        mock_realtime.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+
+        self.assertEqual(outbox.dispatch_pending(), 1)
+        mock_realtime.assert_called_once_with(notifications)
+        stats = outbox.get_stats()
+        self.assertEqual((stats["delivered"], stats["pending"]), (1, 0))
+        self.assertIsNotNone(stats["last_lag_ms"])
+
+    def test_claimed_entries_are_not_redelivered_while_in_flight(self):
+        notify_users([self.user.id], "Your issue was resolved")
+        reclaimed = []
+
+        def deliver(notifications):
+            reclaimed.extend(outbox._claim(10))
+
+        with patch("issues.outbox.send_realtime_notifications", side_effect=deliver):
+            self.assertEqual(outbox.dispatch_pending(), 1)
+
+        self.assertEqual(reclaimed, [])
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    @override_settings(NOTIFICATION_OUTBOX_MAX_ATTEMPTS=2, NOTIFICATION_OUTBOX_RETRY_BASE_SECONDS=30)
+    @patch("issues.outbox.send_realtime_notifications", side_effect=ConnectionError("channel layer down"))
+    def test_failed_delivery_backs_off_then_is_dropped(self, mock_realtime):
+        notify_users([self.user.id], "Your issue was resolved")
+
+        self.assertEqual(outbox.dispatch_pending(), 1)
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.attempts, 1)
+        self.assertIn("channel layer down", entry.last_error)
+        self.assertGreater(entry.next_attempt_at, timezone.now() + timedelta(seconds=20))
+
+        # Not due yet, so nothing is retried.
+        self.assertEqual(outbox.dispatch_pending(), 0)
+
+        NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+        outbox.dispatch_pending()
+        self.assertFalse(NotificationOutbox.objects.exists())
+        self.assertEqual(outbox.get_stats()["dropped"], 1)
+        self.assertTrue(Notification.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT, AI_VALIDATION_MODE="async")
+class AsyncIssueValidationTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin1", password="pass1234", role="ADMIN")
+        self.reporter = User.objects.create_user(username="user1", password="pass1234", role="USER")
+        self.issues_url = reverse("issues-list")
+
+    def _report(self, category="POTHOLE"):
+        self.client.force_authenticate(user=self.reporter)
+        payload = {
+            "title": "Road damage",
+            "description": "Deep pothole on main road",
+            "category": category,
+            "latitude": 22.72,
+            "longitude": 75.86,
+            "image": make_upload(),
+        }
+        return self.client.post(self.issues_url, payload, format="multipart")
+
+    @patch("issues.views.schedule_issue_validation")
+    @patch("issues.views.predict_issue_image")
+    def test_create_saves_immediately_and_schedules_validation(self, mock_predict, mock_schedule):
+        response = self._report()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["validation_status"], "PENDING_VALIDATION")
+        mock_predict.assert_not_called()
+        mock_schedule.assert_called_once_with(response.data["id"])
+        self.assertFalse(Notification.objects.exists())
+
+    @patch("issues.outbox.broadcast_role_notifications")
+    @patch("issues.validation.predict_issue_image", return_value=("pothole", 0.91))
+    def test_background_validation_accepts_and_notifies_admins(self, mock_predict, mock_realtime):
+        with patch("issues.views.schedule_issue_validation"):
+            issue_id = self._report().data["id"]
+
+        self.assertEqual(validate_issue(issue_id), "VALIDATED")
+
+        issue = Issue.objects.get(pk=issue_id)
+        self.assertEqual((issue.ai_prediction, issue.ai_confidence), ("pothole", 0.91))
+        notification = Notification.objects.get()
+        self.assertEqual(notification.user, self.admin)
+        outbox.dispatch_pending()
+        mock_realtime.assert_called_once_with("ADMIN", [notification])
+
+    @patch("issues.outbox.send_realtime_notifications")
+    @patch("issues.validation.predict_issue_image", return_value=("garbage", 0.95))
+    def test_background_validation_rejects_and_notifies_reporter(self, mock_predict, mock_realtime):
+        with patch("issues.views.schedule_issue_validation"):
+            issue_id = self._report().data["id"]
+
+        self.assertEqual(validate_issue(issue_id), "REJECTED")
+
+        issue = Issue.objects.get(pk=issue_id)
+        self.assertEqual(issue.validation_message, "Image does not match selected category")
+        notification = Notification.objects.get()
+        self.assertEqual(notification.user, self.reporter)
+        self.assertIn("rejected", notification.message)
+        outbox.dispatch_pending()
+        mock_realtime.assert_called_once_with([notification])
+
+    @patch("issues.validation.predict_issue_image", return_value=("garbage", 0.95))
+    def test_unvalidated_issues_are_hidden_from_admins(self, mock_predict):
+        with patch("issues.views.schedule_issue_validation"):
+            pending_id = self._report().data["id"]
+            rejected_id = self._report().data["id"]
+        validate_issue(rejected_id)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.issues_url)
+        self.assertEqual(response.data["results"], [])
+        response = self.client.patch(
+            reverse("issues-detail", args=[pending_id]), {"status": "IN_PROGRESS"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=self.reporter)
+        response = self.client.get(self.issues_url)
+        self.assertEqual([item["id"] for item in response.data["results"]], [pending_id])
+
+    @patch("issues.validation.predict_issue_image", return_value=("pothole", 0.91))
+    def test_stale_pending_issues_are_revalidated(self, mock_predict):
+        with patch("issues.views.schedule_issue_validation"):
+            stale_id = self._report().data["id"]
+            fresh_id = self._report().data["id"]
+        Issue.objects.filter(pk=stale_id).update(created_at=timezone.now() - timedelta(minutes=30))
+
+        stdout = io.StringIO()
+        call_command("revalidate_pending_issues", "--older-than", "10", stdout=stdout)
+
+        self.assertIn("1 validated", stdout.getvalue())
+        self.assertEqual(Issue.objects.get(pk=stale_id).validation_status, "VALIDATED")
+        self.assertEqual(Issue.objects.get(pk=fresh_id).validation_status, "PENDING_VALIDATION")
+
+
+class ClassificationResultCacheTests(TestCase):
+    def setUp(self):
+        self.classifier = FakeClassifier()
+        patcher = patch.object(ai_validator, "_get_pipeline", return_value=self.classifier)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        result_cache.reset_stats()
+
+    def _predict(self, data):
+        return ai_validator.predict_issue_image(io.BytesIO(data))
+
+    def test_same_upload_is_served_from_cache(self):
+        data = make_image_bytes("red")
+
+        first = self._predict(data)
+        second = self._predict(data)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.classifier.batch_sizes), 1)
+        stats = result_cache.get_stats()
+        self.assertEqual((stats["misses"], stats["exact_hits"]), (1, 1))
+        self.assertEqual(ClassificationCacheEntry.objects.get().hits, 1)
+
+    def test_resized_copy_hits_perceptual_hash(self):
+        self._predict(make_image_bytes("red", size=(128, 96)))
+        self._predict(make_image_bytes("red", size=(64, 48), image_format="JPEG"))
+
+        self.assertEqual(len(self.classifier.batch_sizes), 1)
+        self.assertEqual(result_cache.get_stats()["perceptual_hits"], 1)
+
+    def test_prompt_change_invalidates_cached_results(self):
+        data = make_image_bytes("red")
+        self._predict(data)
+
+        with patch.dict(ai_validator._CATEGORY_PROMPTS, {"other": "a flooded street"}):
+            self._predict(data)
+
+        self.assertEqual(len(self.classifier.batch_sizes), 2)
+
+    @override_settings(AI_RESULT_CACHE_MAX_ENTRIES=2, AI_RESULT_CACHE_EVICT_EVERY=1)
+    def test_least_recently_used_entries_are_evicted(self):
+        colors = ["red", "blue", "green"]
+        for color in colors:
+            self._predict(make_image_bytes(color))
+
+        self.assertEqual(ClassificationCacheEntry.objects.count(), 2)
+        self.assertEqual(result_cache.get_stats()["evictions"], 1)
+
+        self._predict(make_image_bytes("red"))
+        self.assertEqual(len(self.classifier.batch_sizes), 4)
+
+    @override_settings(AI_RESULT_CACHE_MAX_ENTRIES=1, AI_RESULT_CACHE_EVICT_EVERY=3)
+    def test_size_limit_is_checked_every_few_new_entries(self):
+        for color in ("red", "blue"):
+            self._predict(make_image_bytes(color))
+        self.assertEqual(ClassificationCacheEntry.objects.count(), 2)
+
+        self._predict(make_image_bytes("green"))
+        self.assertEqual(ClassificationCacheEntry.objects.count(), 1)
+        self.assertEqual(result_cache.get_stats()["evictions"], 2)
+
+
+def crash_on_tiny_images(images):
+    if any(image.size == (13, 13) for image in images):
+        os._exit(1)
+    return FakeClassifier()(images, list(ai_validator._CATEGORY_PROMPTS.values()))
+
+
+class InferencePoolTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = InferencePool(f"{__name__}.crash_on_tiny_images", workers=2)
+        self.addCleanup(self.pool.close)
+        patcher = patch.object(ai_validator, "_PROCESS_POOL", self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_worker_processes_return_per_image_results(self):
+        results = ai_validator._run_in_process_pool([
+            Image.new("RGB", (20, 20), "red"),
+            Image.new("RGB", (20, 20), "blue"),
+        ])
+
+        self.assertEqual(
+            [ai_validator._result_to_category(result)[0] for result in results],
+            ["pothole", "garbage"],
+        )
+
+    def test_crashed_worker_is_retried_once_and_restarted(self):
+        results = ai_validator._run_in_process_pool([Image.new("RGB", (13, 13), "red")])
+
+        self.assertIsInstance(results[0], ai_validator.AIValidationError)
+        self.assertIn("initializing or network is unstable", str(results[0]))
+        self.assertEqual(self.pool.stats()["restarts"], 2)
+
+        results = ai_validator._run_in_process_pool([Image.new("RGB", (20, 20), "red")])
+        self.assertEqual(ai_validator._result_to_category(results[0])[0], "pothole")
+        self.assertEqual(self.pool.stats()["alive"], 2)
+
+
+@override_settings(AI_RESULT_CACHE_MAX_ENTRIES=0, AI_WARMUP_ON_STARTUP=True)
+class AIReadinessTests(APITestCase):
+    def setUp(self):
+        self.readiness_url = reverse("ai-readiness")
+        for patcher in (
+            patch.object(ai_validator, "_PIPELINE", None),
+            patch.object(ai_validator, "_MODEL_STATUS", {"state": "not_loaded"}),
+            patch.object(ai_validator, "_WARMUP_PID", None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_not_ready_until_warm_up_completes(self):
+        with patch.object(ai_validator, "start_warm_up") as start_warm_up:
+            response = self.client.get(self.readiness_url)
+            self.client.get(self.readiness_url)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        start_warm_up.assert_called_once_with()
+
+        classifier = FakeClassifier()
+        with patch.object(ai_validator, "_load_pipeline", return_value=classifier):
+            self.assertTrue(ai_validator.warm_up())
+
+        response = self.client.get(self.readiness_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["model"]["state"], "ready")
+        self.assertIsNotNone(response.data["model"]["load_seconds"])
+        self.assertEqual(sum(classifier.batch_sizes), 1)
+
+    def test_loaded_model_is_not_ready_before_warm_up_inference(self):
+        ai_validator._set_model_status(state="loaded", load_seconds=1.0)
+
+        with patch.object(ai_validator, "start_warm_up"):
+            response = self.client.get(self.readiness_url)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_failed_warm_up_is_reported(self):
+        with patch.object(ai_validator, "_get_pipeline", side_effect=ai_validator.AIValidationError("no torch")):
+            self.assertFalse(ai_validator.warm_up())
+
+        with patch.object(ai_validator, "start_warm_up"):
+            response = self.client.get(self.readiness_url)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.data["model"]["state"], "failed")
+
+    @override_settings(AI_WARMUP_RETRY_SECONDS=5, AI_WARMUP_RETRY_MAX_SECONDS=8)
+    def test_failed_warm_up_is_retried_with_backoff(self):
+        with patch.object(ai_validator, "warm_up", side_effect=[False, False, False, True]) as warm_up, \
+                patch("issues.utils.ai_validator.time.sleep") as sleep:
+            ai_validator._warm_up_with_retries()
+
+        self.assertEqual(warm_up.call_count, 4)
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [5, 8, 8])
+
+
+@override_settings(AI_RESULT_CACHE_MAX_ENTRIES=0, AI_DECODE_MAX_SIZE=448, AI_BATCH_MAX_SIZE=1)
+class ImageDecodeTests(SimpleTestCase):
+    def test_large_jpeg_is_decoded_near_model_input_size(self):
+        upload = SimpleUploadedFile(
+            "photo.jpg",
+            make_image_bytes("red", size=(4000, 3000), image_format="JPEG"),
+            content_type="image/jpeg",
+        )
+
+        image, timings = ai_validator.decode_image(upload, 448)
+
+        self.assertEqual(image.mode, "RGB")
+        self.assertEqual(max(image.size), 448)
+        self.assertEqual(set(timings), {"open", "decode", "convert"})
+
+    def test_prediction_records_stage_timings(self):
+        classifier = FakeClassifier()
+        with patch.object(ai_validator, "_BATCHER", None), \
+                patch.object(ai_validator, "_get_pipeline", return_value=classifier):
+            category, _ = ai_validator.predict_issue_image(make_upload("red"))
+
+        self.assertEqual(category, "pothole")
+        stages = ai_validator.get_stage_timings()
+        for stage in ("open", "decode", "convert", "inference"):
+            self.assertGreaterEqual(stages[stage]["count"], 1)
+
+
+class AIValidatorBenchmarkTests(SimpleTestCase):
+    def test_stub_benchmark_writes_json_report(self):
+        output = os.path.join(tempfile.mkdtemp(prefix="civiceye-bench-"), "bench.json")
+        pipeline, batcher = ai_validator._PIPELINE, ai_validator._BATCHER
+
+        call_command(
+            "benchmark_ai_validator",
+            model="stub", sizes="320x240,800x600", concurrency="1,2",
+            iterations=3, output=output, stdout=io.StringIO(),
+        )
+
+        with open(output) as handle:
+            report = json.load(handle)
+        self.assertEqual(report["meta"]["model"], "stub")
+        self.assertEqual([row["size"] for row in report["results"]], ["320x240", "800x600"])
+        for row in report["results"]:
+            for stage in ("decode", "preprocess", "classify"):
+                self.assertEqual(row[stage]["count"], 3)
+            self.assertEqual([run["concurrency"] for run in row["end_to_end"]], [1, 2])
+            self.assertGreater(row["end_to_end"][1]["throughput_per_s"], 0)
+        self.assertIs(ai_validator._PIPELINE, pipeline)
+        self.assertIs(ai_validator._BATCHER, batcher)
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT, AI_INFERENCE_BACKEND="thread")
+class ReclassifyIssuesCommandTests(TestCase):
+    def setUp(self):
+        reporter = User.objects.create_user(username="user1", password="pass1234", role="USER")
+        self.issues = [
+            Issue.objects.create(
+                title=f"Issue {index}",
+                description="Reported near the market",
+                category=category,
+                image=make_upload(color, name=f"issue-{index}.png"),
+                latitude=22.7,
+                longitude=75.8,
+                reported_by=reporter,
+            )
+            for index, (category, color) in enumerate(
+                [("POTHOLE", "red"), ("GARBAGE", "blue"), ("POTHOLE", "blue")]
+            )
+        ]
+        self.classifier = FakeClassifier()
+        patcher = patch.object(ai_validator, "_get_pipeline", return_value=self.classifier)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, **options):
+        stdout = io.StringIO()
+        call_command("reclassify_issues", batch_size=2, stdout=stdout, stderr=io.StringIO(), **options)
+        return stdout.getvalue()
+
+    def test_dry_run_reports_confusion_matrix_without_writing(self):
+        output = self._run(dry_run=True)
+
+        self.assertIn("Agreement: 2/3", output)
+        self.assertEqual(self.classifier.batch_sizes, [2, 1])
+        self.assertFalse(Issue.objects.exclude(ai_prediction="").exists())
+
+    def test_updates_predictions_and_resumes_from_checkpoint(self):
+        checkpoint = os.path.join(tempfile.mkdtemp(prefix="civiceye-reclassify-"), "state.json")
+
+        self._run(checkpoint=checkpoint, limit=2)
+        with open(checkpoint) as handle:
+            self.assertEqual(json.load(handle)["last_id"], self.issues[1].pk)
+
+        self._run(checkpoint=checkpoint, resume=True)
+
+        self.assertEqual(
+            list(Issue.objects.order_by("pk").values_list("ai_prediction", flat=True)),
+            ["pothole", "garbage", "garbage"],
+        )
+        self.assertEqual(self.classifier.batch_sizes, [2, 1])
@@ -0,0 +1,89 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+
+from . import outbox
+from .models import Notification, NotificationCounter
+
+
+def apply_deltas(deltas):
+    """
+    Adjust unread counters by {user_id: delta}.
+
+    One UPDATE per distinct delta, so bulk paths stay O(1) in queries.
+    Changed counters are marked dirty and pushed to clients by the outbox
+    dispatcher after commit.
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    # Only increments create rows; a decrement for a missing counter has
+    # nothing to correct, and the user may be mid-deletion.
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id) for user_id, delta in deltas.items() if delta > 0],
+        ignore_conflicts=True,
+    )
+
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        by_delta[delta].append(user_id)
+
+    for delta, user_ids in by_delta.items():
+        NotificationCounter.objects.filter(user_id__in=user_ids).update(
+            unread=Greatest(F("unread") + delta, Value(0)),
+            version=F("version") + 1,
+            dirty=True,
+        )
+
+    outbox.schedule_wake()
+
+
+def get_unread_count(user_id):
+    return (
+        NotificationCounter.objects.filter(user_id=user_id)
+        .values_list("unread", flat=True)
+        .first()
+    ) or 0
+
+
+def reconcile(user_ids=None):
+    """
+    Recompute counters from the notification table and fix any that drifted.
+
+    Returns {user_id: (stored, actual)} for every repaired counter.
+    """
+    notifications = Notification.objects.filter(is_read=False)
+    counters = NotificationCounter.objects.all()
+    if user_ids is not None:
+        notifications = notifications.filter(user_id__in=user_ids)
+        counters = counters.filter(user_id__in=user_ids)
+
+    actual = dict(
+        notifications.values("user_id").annotate(count=Count("id")).values_list("user_id", "count")
+    )
+    stored = dict(counters.values_list("user_id", "unread"))
+
+    repaired = {
+        user_id: (stored.get(user_id, 0), actual.get(user_id, 0))
+        for user_id in set(actual) | set(stored)
+        if stored.get(user_id, 0) != actual.get(user_id, 0)
+    }
+
+    with transaction.atomic():
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=user_id) for user_id in repaired if user_id not in stored],
+            ignore_conflicts=True,
+        )
+        for user_id, (_, count) in repaired.items():
+            NotificationCounter.objects.filter(user_id=user_id).update(
+                unread=count,
+                version=F("version") + 1,
+                dirty=True,
+            )
+        if repaired:
+            outbox.schedule_wake()
+
+    return repaired
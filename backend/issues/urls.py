@@ -3,7 +3,10 @@ from django.urls import path, include
 from .views import (
     IssueViewSet,
     DashboardStatsView,
+    AnalyticsTimeseriesView,
     NearbyIssuesView,
+    IssueClustersView,
+    AIReadinessView,
     UserViewSet,
     NotificationViewSet,
     UserRegistrationView
@@ -18,12 +21,19 @@ router.register(r'users', UserViewSet, basename='users')
 
 
 urlpatterns = [
+    # Map / Geo (before the router so these are not taken as an issue pk)
+    path('issues/nearby/', NearbyIssuesView.as_view(), name='nearby-issues'),
+    path('issues/clusters/', IssueClustersView.as_view(), name='issue-clusters'),
+
     path('', include(router.urls)),
     path('register/', UserRegistrationView.as_view(), name='register-user'),
 
     # Dashboard
     path('dashboard/stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
 
-    # Map / Geo
-    path('issues/nearby/', NearbyIssuesView.as_view(), name='nearby-issues'),
+    # Analytics
+    path('analytics/timeseries/', AnalyticsTimeseriesView.as_view(), name='analytics-timeseries'),
+
+    # Health
+    path('health/ai/', AIReadinessView.as_view(), name='ai-readiness'),
 ]
@@ -1,17 +1,42 @@
+import os
 import re
-import io
 import sys
+import hashlib
+import time
+import queue
 import logging
-from threading import Lock
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import BoundedSemaphore, Lock, Thread
 
+from django.conf import settings
 from PIL import Image, UnidentifiedImageError
 
+from . import result_cache
+from .inference_pool import InferencePool, WorkerCrashed
+
 
 # Load once and reuse for all requests to keep inference fast.
 _PIPELINE = None
 _PIPELINE_LOCK = Lock()
+# (cache_key, normalized prompt embeddings) for the loaded CLIP model.
+_TEXT_EMBEDDINGS = None
+_MODEL_STATUS = {
+    "state": "not_loaded",
+    "load_seconds": None,
+    "warmup_seconds": None,
+    "loaded_at": None,
+    "error": "",
+}
+_MODEL_STATUS_LOCK = Lock()
+_WARMUP_LOCK = Lock()
+_WARMUP_PID = None
 logger = logging.getLogger(__name__)
 
+_MODEL_NAME = "openai/clip-vit-base-patch32"
+_HYPOTHESIS_TEMPLATE = "This image shows {}."
+
 _CATEGORY_PROMPTS = {
     "pothole": "a pothole on a road",
     "garbage": "garbage dump on a street",
@@ -41,6 +66,22 @@ def _normalize_category(category):
     return aliases.get(normalized, normalized)
 
 
+def _load_pipeline():
+    try:
+        import torch  # noqa: F401
+        from transformers import pipeline
+    except Exception as exc:
+        raise AIValidationError(
+            f"AI dependencies are missing in interpreter '{sys.executable}'. Details: {exc}"
+        ) from exc
+
+    return pipeline(
+        task="zero-shot-image-classification",
+        model=_MODEL_NAME,
+        device=-1,
+    )
+
+
 def _get_pipeline():
     global _PIPELINE
 
@@ -49,29 +90,175 @@ def _get_pipeline():
 
     with _PIPELINE_LOCK:
         if _PIPELINE is None:
+            _set_model_status(state="loading", error="")
+            started = time.perf_counter()
             try:
-                import torch  # noqa: F401
-                from transformers import pipeline
+                classifier = _load_pipeline()
+                # Encode the category prompts once, at model load.
+                if _supports_cached_text_embeddings(classifier):
+                    _get_text_embeddings(classifier, list(_CATEGORY_PROMPTS.values()))
             except Exception as exc:
-                raise AIValidationError(
-                    f"AI dependencies are missing in interpreter '{sys.executable}'. Details: {exc}"
-                ) from exc
-
-            _PIPELINE = pipeline(
-                task="zero-shot-image-classification",
-                model="openai/clip-vit-base-patch32",
-                device=-1,
+                _set_model_status(state="failed", error=str(exc))
+                raise
+
+            _set_model_status(
+                state="loaded",
+                load_seconds=round(time.perf_counter() - started, 3),
+                loaded_at=time.time(),
             )
+            _PIPELINE = classifier
     return _PIPELINE
 
 
 def _reset_pipeline():
-    global _PIPELINE
+    global _PIPELINE, _TEXT_EMBEDDINGS
     with _PIPELINE_LOCK:
         _PIPELINE = None
+        _TEXT_EMBEDDINGS = None
+        _set_model_status(state="not_loaded")
+
+
+def _set_model_status(**values):
+    with _MODEL_STATUS_LOCK:
+        _MODEL_STATUS.update(values)
+
+
+def get_model_status():
+    """Load state and timings of the shared model, for readiness checks."""
+    with _MODEL_STATUS_LOCK:
+        return dict(_MODEL_STATUS)
+
+
+def warm_up():
+    """
+    Load the model and push one dummy image through the inference path.
+
+    Returns True once the model is ready; failures are recorded in
+    get_model_status() instead of raised. warmup_seconds is only set on
+    success, so readiness checks can tell a warmed model from one a
+    request happened to load.
+    """
+    started = time.perf_counter()
+    try:
+        result = _get_batcher().submit(Image.new("RGB", (224, 224)))
+    except Exception as exc:
+        logger.exception("AI model warm-up failed")
+        _set_model_status(state="failed", error=str(exc))
+        return False
+
+    if not result:
+        _set_model_status(state="failed", error="Warm-up inference returned no result.")
+        return False
+
+    _set_model_status(state="ready", error="", warmup_seconds=round(time.perf_counter() - started, 3))
+    return True
+
+
+def _warm_up_with_retries():
+    delay = getattr(settings, "AI_WARMUP_RETRY_SECONDS", 5)
+    limit = getattr(settings, "AI_WARMUP_RETRY_MAX_SECONDS", 300)
+    while not warm_up():
+        logger.warning("Retrying AI model warm-up in %ss", delay)
+        time.sleep(delay)
+        delay = min(limit, delay * 2)
+
+
+def start_warm_up():
+    """Run warm_up() on a background thread, retrying failures with backoff."""
+    _set_model_status(state="warming_up")
+    thread = Thread(target=_warm_up_with_retries, name="ai-model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def ensure_warm_up():
+    """
+    Start the background warm-up once per process.
+
+    core/asgi.py and core/wsgi.py call this at startup when
+    AI_WARMUP_ON_STARTUP is set; the readiness probe calls it again so
+    workers forked from a preloading master (whose warm-up thread did not
+    survive the fork) start their own.
+    """
+    global _WARMUP_PID
+
+    with _WARMUP_LOCK:
+        if _WARMUP_PID != os.getpid():
+            _WARMUP_PID = os.getpid()
+            start_warm_up()
+
+
+def is_warmed_up():
+    """True once warm-up finished and the model is (still) loaded."""
+    status = get_model_status()
+    return status["state"] in ("loaded", "ready") and status.get("warmup_seconds") is not None
+
+
+def _supports_cached_text_embeddings(classifier):
+    model = getattr(classifier, "model", None)
+    return (
+        all(hasattr(model, attr) for attr in ("get_text_features", "get_image_features", "logit_scale"))
+        and getattr(classifier, "tokenizer", None) is not None
+        and getattr(classifier, "image_processor", None) is not None
+    )
+
+
+def _get_text_embeddings(classifier, candidate_labels):
+    """
+    Normalized text embeddings for the candidate labels.
+
+    Cached per model and prompt set, so the text tower only runs again
+    when the prompts (or the loaded model) change.
+    """
+    global _TEXT_EMBEDDINGS
+
+    cache_key = (id(classifier.model), tuple(candidate_labels), _HYPOTHESIS_TEMPLATE)
+    cached = _TEXT_EMBEDDINGS
+    if cached is not None and cached[0] == cache_key:
+        return cached[1]
+
+    import torch
+
+    texts = [_HYPOTHESIS_TEMPLATE.format(label) for label in candidate_labels]
+    with torch.no_grad():
+        text_inputs = classifier.tokenizer(texts, padding=True, return_tensors="pt")
+        text_inputs = {key: value.to(classifier.model.device) for key, value in text_inputs.items()}
+        text_embeds = classifier.model.get_text_features(**text_inputs)
+        text_embeds = text_embeds / text_embeds.norm(dim=-1, keepdim=True)
+
+    _TEXT_EMBEDDINGS = (cache_key, text_embeds)
+    return text_embeds
+
+
+def _classify_with_cached_text(classifier, images, candidate_labels):
+    """Zero-shot scores from image embeddings against the cached prompt matrix."""
+    import torch
+
+    text_embeds = _get_text_embeddings(classifier, candidate_labels)
+    with torch.no_grad():
+        image_inputs = classifier.image_processor(images=images, return_tensors="pt")
+        pixel_values = image_inputs["pixel_values"].to(classifier.model.device)
+        image_embeds = classifier.model.get_image_features(pixel_values=pixel_values)
+        image_embeds = image_embeds / image_embeds.norm(dim=-1, keepdim=True)
+
+        logits = classifier.model.logit_scale.exp() * image_embeds @ text_embeds.T
+        probabilities = logits.softmax(dim=-1).tolist()
+
+    return [
+        sorted(
+            (
+                {"score": score, "label": label}
+                for score, label in zip(row, candidate_labels)
+            ),
+            key=lambda item: -item["score"],
+        )
+        for row in probabilities
+    ]
 
 
 def _is_transient_model_error(exc):
+    if isinstance(exc, (TimeoutError, WorkerCrashed)):
+        return True
     message = str(exc).lower()
     transient_tokens = [
         "timed out",
@@ -87,56 +274,49 @@ def _is_transient_model_error(exc):
     return any(token in message for token in transient_tokens)
 
 
-def predict_issue_image(image_path):
-    """
-    Predict issue category for an uploaded image.
+def _call_pipeline(images):
+    """Run one batched forward pass; returns one result list per image."""
+    classifier = _get_pipeline()
+    candidate_labels = list(_CATEGORY_PROMPTS.values())
 
-    Returns:
-        tuple[str, float]: (predicted_class, confidence_score)
-    """
-    try:
-        if hasattr(image_path, "read"):
-            image_path.seek(0)
-            image_bytes = image_path.read()
-            image_source = io.BytesIO(image_bytes)
-        else:
-            image_source = image_path
+    if _supports_cached_text_embeddings(classifier):
+        return _classify_with_cached_text(classifier, images, candidate_labels)
 
-        with Image.open(image_source) as img:
-            image = img.convert("RGB")
-            # Downscale very large uploads to keep CPU inference stable.
-            image.thumbnail((1024, 1024))
-    except FileNotFoundError as exc:
-        raise AIValidationError("Uploaded image file was not found.") from exc
-    except UnidentifiedImageError as exc:
-        raise AIValidationError("Uploaded file is not a valid image.") from exc
-    except OSError as exc:
-        raise AIValidationError("Could not read the uploaded image.") from exc
+    try:
+        results = classifier(
+            images,
+            candidate_labels=candidate_labels,
+            hypothesis_template=_HYPOTHESIS_TEMPLATE,
+            batch_size=len(images),
+        )
+    except TypeError:
+        # Compatibility fallback for environments where template arg differs.
+        results = classifier(
+            images,
+            candidate_labels=candidate_labels,
+        )
+
+    if len(images) == 1 and results and isinstance(results[0], dict):
+        results = [results]
+    return results
+
+
+def _run_inference(images):
+    """
+    Classify a batch of images with the shared pipeline.
 
-    candidate_labels = list(_CATEGORY_PROMPTS.values())
-    result = None
+    Returns a list with one entry per image: either the pipeline result or
+    an AIValidationError for that image.
+    """
     last_error = None
 
     # Retry once for transient first-load or network hiccups.
     for attempt in range(2):
         try:
-            classifier = _get_pipeline()
-            try:
-                result = classifier(
-                    image,
-                    candidate_labels=candidate_labels,
-                    hypothesis_template="This image shows {}.",
-                )
-            except TypeError:
-                # Compatibility fallback for environments where template arg differs.
-                result = classifier(
-                    image,
-                    candidate_labels=candidate_labels,
-                )
-            break
-        except AIValidationError as exc:
+            return _call_pipeline(images)
+        except AIValidationError:
             # Surface explicit validator/dependency errors directly.
-            raise exc
+            raise
         except Exception as exc:
             last_error = exc
             logger.exception("AI inference attempt %s failed", attempt + 1)
@@ -144,23 +324,314 @@ def predict_issue_image(image_path):
             if attempt == 0 and _is_transient_model_error(exc):
                 _reset_pipeline()
                 continue
+            break
 
-    if result is None:
-        if isinstance(last_error, AIValidationError):
-            raise last_error
+    if len(images) > 1 and not _is_transient_model_error(last_error):
+        # One bad image should not fail everyone else in the batch.
+        results = []
+        for image in images:
+            results.extend(_run_inference([image]))
+        return results
 
-        if last_error and _is_transient_model_error(last_error):
-            raise AIValidationError(
-                "AI model is initializing or network is unstable. Please retry in a few seconds."
-            ) from last_error
+    return [_inference_error(last_error)] * len(images)
+
+
+def _inference_error(last_error):
+    if _is_transient_model_error(last_error):
+        error = AIValidationError(
+            "AI model is initializing or network is unstable. Please retry in a few seconds."
+        )
+    else:
         error_type = last_error.__class__.__name__ if last_error else "UnknownError"
-        raise AIValidationError(
+        error = AIValidationError(
             f"AI model inference failed ({error_type}). Please try another clear JPG/PNG image."
-        ) from last_error
+        )
+    error.__cause__ = last_error
+    return error
 
-    if not result:
-        raise AIValidationError("AI model could not classify this image.")
 
+_PROCESS_POOL = None
+_PROCESS_POOL_LOCK = Lock()
+
+
+def _get_process_pool():
+    global _PROCESS_POOL
+
+    if _PROCESS_POOL is None:
+        with _PROCESS_POOL_LOCK:
+            if _PROCESS_POOL is None:
+                # Workers are spawned and load the model themselves; the
+                # parent never touches torch.
+                _PROCESS_POOL = InferencePool(
+                    f"{__name__}._run_inference",
+                    workers=getattr(settings, "AI_INFERENCE_PROCESSES", 2),
+                )
+    return _PROCESS_POOL
+
+
+def _run_in_process_pool(images):
+    """Same contract as _run_inference, executed by a worker process."""
+    timeout = getattr(settings, "AI_INFERENCE_TIMEOUT", 30)
+    last_error = None
+
+    # Workers already retry transient model errors; this retries crashes and timeouts once.
+    for attempt in range(2):
+        pool = _get_process_pool()
+        future = pool.submit(images)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            pool.abandon(future)
+            last_error = TimeoutError(f"Inference timed out after {timeout}s")
+        except WorkerCrashed as exc:
+            last_error = exc
+        except AIValidationError:
+            raise
+        except Exception as exc:
+            last_error = exc
+            break
+
+        logger.warning("AI inference attempt %s in worker pool failed: %s", attempt + 1, last_error)
+
+    return [_inference_error(last_error)] * len(images)
+
+
+def _shutdown_process_pool():
+    global _PROCESS_POOL
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is not None:
+            _PROCESS_POOL.close()
+            _PROCESS_POOL = None
+
+
+class _InferenceBatcher:
+    """
+    Micro-batching scheduler in front of the shared pipeline.
+
+    Concurrent callers are queued; a single worker thread waits up to
+    window_ms after the first request (or until max_batch_size requests
+    are waiting) and runs them as one batched forward pass. With
+    concurrency > 1 (process backend) up to that many batches are in
+    flight at once.
+    """
+
+    def __init__(self, window_ms, max_batch_size, infer=None, concurrency=1):
+        self.window = window_ms / 1000
+        self.max_batch_size = max(1, max_batch_size)
+        self._infer = infer or _run_inference
+        self._concurrency = max(1, concurrency)
+        self._slots = BoundedSemaphore(self._concurrency)
+        self._dispatcher = None
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = Lock()
+        self._stats_lock = Lock()
+        self._batches = 0
+        self._requests = 0
+        self._largest_batch = 0
+        self._last_batch = 0
+
+    def submit(self, image):
+        if self.max_batch_size == 1:
+            results = self._infer([image])
+            self._record(1)
+        else:
+            self._ensure_worker()
+            future = Future()
+            self._queue.put((image, future))
+            results = [future.result()]
+
+        result = results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "requests": self._requests,
+                "avg_batch_size": self._requests / self._batches if self._batches else 0.0,
+                "max_batch_size": self._largest_batch,
+                "last_batch_size": self._last_batch,
+                "window_ms": self.window * 1000,
+                "batch_limit": self.max_batch_size,
+            }
+
+    def _record(self, size):
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += size
+            self._largest_batch = max(self._largest_batch, size)
+            self._last_batch = size
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = Thread(target=self._run, name="ai-inference-batcher", daemon=True)
+                self._worker.start()
+
+    def close(self):
+        """Stop the worker thread once the queued requests are served."""
+        with self._start_lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._queue.put(None)
+            worker.join()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Stop after this batch.
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        if self._concurrency > 1:
+            self._dispatcher = ThreadPoolExecutor(
+                max_workers=self._concurrency,
+                thread_name_prefix="ai-inference-dispatch",
+            )
+        while True:
+            self._slots.acquire()
+            batch = self._collect()
+            if batch is None:
+                self._slots.release()
+                break
+            if self._dispatcher is None:
+                self._complete(batch)
+            else:
+                self._dispatcher.submit(self._complete, batch)
+
+        if self._dispatcher is not None:
+            self._dispatcher.shutdown(wait=True)
+            self._dispatcher = None
+
+    def _complete(self, batch):
+        try:
+            images = [image for image, _ in batch]
+            try:
+                results = self._infer(images)
+            except Exception as exc:
+                results = [exc] * len(batch)
+
+            self._record(len(batch))
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        finally:
+            self._slots.release()
+
+
+_BATCHER = None
+
+
+def _get_batcher():
+    global _BATCHER
+
+    if _BATCHER is None:
+        with _PIPELINE_LOCK:
+            if _BATCHER is None:
+                _BATCHER = make_batcher()
+    return _BATCHER
+
+
+def make_batcher(window_ms=None, max_batch_size=None):
+    """
+    Build a batcher for the configured inference backend.
+
+    window_ms and max_batch_size default to AI_BATCH_WINDOW_MS and
+    AI_BATCH_MAX_SIZE. Call close() on it when done.
+    """
+    if getattr(settings, "AI_INFERENCE_BACKEND", "thread") == "process":
+        infer = _run_in_process_pool
+        concurrency = getattr(settings, "AI_INFERENCE_PROCESSES", 2)
+    else:
+        infer = _run_inference
+        concurrency = 1
+    return _InferenceBatcher(
+        window_ms=getattr(settings, "AI_BATCH_WINDOW_MS", 10) if window_ms is None else window_ms,
+        max_batch_size=getattr(settings, "AI_BATCH_MAX_SIZE", 8) if max_batch_size is None else max_batch_size,
+        infer=infer,
+        concurrency=concurrency,
+    )
+
+
+@contextmanager
+def use_batcher(batcher):
+    """Route predict_issue_image() through batcher inside the block, then close it."""
+    global _BATCHER
+
+    with _PIPELINE_LOCK:
+        previous, _BATCHER = _BATCHER, batcher
+    try:
+        yield batcher
+    finally:
+        with _PIPELINE_LOCK:
+            _BATCHER = previous
+        batcher.close()
+
+
+def load_pipeline():
+    """
+    Load a separate CLIP pipeline; returns (classifier, model name).
+
+    The shared pipeline is left alone. Pass the classifier to
+    use_pipeline() to serve inference from it.
+    """
+    return _load_pipeline(), _MODEL_NAME
+
+
+@contextmanager
+def use_pipeline(classifier):
+    """Serve inference from classifier instead of the CLIP pipeline inside the block."""
+    global _PIPELINE
+
+    with _PIPELINE_LOCK:
+        previous, _PIPELINE = _PIPELINE, classifier
+    try:
+        yield classifier
+    finally:
+        with _PIPELINE_LOCK:
+            _PIPELINE = previous
+
+
+def get_inference_stats():
+    """Queue depth and batch-size counters of the inference scheduler."""
+    stats = _get_batcher().stats()
+    stats["stages"] = get_stage_timings()
+    if _PROCESS_POOL is not None:
+        stats["process_pool"] = _PROCESS_POOL.stats()
+    return stats
+
+
+def _model_cache_key():
+    """Identifies the model and prompt set a cached result was produced with."""
+    digest = hashlib.sha256()
+    digest.update(_MODEL_NAME.encode())
+    digest.update(_HYPOTHESIS_TEMPLATE.encode())
+    for category, prompt in sorted(_CATEGORY_PROMPTS.items()):
+        digest.update(f"{category}={prompt}".encode())
+    return digest.hexdigest()
+
+
+def _result_to_category(result):
     top_prediction = result[0]
     predicted_prompt = top_prediction.get("label", "")
     confidence_score = float(top_prediction.get("score", 0.0))
@@ -173,3 +644,130 @@ def predict_issue_image(image_path):
 
     return _normalize_category(predicted_class), confidence_score
 
+
+def decode_image(source, max_size):
+    """
+    Open an upload and decode it to roughly max_size on its longest side.
+
+    File-like uploads are read in place rather than copied. JPEGs use the
+    decoder's draft mode to scale by 1/2, 1/4 or 1/8 while decoding, so a
+    12-megapixel photo never exists at full resolution in memory.
+    Returns (RGB image, {stage: seconds}).
+    """
+    timings = {}
+    started = time.perf_counter()
+
+    if hasattr(source, "read"):
+        source.seek(0)
+
+    with Image.open(source) as img:
+        timings["open"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        # draft() only applies to JPEG; other formats decode in full here.
+        img.draft("RGB", (max_size, max_size))
+        img.thumbnail((max_size, max_size), Image.Resampling.BICUBIC, reducing_gap=2.0)
+        timings["decode"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        image = img.convert("RGB")
+        timings["convert"] = time.perf_counter() - started
+
+    return image, timings
+
+
+_STAGE_STATS = {}
+_STAGE_STATS_LOCK = Lock()
+
+
+def _record_stage_timings(timings):
+    with _STAGE_STATS_LOCK:
+        for stage, seconds in timings.items():
+            stats = _STAGE_STATS.setdefault(stage, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0})
+            elapsed_ms = seconds * 1000
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["last_ms"] = elapsed_ms
+
+    logger.debug(
+        "AI validation stages: %s",
+        ", ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in timings.items()),
+    )
+
+
+def get_stage_timings():
+    """Per-stage timing counters of predict_issue_image, in milliseconds."""
+    with _STAGE_STATS_LOCK:
+        return {
+            stage: dict(stats, avg_ms=stats["total_ms"] / stats["count"])
+            for stage, stats in _STAGE_STATS.items()
+        }
+
+
+def classify_images(images):
+    """
+    Classify already-decoded images in batches, bypassing the result cache.
+
+    Returns one (predicted_class, confidence_score) tuple or
+    AIValidationError per image, in input order.
+    """
+    if getattr(settings, "AI_INFERENCE_BACKEND", "thread") == "process":
+        results = _run_in_process_pool(images)
+    else:
+        results = _run_inference(images)
+
+    predictions = []
+    for result in results:
+        if isinstance(result, Exception):
+            predictions.append(result)
+        elif not result:
+            predictions.append(AIValidationError("AI model could not classify this image."))
+        else:
+            predictions.append(_result_to_category(result))
+    return predictions
+
+
+def predict_issue_image(image_path, use_cache=True):
+    """
+    Predict issue category for an uploaded image.
+
+    use_cache=False skips the result cache even when it is enabled.
+
+    Returns:
+        tuple[str, float]: (predicted_class, confidence_score)
+    """
+    try:
+        image, timings = decode_image(image_path, getattr(settings, "AI_DECODE_MAX_SIZE", 448))
+    except FileNotFoundError as exc:
+        raise AIValidationError("Uploaded image file was not found.") from exc
+    except UnidentifiedImageError as exc:
+        raise AIValidationError("Uploaded file is not a valid image.") from exc
+    except OSError as exc:
+        raise AIValidationError("Could not read the uploaded image.") from exc
+
+    try:
+        use_cache = use_cache and result_cache.is_enabled()
+        if use_cache:
+            started = time.perf_counter()
+            model_key = _model_cache_key()
+            exact_hash = result_cache.content_hash(image_path)
+            image_hash = result_cache.perceptual_hash(image)
+            cached = result_cache.lookup(model_key, exact_hash, image_hash)
+            timings["cache_lookup"] = time.perf_counter() - started
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
+        result = _get_batcher().submit(image)
+        timings["inference"] = time.perf_counter() - started
+    finally:
+        _record_stage_timings(timings)
+
+    if not result:
+        raise AIValidationError("AI model could not classify this image.")
+
+    prediction = _result_to_category(result)
+    if use_cache:
+        result_cache.store(model_key, exact_hash, image_hash, *prediction)
+    return prediction
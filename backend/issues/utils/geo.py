@@ -0,0 +1,166 @@
+import math
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371
+GEOHASH_PRECISION = 9
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate pair as a base32 geohash string."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def geohash_cell_size(precision):
+    """Return (lat_degrees, lng_degrees) covered by one cell at this precision."""
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Smallest lat/lng box containing every point within radius_km.
+
+    Returns (min_lat, max_lat, min_lng, max_lng) or None when the circle
+    covers a pole or crosses the antimeridian and a box would not help.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    if angular >= math.pi:
+        return None
+
+    min_lat = latitude - math.degrees(angular)
+    max_lat = latitude + math.degrees(angular)
+    if min_lat <= -90 or max_lat >= 90:
+        return None
+
+    delta_lng = math.degrees(math.asin(math.sin(angular) / math.cos(math.radians(latitude))))
+    min_lng = longitude - delta_lng
+    max_lng = longitude + delta_lng
+    if min_lng < -180 or max_lng > 180:
+        return None
+
+    return min_lat, max_lat, min_lng, max_lng
+
+
+def covering_geohashes(min_lat, max_lat, min_lng, max_lng):
+    """
+    Geohash prefixes whose cells together cover the box.
+
+    Uses the finest precision where one cell is at least as large as the
+    box, so the corners map to at most four distinct prefixes.
+    """
+    lat_span = max_lat - min_lat
+    lng_span = max_lng - min_lng
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cell_lat, cell_lng = geohash_cell_size(precision)
+        if cell_lat >= lat_span and cell_lng >= lng_span:
+            corners = [
+                (min_lat, min_lng),
+                (min_lat, max_lng),
+                (max_lat, min_lng),
+                (max_lat, max_lng),
+            ]
+            return sorted({encode_geohash(lat, lng, precision) for lat, lng in corners})
+    return []
+
+
+def geohash_cells(min_lat, max_lat, min_lng, max_lng, precision, limit=None):
+    """
+    Every geohash cell at this precision that intersects the box, sorted.
+
+    Returns None when more than limit cells would be needed.
+    """
+    cell_lat, cell_lng = geohash_cell_size(precision)
+    last_row = round(180.0 / cell_lat) - 1
+    last_col = round(360.0 / cell_lng) - 1
+    rows = range(min(int((min_lat + 90) // cell_lat), last_row), min(int((max_lat + 90) // cell_lat), last_row) + 1)
+    cols = range(min(int((min_lng + 180) // cell_lng), last_col), min(int((max_lng + 180) // cell_lng), last_col) + 1)
+    if limit is not None and len(rows) * len(cols) > limit:
+        return None
+
+    return sorted(
+        encode_geohash(-90 + (row + 0.5) * cell_lat, -180 + (col + 0.5) * cell_lng, precision)
+        for row in rows
+        for col in cols
+    )
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Haversine distance in km between two points."""
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+
+    a = (
+        math.sin(dlat / 2) ** 2 +
+        math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
+    )
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+def haversine_many(lat, lng, latitudes, longitudes):
+    """Vectorized haversine distance in km from one point to many."""
+    latitudes = np.asarray(latitudes, dtype=float)
+    lat1 = math.radians(lat)
+    lat2 = np.radians(latitudes)
+    dlat = np.radians(latitudes - lat)
+    dlon = np.radians(np.asarray(longitudes, dtype=float) - lng)
+
+    a = (
+        np.sin(dlat / 2) ** 2 +
+        math.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    )
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+MAX_MERCATOR_LATITUDE = 85.05112878
+
+
+def tile_for(latitude, longitude, zoom):
+    """Web-mercator (slippy map) tile (x, y) containing the point at this zoom."""
+    n = 2 ** zoom
+    latitude = max(-MAX_MERCATOR_LATITUDE, min(MAX_MERCATOR_LATITUDE, latitude))
+    lat_rad = math.radians(latitude)
+
+    x = int((longitude + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
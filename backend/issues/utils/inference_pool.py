@@ -0,0 +1,192 @@
+import itertools
+import logging
+import multiprocessing
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+from threading import Lock, Thread
+
+import django
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerCrashed(RuntimeError):
+    """An inference worker process died while holding a job."""
+
+
+def _worker_main(jobs, results, infer_path):
+    # A spawned worker starts from a fresh interpreter: set Django up before
+    # importing the inference callable, which loads its own model lazily.
+    django.setup()
+    infer = import_string(infer_path)
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        job_id, images = job
+        try:
+            results.send((job_id, True, infer(images)))
+        except BaseException as exc:
+            results.send((job_id, False, exc))
+
+
+class _Worker:
+    def __init__(self, context, infer_path, index):
+        self.index = index
+        self.jobs = context.Queue()
+        # Each worker gets its own result pipe so a worker killed mid-send
+        # can only corrupt its own channel, never another worker's results.
+        self.results, writer = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=_worker_main,
+            args=(self.jobs, writer, infer_path),
+            name=f"ai-inference-{index}",
+            daemon=True,
+        )
+        self.process.start()
+        writer.close()
+        self.in_flight = set()
+
+    def stop(self):
+        self.jobs.put(None)
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=5)
+        self.results.close()
+
+
+class InferencePool:
+    """
+    Fixed set of spawned model-holding worker processes.
+
+    infer is the dotted path of the inference callable; each worker imports
+    it and loads its own model. Workers are spawned rather than forked, so
+    they never inherit the parent's threads, locks or OpenMP/MKL state.
+    Jobs are dispatched to the least busy worker; a collector thread
+    resolves futures and restarts crashed workers.
+    """
+
+    def __init__(self, infer, workers=2):
+        self._infer = infer
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = Lock()
+        self._ids = itertools.count()
+        self._pending = {}
+        self._restarts = 0
+        self._workers = [
+            _Worker(self._context, infer, index)
+            for index in range(max(1, workers))
+        ]
+        self._closed = False
+        self._collector = Thread(target=self._collect, name="ai-inference-collector", daemon=True)
+        self._collector.start()
+
+    def submit(self, images):
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Inference pool is closed.")
+            job_id = next(self._ids)
+            worker = min(self._workers, key=lambda item: len(item.in_flight))
+            worker.in_flight.add(job_id)
+            self._pending[job_id] = (future, worker)
+        worker.jobs.put((job_id, images))
+        return future
+
+    def abandon(self, future):
+        """Restart the worker stuck on a timed-out job."""
+        with self._lock:
+            for job_id, (pending, worker) in list(self._pending.items()):
+                if pending is future:
+                    logger.warning("Inference job %s timed out; restarting worker %s", job_id, worker.index)
+                    worker.process.terminate()
+                    break
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": len(self._workers),
+                "alive": sum(worker.process.is_alive() for worker in self._workers),
+                "in_flight": len(self._pending),
+                "restarts": self._restarts,
+            }
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+        for worker in workers:
+            worker.stop()
+
+    def _resolve(self, job_id, ok, payload):
+        with self._lock:
+            entry = self._pending.pop(job_id, None)
+            if entry is None:
+                return
+            future, worker = entry
+            worker.in_flight.discard(job_id)
+        if ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(payload)
+
+    def _replace_dead_workers(self):
+        with self._lock:
+            if self._closed:
+                return
+            dead = [worker for worker in self._workers if not worker.process.is_alive()]
+        if not dead:
+            return
+
+        # Start replacements outside the lock so submit() and the collector
+        # never wait on a process start-up.
+        replacements = {}
+        for worker in dead:
+            logger.error(
+                "Inference worker %s exited with code %s; restarting",
+                worker.index, worker.process.exitcode,
+            )
+            replacements[worker] = _Worker(self._context, self._infer, worker.index)
+
+        orphaned = []
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                for worker, replacement in replacements.items():
+                    self._workers[self._workers.index(worker)] = replacement
+                    self._restarts += 1
+                    worker.results.close()
+                    # Includes jobs submitted to the dead worker meanwhile.
+                    for job_id in worker.in_flight:
+                        future, _ = self._pending.pop(job_id)
+                        orphaned.append(future)
+
+        if closed:
+            for replacement in replacements.values():
+                replacement.stop()
+        for future in orphaned:
+            future.set_exception(WorkerCrashed("Inference worker crashed."))
+
+    def _collect(self):
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                readers = {worker.results: worker for worker in self._workers}
+            try:
+                ready = wait(list(readers), timeout=0.5)
+            except OSError:
+                # A reader was closed by a concurrent restart; rebuild the list.
+                ready = []
+            for reader in ready:
+                try:
+                    job_id, ok, payload = reader.recv()
+                except (EOFError, OSError):
+                    # The worker died; reap it so the restart below sees it.
+                    readers[reader].process.join(timeout=1)
+                    continue
+                self._resolve(job_id, ok, payload)
+            self._replace_dead_workers()
@@ -0,0 +1,176 @@
+import hashlib
+import logging
+from threading import Lock
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image
+
+
+logger = logging.getLogger(__name__)
+
+_STATS_LOCK = Lock()
+_STATS = {
+    "exact_hits": 0,
+    "perceptual_hits": 0,
+    "misses": 0,
+    "evictions": 0,
+}
+# New entries stored by this process since the last eviction check.
+_INSERTS_SINCE_EVICTION = 0
+
+
+def max_entries():
+    return getattr(settings, "AI_RESULT_CACHE_MAX_ENTRIES", 10000)
+
+
+def is_enabled():
+    return max_entries() > 0
+
+
+def content_hash(source, chunk_size=1024 * 1024):
+    """SHA-256 of raw upload bytes, a path, or a seekable file-like object."""
+    digest = hashlib.sha256()
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+        return digest.hexdigest()
+
+    if hasattr(source, "read"):
+        source.seek(0)
+        for chunk in iter(lambda: source.read(chunk_size), b""):
+            digest.update(chunk)
+        source.seek(0)
+        return digest.hexdigest()
+
+    with open(source, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def perceptual_hash(image):
+    """
+    64-bit difference hash plus a coarse mean colour, as hex.
+
+    Survives re-encoding and resizing; the colour suffix keeps flat or
+    very dark images of different scenes from colliding on the gradient bits.
+    """
+    gray = image.convert("L").resize((9, 8), Image.Resampling.BILINEAR)
+    pixels = list(gray.getdata())
+
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            bits = (bits << 1) | (1 if left > right else 0)
+
+    mean = image.resize((1, 1), Image.Resampling.BOX).getpixel((0, 0))
+    color = "".join(f"{channel // 32:x}" for channel in mean[:3])
+    return f"{bits:016x}{color}"
+
+
+def _record(stat):
+    with _STATS_LOCK:
+        _STATS[stat] += 1
+
+
+def get_stats():
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    lookups = stats["exact_hits"] + stats["perceptual_hits"] + stats["misses"]
+    stats["hit_rate"] = (stats["exact_hits"] + stats["perceptual_hits"]) / lookups if lookups else 0.0
+    return stats
+
+
+def reset_stats():
+    global _INSERTS_SINCE_EVICTION
+
+    with _STATS_LOCK:
+        for key in _STATS:
+            _STATS[key] = 0
+        _INSERTS_SINCE_EVICTION = 0
+
+
+def lookup(model_key, exact_hash, image_hash):
+    """Return a cached (prediction, confidence) for the image, or None."""
+    from issues.models import ClassificationCacheEntry
+
+    try:
+        entry = ClassificationCacheEntry.objects.filter(
+            model_key=model_key, content_hash=exact_hash
+        ).first()
+        stat = "exact_hits"
+        if entry is None:
+            entry = ClassificationCacheEntry.objects.filter(
+                model_key=model_key, perceptual_hash=image_hash
+            ).order_by("-last_used_at").first()
+            stat = "perceptual_hits"
+    except DatabaseError:
+        logger.exception("Classification cache lookup failed")
+        return None
+
+    if entry is None:
+        _record("misses")
+        return None
+
+    _record(stat)
+    ClassificationCacheEntry.objects.filter(pk=entry.pk).update(
+        last_used_at=timezone.now(),
+        hits=F("hits") + 1,
+    )
+    return entry.prediction, entry.confidence
+
+
+def store(model_key, exact_hash, image_hash, prediction, confidence):
+    from issues.models import ClassificationCacheEntry
+
+    try:
+        _, created = ClassificationCacheEntry.objects.update_or_create(
+            model_key=model_key,
+            content_hash=exact_hash,
+            defaults={
+                "perceptual_hash": image_hash,
+                "prediction": prediction,
+                "confidence": confidence,
+                "last_used_at": timezone.now(),
+            },
+        )
+        if created and _eviction_due():
+            _evict(ClassificationCacheEntry)
+    except (IntegrityError, DatabaseError):
+        logger.exception("Classification cache store failed")
+
+
+def _eviction_due():
+    """
+    True on every AI_RESULT_CACHE_EVICT_EVERY-th new entry.
+
+    Counting the table on every store would cost a COUNT(*) per upload;
+    between checks each process can overshoot the limit by that many rows.
+    """
+    global _INSERTS_SINCE_EVICTION
+
+    with _STATS_LOCK:
+        _INSERTS_SINCE_EVICTION += 1
+        if _INSERTS_SINCE_EVICTION < getattr(settings, "AI_RESULT_CACHE_EVICT_EVERY", 100):
+            return False
+        _INSERTS_SINCE_EVICTION = 0
+        return True
+
+
+def _evict(model):
+    """Drop least recently used entries beyond AI_RESULT_CACHE_MAX_ENTRIES."""
+    overflow = model.objects.count() - max_entries()
+    if overflow <= 0:
+        return
+
+    stale_ids = list(
+        model.objects.order_by("last_used_at").values_list("pk", flat=True)[:overflow]
+    )
+    deleted, _ = model.objects.filter(pk__in=stale_ids).delete()
+    with _STATS_LOCK:
+        _STATS["evictions"] += deleted
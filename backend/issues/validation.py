@@ -0,0 +1,155 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from threading import BoundedSemaphore, Lock
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Issue
+from .notifications import notify_role, notify_users
+from .utils.ai_validator import AIValidationError, predict_issue_image
+
+
+logger = logging.getLogger(__name__)
+
+MIN_CONFIDENCE = 0.6
+
+_EXECUTOR = None
+_SLOTS = None
+_EXECUTOR_LOCK = Lock()
+
+
+def normalize_selected_category(value):
+    normalized = str(value).strip().lower().replace("_", "")
+    aliases = {
+        "streetlight": "streetlight",
+        "water": "other",
+    }
+    return aliases.get(normalized, normalized)
+
+
+def prediction_error(selected_category, ai_prediction, ai_confidence):
+    """Return the rejection message for a prediction, or None if it is accepted."""
+    if ai_confidence < MIN_CONFIDENCE:
+        return "Low confidence image, please upload a clear image"
+
+    if ai_prediction != normalize_selected_category(selected_category):
+        return "Image does not match selected category"
+
+    return None
+
+
+def is_async_mode():
+    return getattr(settings, "AI_VALIDATION_MODE", "sync") == "async"
+
+
+def validate_issue(issue_id):
+    """
+    Classify a PENDING_VALIDATION issue and record the outcome.
+
+    Accepted issues become VALIDATED and admins are notified as for a
+    synchronous create; rejected ones become REJECTED and the reporter is
+    told why.
+    """
+    issue = Issue.objects.select_related("reported_by").filter(
+        pk=issue_id,
+        validation_status="PENDING_VALIDATION",
+    ).first()
+    if issue is None:
+        return None
+
+    try:
+        with issue.image.open("rb") as image_file:
+            ai_prediction, ai_confidence = predict_issue_image(image_file)
+        error = prediction_error(issue.category, ai_prediction, ai_confidence)
+    except (AIValidationError, ValueError, OSError) as exc:
+        ai_prediction, ai_confidence = "", None
+        error = str(exc) or "Could not read the uploaded image."
+
+    issue.ai_prediction = ai_prediction
+    issue.ai_confidence = ai_confidence
+    issue.validation_status = "REJECTED" if error else "VALIDATED"
+    issue.validation_message = error or ""
+    issue.save(update_fields=["ai_prediction", "ai_confidence", "validation_status", "validation_message"])
+
+    if error:
+        notify_users(
+            [issue.reported_by_id],
+            f"Your issue '{issue.title}' was rejected: {error}"
+        )
+    else:
+        notify_role(
+            "ADMIN",
+            f"New issue reported by {issue.reported_by.username}: {issue.title}",
+            digest_issue_id=issue.id,
+        )
+    return issue.validation_status
+
+
+def _get_executor():
+    global _EXECUTOR, _SLOTS
+
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                workers = getattr(settings, "AI_VALIDATION_WORKERS", 2)
+                queue_size = getattr(settings, "AI_VALIDATION_QUEUE_SIZE", 32)
+                _SLOTS = BoundedSemaphore(workers + queue_size)
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="issue-validation",
+                )
+    return _EXECUTOR
+
+
+def _run_validation(issue_id):
+    try:
+        validate_issue(issue_id)
+    except Exception:
+        logger.exception("Background validation of issue %s failed", issue_id)
+    finally:
+        _SLOTS.release()
+        close_old_connections()
+
+
+def _submit(issue_id):
+    executor = _get_executor()
+    if not _SLOTS.acquire(blocking=False):
+        # Pool is saturated: apply backpressure on the caller instead of queueing unbounded work.
+        logger.warning("Validation queue full, validating issue %s inline", issue_id)
+        try:
+            validate_issue(issue_id)
+        except Exception:
+            logger.exception("Inline validation of issue %s failed", issue_id)
+        return
+    executor.submit(_run_validation, issue_id)
+
+
+def schedule_issue_validation(issue_id):
+    """Queue background validation once the issue row is committed."""
+    transaction.on_commit(lambda: _submit(issue_id))
+
+
+def revalidate_stale_issues(older_than_minutes=None):
+    """
+    Validate PENDING_VALIDATION issues left behind by a process that died
+    before its worker pool got to them. Runs inline; returns
+    {validation_status: count}.
+    """
+    if older_than_minutes is None:
+        older_than_minutes = getattr(settings, "AI_VALIDATION_STALE_MINUTES", 10)
+    cutoff = timezone.now() - timedelta(minutes=older_than_minutes)
+
+    outcomes = {}
+    stale = Issue.objects.filter(validation_status="PENDING_VALIDATION", created_at__lt=cutoff)
+    for issue_id in stale.order_by("created_at").values_list("id", flat=True).iterator():
+        try:
+            outcome = validate_issue(issue_id)
+        except Exception:
+            logger.exception("Revalidation of issue %s failed", issue_id)
+            outcome = "FAILED"
+        if outcome is not None:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    return outcomes
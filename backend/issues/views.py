@@ -3,15 +3,42 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django.db.models import Count
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
-from .websocket import send_realtime_notification
-from .utils.ai_validator import predict_issue_image, AIValidationError
+from . import outbox
+from .notifications import notify_role, notify_users
+from .permissions import visible_issues
+from .unread import get_unread_count
+from .analytics import get_timeseries
+from .clustering import get_clusters
+from .dashboard import get_dashboard_stats
+from .validation import (
+    is_async_mode,
+    normalize_selected_category,
+    prediction_error,
+    schedule_issue_validation,
+)
+from .utils.ai_validator import (
+    predict_issue_image,
+    AIValidationError,
+    ensure_warm_up,
+    get_inference_stats,
+    get_model_status,
+    is_warmed_up,
+)
+from .utils.geo import bounding_box, covering_geohashes, haversine_many
 import math
+from datetime import datetime, time, timedelta
+import numpy as np
 
 from .models import Issue, User, Notification
+from .pagination import IssuePagination, NotificationPagination
 from .serializers import IssueSerializer, RegisterUserSerializer
+from .websocket import issue_live_state
 
 
 # USER VIEWSET
@@ -66,39 +93,32 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
 class IssueViewSet(viewsets.ModelViewSet):
     serializer_class = IssueSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = IssuePagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['category', 'status']
+    filterset_fields = ['category', 'status', 'validation_status']
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'priority_score']
 
     @staticmethod
     def _normalize_category(value):
-        normalized = str(value).strip().lower().replace("_", "")
-        aliases = {
-            "streetlight": "streetlight",
-            "water": "other",
-        }
-        return aliases.get(normalized, normalized)
+        return normalize_selected_category(value)
 
-    def _notify_users(self, users, message):
-        for target_user in users:
-            notification = Notification.objects.create(
-                user=target_user,
-                message=message
-            )
-            send_realtime_notification(target_user.id, notification)
+    def _notify_users(self, user_ids, message):
+        notify_users(user_ids, message)
+
+    def _publish_changes(self, issue, previous_state):
+        # Live subscribers (ws/issues/) get only the fields that changed, via the outbox.
+        changes = {
+            field: value
+            for field, value in issue_live_state(issue).items()
+            if previous_state[field] != value
+        }
+        if changes:
+            outbox.enqueue_issue_update(issue, changes)
 
     # ROLE BASED QUERYSET
     def get_queryset(self):
-        user = self.request.user
-
-        if user.role == 'ADMIN':
-            return Issue.objects.all().order_by('-created_at')
-
-        elif user.role == 'WORKER':
-            return Issue.objects.filter(assigned_to=user).order_by('-created_at')
-
-        return Issue.objects.filter(reported_by=user).order_by('-created_at')
+        return visible_issues(self.request.user).order_by('-created_at')
 
     # CREATE ISSUE (USER ONLY)
     def perform_create(self, serializer):
@@ -106,33 +126,37 @@ class IssueViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("Only users can report issues.")
 
         image_file = serializer.validated_data.get("image")
-        selected_category = self._normalize_category(serializer.validated_data.get("category"))
-
-        ai_prediction = ""
-        ai_confidence = None
 
         if not image_file:
             raise serializers.ValidationError({"image": "Issue image is required."})
 
+        priority = self.calculate_priority(
+            category=serializer.validated_data.get("category"),
+            status="PENDING"
+        )
+
+        if is_async_mode():
+            # Save now; classification and the admin notification happen in the background.
+            issue = serializer.save(
+                reported_by=self.request.user,
+                priority_score=priority,
+                validation_status="PENDING_VALIDATION",
+            )
+            schedule_issue_validation(issue.id)
+            return
+
         try:
             ai_prediction, ai_confidence = predict_issue_image(image_file)
         except AIValidationError as exc:
             raise serializers.ValidationError({"image": str(exc)})
 
-        if ai_confidence < 0.6:
-            raise serializers.ValidationError(
-                {"image": "Low confidence image, please upload a clear image"}
-            )
-
-        if ai_prediction != selected_category:
-            raise serializers.ValidationError(
-                {"image": "Image does not match selected category"}
-            )
-
-        priority = self.calculate_priority(
-            category=serializer.validated_data.get("category"),
-            status="PENDING"
+        error = prediction_error(
+            serializer.validated_data.get("category"),
+            ai_prediction,
+            ai_confidence,
         )
+        if error:
+            raise serializers.ValidationError({"image": error})
 
         issue = serializer.save(
             reported_by=self.request.user,
@@ -142,10 +166,10 @@ class IssueViewSet(viewsets.ModelViewSet):
         )
 
         # Notify all admins when a new issue is reported.
-        admins = User.objects.filter(role="ADMIN")
-        self._notify_users(
-            admins,
-            f"New issue reported by {self.request.user.username}: {issue.title}"
+        notify_role(
+            "ADMIN",
+            f"New issue reported by {self.request.user.username}: {issue.title}",
+            digest_issue_id=issue.id,
         )
 
     # UPDATE ISSUE
@@ -157,6 +181,7 @@ class IssueViewSet(viewsets.ModelViewSet):
         if user.role == "ADMIN":
             previous_assigned = issue.assigned_to
             previous_status = issue.status
+            previous_state = issue_live_state(issue)
             response = super().update(request, *args, **kwargs)
             issue.refresh_from_db()
 
@@ -165,19 +190,20 @@ class IssueViewSet(viewsets.ModelViewSet):
                 new_worker = issue.assigned_to
                 if new_worker and new_worker != previous_assigned:
                     self._notify_users(
-                        [new_worker],
+                        [new_worker.id],
                         f"You have been assigned issue: {issue.title}"
                     )
 
             # Admin confirms resolution -> notify reporter
             if issue.status == "RESOLVED" and previous_status != "RESOLVED":
                 self._notify_users(
-                    [issue.reported_by],
+                    [issue.reported_by_id],
                     f"Your issue '{issue.title}' has been resolved by admin."
                 )
 
             issue.priority_score = self.calculate_priority(issue.category, issue.status)
             issue.save(update_fields=["priority_score"])
+            self._publish_changes(issue, previous_state)
 
             return response
 
@@ -195,14 +221,15 @@ class IssueViewSet(viewsets.ModelViewSet):
             if new_status == previous_status:
                 return Response(IssueSerializer(issue, context={"request": request}).data)
 
+            previous_state = issue_live_state(issue)
             issue.status = new_status
             issue.priority_score = self.calculate_priority(issue.category, new_status)
             issue.save(update_fields=["status", "priority_score"])
+            self._publish_changes(issue, previous_state)
 
             if new_status == "COMPLETED":
-                admins = User.objects.filter(role="ADMIN")
-                self._notify_users(
-                    admins,
+                notify_role(
+                    "ADMIN",
                     f"Worker {user.username} marked issue '{issue.title}' as COMPLETED"
                 )
 
@@ -228,13 +255,14 @@ class IssueViewSet(viewsets.ModelViewSet):
         if issue.status == "COMPLETED":
             return Response({"detail": "Issue is already marked COMPLETED."}, status=status.HTTP_200_OK)
 
+        previous_state = issue_live_state(issue)
         issue.status = "COMPLETED"
         issue.priority_score = self.calculate_priority(issue.category, "COMPLETED")
         issue.save(update_fields=["status", "priority_score"])
+        self._publish_changes(issue, previous_state)
 
-        admins = User.objects.filter(role="ADMIN")
-        self._notify_users(
-            admins,
+        notify_role(
+            "ADMIN",
             f"Worker {user.username} marked issue '{issue.title}' as COMPLETED"
         )
 
@@ -271,15 +299,47 @@ class DashboardStatsView(APIView):
         if request.user.role != "ADMIN":
             raise PermissionDenied("Only admin can view dashboard.")
 
-        return Response({
-            "total": Issue.objects.count(),
-            "pending": Issue.objects.filter(status='PENDING').count(),
-            "in_progress": Issue.objects.filter(status='IN_PROGRESS').count(),
-            "completed": Issue.objects.filter(status='COMPLETED').count(),
-            "resolved": Issue.objects.filter(status='RESOLVED').count(),
-            "issues_by_category": Issue.objects.values('category').annotate(count=Count('category')),
-            "issues_by_status": Issue.objects.values('status').annotate(count=Count('status')),
-        })
+        # Served from a snapshot kept current by issue signals; ?fresh=1 recomputes it.
+        fresh = request.query_params.get("fresh", "").lower() in ("1", "true")
+        return Response(get_dashboard_stats(fresh=fresh))
+
+
+# ISSUE ANALYTICS (ADMIN ONLY)
+
+class AnalyticsTimeseriesView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @staticmethod
+    def _parse_moment(value):
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError(value)
+            moment = datetime.combine(day, time.min)
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    def get(self, request):
+        if request.user.role != "ADMIN":
+            raise PermissionDenied("Only admin can view analytics.")
+
+        params = request.query_params
+        granularity = params.get('granularity', 'day')
+        category = params.get('category') or None
+        try:
+            end = self._parse_moment(params['end']) if params.get('end') else timezone.now()
+            start = self._parse_moment(params['start']) if params.get('start') else end - timedelta(days=30)
+        except ValueError:
+            return Response({"error": "start and end must be ISO 8601 dates or timestamps"}, status=400)
+
+        try:
+            series = get_timeseries(start, end, granularity=granularity, category=category)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        return Response({"granularity": granularity, "category": category, "series": series})
 
 
 # NEARBY ISSUES
@@ -295,33 +355,92 @@ class NearbyIssuesView(APIView):
         except (TypeError, ValueError):
             return Response({"error": "Invalid parameters"}, status=400)
 
-        issues = Issue.objects.all()
-        nearby = []
-
-        for issue in issues:
-            distance = self.haversine(
-                user_lat, user_lng,
-                issue.latitude, issue.longitude
+        if not (radius >= 0 and math.isfinite(user_lat) and math.isfinite(user_lng)):
+            return Response([])
+
+        issues = Issue.objects.filter(validation_status='VALIDATED')
+        box = bounding_box(user_lat, user_lng, radius)
+        if box is not None:
+            min_lat, max_lat, min_lng, max_lng = box
+            cells = covering_geohashes(min_lat, max_lat, min_lng, max_lng)
+            if cells:
+                cell_filter = Q()
+                for cell in cells:
+                    cell_filter |= Q(geohash__startswith=cell)
+                issues = issues.filter(cell_filter)
+            issues = issues.filter(
+                latitude__range=(min_lat, max_lat),
+                longitude__range=(min_lng, max_lng),
             )
-            if distance <= radius:
-                nearby.append(issue)
+
+        candidates = list(issues.values_list('id', 'latitude', 'longitude'))
+        if not candidates:
+            return Response([])
+
+        ids, latitudes, longitudes = zip(*candidates)
+        distances = haversine_many(user_lat, user_lng, latitudes, longitudes)
+
+        # Exact radius check on the candidates, nearest first.
+        order = np.argsort(distances, kind='stable')
+        nearby_ids = [ids[i] for i in order if distances[i] <= radius]
+
+        issues_by_id = Issue.objects.in_bulk(nearby_ids)
+        nearby = [issues_by_id[issue_id] for issue_id in nearby_ids]
 
         return Response(IssueSerializer(nearby, many=True).data)
 
-    def haversine(self, lat1, lon1, lat2, lon2):
-        R = 6371
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
 
-        a = (
-            math.sin(dlat / 2) ** 2 +
-            math.cos(math.radians(lat1)) *
-            math.cos(math.radians(lat2)) *
-            math.sin(dlon / 2) ** 2
+# AI READINESS
+
+class AIReadinessView(APIView):
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        # Without warm-up the model loads lazily, so the instance is always routable.
+        if settings.AI_WARMUP_ON_STARTUP:
+            # No-op unless this process has not started its warm-up yet.
+            ensure_warm_up()
+            ready = is_warmed_up()
+        else:
+            ready = True
+        model_status = get_model_status()
+
+        return Response(
+            {
+                "ready": ready,
+                "warmup_enabled": settings.AI_WARMUP_ON_STARTUP,
+                "model": model_status,
+                "inference": get_inference_stats(),
+            },
+            status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
         )
 
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        return R * c
+
+# MAP CLUSTERS
+
+class IssueClustersView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            min_lat = float(request.query_params.get('min_lat'))
+            min_lng = float(request.query_params.get('min_lng'))
+            max_lat = float(request.query_params.get('max_lat'))
+            max_lng = float(request.query_params.get('max_lng'))
+            zoom = int(request.query_params.get('zoom'))
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid parameters"}, status=400)
+
+        if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= 180 and -180 <= max_lng <= 180):
+            return Response({"error": "Invalid bounding box"}, status=400)
+
+        try:
+            grid_zoom, clusters = get_clusters(min_lat, min_lng, max_lat, max_lng, zoom)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        return Response({"zoom": grid_zoom, "clusters": clusters})
 
 
 # NOTIFICATIONS
@@ -334,11 +453,53 @@ class NotificationSerializer(serializers.ModelSerializer):
 class NotificationViewSet(viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationPagination
 
     @action(detail=False, methods=["get"])
     def unread_count(self, request):
-        count = self.get_queryset().filter(is_read=False).count()
-        return Response({"unread_count": count})
+        return Response({"unread_count": get_unread_count(request.user.id)})
+
+    # Digest window for new-issue notifications, in minutes (0 = immediate).
+    @action(detail=False, methods=["get", "patch"])
+    def digest(self, request):
+        user = request.user
+        if request.method == "PATCH":
+            minutes = request.data.get("digest_minutes")
+            max_minutes = getattr(settings, "NOTIFICATION_DIGEST_MAX_MINUTES", 60)
+            if not isinstance(minutes, int) or isinstance(minutes, bool) or not 0 <= minutes <= max_minutes:
+                raise serializers.ValidationError(
+                    {"digest_minutes": f"A whole number of minutes between 0 and {max_minutes} is required."}
+                )
+            user.notification_digest_minutes = minutes
+            user.save(update_fields=["notification_digest_minutes"])
+        return Response({"digest_minutes": user.notification_digest_minutes})
+
+    # Bulk actions run as one UPDATE/DELETE; the changed unread count reaches
+    # the client as a single websocket event.
+    @action(detail=False, methods=["post"])
+    def mark_all_read(self, request):
+        updated = self.get_queryset().mark_read()
+        return Response({"updated": updated})
+
+    @action(detail=False, methods=["post"])
+    def mark_read_before(self, request):
+        before = parse_datetime(str(request.data.get("before", "")))
+        if before is None:
+            raise serializers.ValidationError({"before": "An ISO 8601 timestamp is required."})
+        if timezone.is_naive(before):
+            before = timezone.make_aware(before)
+
+        updated = self.get_queryset().filter(created_at__lt=before).mark_read()
+        return Response({"updated": updated})
+
+    @action(detail=False, methods=["post"])
+    def bulk_delete(self, request):
+        ids = request.data.get("ids")
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            raise serializers.ValidationError({"ids": "A list of notification ids is required."})
+
+        _, per_model = self.get_queryset().filter(pk__in=ids).delete()
+        return Response({"deleted": per_model.get(Notification._meta.label, 0)})
 
     def get_queryset(self):
         return Notification.objects.filter(
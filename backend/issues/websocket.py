@@ -1,18 +1,161 @@
+import asyncio
+import json
+
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
+from django.conf import settings
+
+
+def _notification_payload(notification):
+    return {
+        "id": notification.id,
+        "message": notification.message,
+        "is_read": notification.is_read,
+        "issue_ids": notification.issue_ids,
+        "created_at": notification.created_at.isoformat(),
+    }
+
+
+def _notification_event(notification):
+    return {
+        "type": "send_notification",
+        "notification": _notification_payload(notification),
+    }
+
 
 def send_realtime_notification(user_id, notification):
     channel_layer = get_channel_layer()
 
     async_to_sync(channel_layer.group_send)(
         f"user_{user_id}",
-        {
-            "type": "send_notification",
-            "notification": {
-                "id": notification.id,
-                "message": notification.message,
-                "is_read": notification.is_read,
-                "created_at": notification.created_at.isoformat(),
-            },
-        }
+        _notification_event(notification)
     )
+
+
+def send_realtime_notifications(notifications):
+    """Push each notification to its owner's group in one event-loop round trip."""
+    if not notifications:
+        return
+
+    channel_layer = get_channel_layer()
+
+    async def fan_out():
+        await asyncio.gather(*(
+            channel_layer.group_send(f"user_{notification.user_id}", _notification_event(notification))
+            for notification in notifications
+        ))
+
+    async_to_sync(fan_out)()
+
+
+def broadcast_role_notifications(role, notifications):
+    """
+    Publish notifications for many users of one role with one group_send per
+    distinct message.
+
+    Each event carries the shared payload once plus a small
+    {user_id: notification_id} map; every consumer in role_<role> builds its
+    own user's frame from those, so clients see what send_notification
+    sends. created_at is that of the first notification in the batch.
+    """
+    if not notifications:
+        return
+
+    events = {}
+    for notification in notifications:
+        payload = _notification_payload(notification)
+        key = (payload["message"], json.dumps(payload["issue_ids"]), payload["is_read"])
+        event = events.setdefault(key, {
+            "type": "send_role_notification",
+            "notification": {field: value for field, value in payload.items() if field != "id"},
+            # String keys: channel layers serialize events with msgpack/JSON.
+            "ids": {},
+        })
+        event["ids"][str(notification.user_id)] = notification.id
+
+    channel_layer = get_channel_layer()
+
+    async def fan_out():
+        # Sequential, so clients receive the batch in order.
+        for event in events.values():
+            await channel_layer.group_send(f"role_{role}", event)
+
+    async_to_sync(fan_out)()
+
+
+def send_unread_counts(counts):
+    """Push {user_id: unread_count} to each user's group in one event-loop round trip."""
+    if not counts:
+        return
+
+    channel_layer = get_channel_layer()
+
+    async def fan_out():
+        await asyncio.gather(*(
+            channel_layer.group_send(f"user_{user_id}", {"type": "send_unread_count", "unread_count": count})
+            for user_id, count in counts.items()
+        ))
+
+    async_to_sync(fan_out)()
+
+
+def issue_live_state(issue):
+    """Fields pushed to live issue subscribers when they change."""
+    return {
+        "status": issue.status,
+        "assigned_to": issue.assigned_to_id,
+        "priority_score": issue.priority_score,
+    }
+
+
+def issue_area_group(geohash):
+    precision = getattr(settings, "ISSUE_LIVE_GEOHASH_PRECISION", 4)
+    return f"issues_area_{geohash[:precision]}"
+
+
+def _issue_update_events(issue, changes):
+    payload = {
+        "type": "issue_update",
+        "id": issue.id,
+        "changes": changes,
+        "latitude": issue.latitude,
+        "longitude": issue.longitude,
+    }
+    audience = {"reported_by": issue.reported_by_id, "assigned_to": issue.assigned_to_id}
+    return [
+        (f"issue_{issue.id}", {"type": "send_issue_update", "issue": payload, **audience}),
+        (issue_area_group(issue.geohash), {"type": "send_area_issue_update", "issue": payload, **audience}),
+    ]
+
+
+def send_issue_update(issue, changes):
+    """
+    Push changed fields of an issue to clients watching it by id and to map
+    viewports over its geohash cell.
+
+    Visibility is checked by each consumer, so the event carries the
+    reporter and assignee alongside the payload.
+    """
+    send_issue_updates([(issue, changes)])
+
+
+def send_issue_updates(updates):
+    """send_issue_update() for many (issue, changes) pairs in one event-loop round trip."""
+    if not updates:
+        return
+
+    channel_layer = get_channel_layer()
+
+    async def fan_out():
+        # Updates to one issue are sent in order; different issues concurrently.
+        by_issue = {}
+        for issue, changes in updates:
+            by_issue.setdefault(issue.id, []).extend(_issue_update_events(issue, changes))
+
+        async def send_in_order(events):
+            for group, event in events:
+                await channel_layer.group_send(group, event)
+
+        await asyncio.gather(*(send_in_order(events) for events in by_issue.values()))
+
+    async_to_sync(fan_out)()
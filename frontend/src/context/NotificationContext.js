@@ -13,16 +13,25 @@ export const NotificationProvider = ({ children }) => {
   const wsRef = useRef(null);
   const reconnectTimeoutRef = useRef(null);
   const shouldReconnectRef = useRef(true);
+  // Highest notification id seen, sent on reconnect so the server replays only what was missed.
+  const lastSeenIdRef = useRef(null);
+
+  const trackSeen = useCallback((id) => {
+    if (typeof id === 'number' && (lastSeenIdRef.current === null || id > lastSeenIdRef.current)) {
+      lastSeenIdRef.current = id;
+    }
+  }, []);
 
   const refreshNotifications = useCallback(async () => {
     try {
       const list = await notificationService.getAll();
       setNotifications(list);
       setUnreadCount(list.filter((item) => !item.is_read).length);
+      list.forEach((item) => trackSeen(item.id));
     } catch (error) {
       console.error('Failed to load notifications:', error);
     }
-  }, []);
+  }, [trackSeen]);
 
   const disconnectWebSocket = useCallback(() => {
     if (reconnectTimeoutRef.current) {
@@ -46,19 +55,35 @@ export const NotificationProvider = ({ children }) => {
 
     try {
       const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
-      const wsUrl = `${protocol}://127.0.0.1:8000/ws/notifications/?token=${token}`;
+      const replayParam = lastSeenIdRef.current !== null ? `&last_id=${lastSeenIdRef.current}` : '';
+      const wsUrl = `${protocol}://127.0.0.1:8000/ws/notifications/?token=${token}${replayParam}`;
       const websocket = new WebSocket(wsUrl);
       wsRef.current = websocket;
 
       websocket.onopen = () => {
         console.log('WebSocket connected');
         setIsConnected(true);
-        refreshNotifications();
+        // On reconnect the server replays missed notifications instead.
+        if (lastSeenIdRef.current === null) {
+          refreshNotifications();
+        }
       };
 
       websocket.onmessage = (event) => {
         try {
           const data = JSON.parse(event.data);
+          if (data.type === 'unread_count') {
+            setUnreadCount(Number(data.unread_count || 0));
+            return;
+          }
+          if (data.type === 'replay_complete') {
+            return;
+          }
+          if (data.type === 'replay_truncated') {
+            refreshNotifications();
+            return;
+          }
+          trackSeen(data.id);
           let isNewNotification = true;
           setNotifications((prev) => {
             if (prev.some((notification) => notification.id === data.id)) {
@@ -94,7 +119,7 @@ export const NotificationProvider = ({ children }) => {
     } catch (error) {
       console.error('WebSocket connection error:', error);
     }
-  }, [refreshNotifications]);
+  }, [refreshNotifications, trackSeen]);
 
   useEffect(() => {
     const syncAuthState = () => {
@@ -121,6 +146,8 @@ export const NotificationProvider = ({ children }) => {
     shouldReconnectRef.current = true;
     disconnectWebSocket();
 
+    lastSeenIdRef.current = null;
+
     if (!authToken) {
       setNotifications([]);
       setUnreadCount(0);